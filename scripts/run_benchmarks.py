@@ -0,0 +1,327 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import tracemalloc
+from copy import copy
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from time import perf_counter
+from typing import TYPE_CHECKING, Any
+
+from nhl_playground.data.dataloaders import GameLoader, PbPDataLoader
+from nhl_playground.data.enrichment import AddPrevPlayName
+from nhl_playground.data.preprocessing import ColumnarXGPreprocessor, XGPreprocessor
+from nhl_playground.data.spatial import ShotMap
+from nhl_playground.data.storage import iter_raw_games
+from nhl_playground.data.synthetic import synthetic_season
+from nhl_playground.data.timeline import TimelineIndex
+from nhl_playground.data.utils import play2sog
+from nhl_playground.models.xg_models import XGModel
+from nhl_playground.scrape.http import RequestLayer
+from nhl_playground.scrape.mock import MockNHLServer
+from nhl_playground.scrape.scrapers import PbPScraper
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from pandas import DataFrame
+
+    from nhl_playground.data.dataclasses import Game, Play
+
+RawGames = dict[str, dict[str, Any]]
+
+
+@dataclass
+class Case:
+    """Benchmark case.
+
+    `setup` prepares input from raw games and is not measured, `run` is measured and returns number of processed
+    items (games, plays or shots).
+    """
+
+    name: str
+    setup: Callable[[RawGames], Any]
+    run: Callable[[Any], int]
+
+
+@dataclass
+class Result:
+    """Result of one benchmark case on one dataset."""
+
+    case: str
+    dataset: str
+    games: int
+    items: int
+    seconds: float
+    items_per_second: float
+    peak_mib: float
+
+
+def setup_parser() -> argparse.ArgumentParser:
+    """Sets up the argument parser for the script."""
+    parser = argparse.ArgumentParser(description="Benchmarks scrape, load and preprocessing stages.")
+
+    parser.add_argument("--sizes", nargs="+", default=[10, 100, 500], type=int, help="Numbers of synthetic games.")
+    parser.add_argument("--plays", default=300, type=int, help="Number of plays per synthetic game.")
+    parser.add_argument("--fixture", action="append", default=[], help="Recorded raw PbP file (JSON or JSON Lines).")
+    parser.add_argument("--repeat", default=3, type=int, help="Number of measured runs, the best one is reported.")
+    parser.add_argument("--cases", nargs="+", default=None, help="Run only cases whose name contains any of these.")
+    parser.add_argument("--scrape-workers", nargs="+", default=[1, 8], type=int, help="Scraper worker counts.")
+    parser.add_argument("--latency", default=0.005, type=float, help="Latency of the mock API in seconds.")
+    parser.add_argument("--error-rate", default=0.0, type=float, help="Fraction of mock API requests failing.")
+    parser.add_argument("--output-dir", default="benchmarks/results", type=str, help="Directory of result files.")
+    parser.add_argument("--compare", default=None, type=str, help="Results file to compare with, e.g. of main.")
+    parser.add_argument("--tolerance", default=0.2, type=float, help="Allowed relative slowdown in comparison.")
+
+    return parser
+
+
+def _game_dicts(raw: RawGames) -> list[dict[str, Any]]:
+    return [game | {"key": key} for key, game in raw.items()]
+
+
+def _load_games(games: list[dict[str, Any]]) -> int:
+    return len([GameLoader.load_game(game) for game in games])
+
+
+def _load_loader(raw: RawGames) -> int:
+    loader = PbPDataLoader()
+    loader.load(raw)
+    return len(loader)
+
+
+def _enrich(raw: RawGames) -> int:
+    enrichment = AddPrevPlayName()
+    for game in raw.values():
+        enrichment(game)
+    return sum(len(game["plays"]) for game in raw.values())
+
+
+def _loaded(raw: RawGames) -> list[Game]:
+    return list(PbPDataLoader().iter_load(raw))
+
+
+def _filter_shots(games: list[Game]) -> int:
+    preprocessor = XGPreprocessor()
+    # `_filter_shots` replaces plays of the game, measured on shallow copies so every run gets all plays.
+    return sum(len(preprocessor._filter_shots(copy(game)).plays) for game in games)
+
+
+def _shots(raw: RawGames) -> list[tuple[Play, Game]]:
+    preprocessor = XGPreprocessor()
+    return [(play, game) for game in _loaded(raw) for play in preprocessor._filter_shots(game).plays]
+
+
+def _play2sog(shots: list[tuple[Play, Game]]) -> int:
+    return len([play2sog(play, game) for play, game in shots])
+
+
+def _format(raw: RawGames) -> int:
+    return len(XGPreprocessor().format(raw))
+
+
+def _format_columnar(raw: RawGames) -> int:
+    return len(ColumnarXGPreprocessor().format(raw))
+
+
+def _trained_model(raw: RawGames) -> tuple[XGModel, DataFrame]:
+    data = ColumnarXGPreprocessor().format(raw)
+    return XGModel().fit(data), data
+
+
+def _score(state: tuple[XGModel, DataFrame]) -> int:
+    model, data = state
+    return len(model.predict_proba(data))
+
+
+def _shot_map(raw: RawGames) -> ShotMap:
+    shot_map = ShotMap()
+    shot_map.add(ColumnarXGPreprocessor().format(raw))
+    return shot_map
+
+
+def _near(shot_map: ShotMap) -> int:
+    return len(shot_map.near(80, 0, 10))
+
+
+def _timeline_index(raw: RawGames) -> tuple[TimelineIndex, DataFrame]:
+    return TimelineIndex.from_raw(raw.items()), ColumnarXGPreprocessor().format(raw)
+
+
+def _shot_states(state: tuple[TimelineIndex, DataFrame]) -> int:
+    index, shots = state
+    return len(index.states(shots))
+
+
+def _identity(raw: RawGames) -> RawGames:
+    return raw
+
+
+CASES: list[Case] = [
+    Case("GameLoader.load_game", _game_dicts, _load_games),
+    Case("PbPDataLoader.load", _identity, _load_loader),
+    Case("AddPrevPlayName", _identity, _enrich),
+    Case("XGPreprocessor._filter_shots", _loaded, _filter_shots),
+    Case("play2sog", _shots, _play2sog),
+    Case("XGPreprocessor.format", _identity, _format),
+    Case("ColumnarXGPreprocessor.format", _identity, _format_columnar),
+    Case("XGModel.predict_proba", _trained_model, _score),
+    Case("ShotMap.near", _shot_map, _near),
+    Case("TimelineIndex.states", _timeline_index, _shot_states),
+]
+
+
+def copy_games(raw: RawGames) -> RawGames:
+    """Copies games and their plays, nested play details are shared as enrichments only add play fields."""
+    return {key: game | {"plays": [play.copy() for play in game["plays"]]} for key, game in raw.items()}
+
+
+def measure(case: Case, raw: RawGames, dataset: str, repeat: int) -> Result:
+    """Measures best time of `repeat` runs, then peak memory of one more run traced by tracemalloc.
+
+    Every run gets its own copy of games, so cases enriching plays in place (e.g. `AddPrevPlayName`) do not
+    change input of other runs and cases.
+    """
+    best = float("inf")
+    items = 0
+    for _ in range(repeat):
+        state = case.setup(copy_games(raw))
+        start = perf_counter()
+        items = case.run(state)
+        best = min(best, perf_counter() - start)
+
+    state = case.setup(copy_games(raw))
+    tracemalloc.start()
+    case.run(state)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return Result(case.name, dataset, len(raw), items, best, items / best if best else 0.0, peak / 1024**2)
+
+
+def measure_scraping(n_games: int, workers: int, latency: float, plays: int, error_rate: float = 0.0) -> Result:
+    """Measures PbP scraping throughput against a local mock API with given latency and error rate."""
+    with MockNHLServer(n_games=n_games, n_plays=plays, latency=latency, error_rate=error_rate, seed=0) as server:
+        scraper = PbPScraper(
+            workers=workers,
+            base_url=server.url,
+            stats_url=server.url,
+            http=RequestLayer(),
+            teams_cache_path=None,
+        )
+        start = perf_counter()
+        games = len(scraper.scrape(season="20232024"))
+        seconds = perf_counter() - start
+    return Result(f"PbPScraper.scrape[workers={workers}]", str(n_games), n_games, games, seconds, games / seconds, 0.0)
+
+
+def datasets(args: argparse.Namespace) -> dict[str, RawGames]:
+    """Gets synthetic datasets of all sizes and recorded fixtures."""
+    data = {f"synthetic-{size}": synthetic_season(n_games=size, n_plays=args.plays) for size in args.sizes}
+    for path in args.fixture:
+        data[os.path.basename(path)] = dict(iter_raw_games(path))
+    return data
+
+
+def is_selected(case: str, args: argparse.Namespace) -> bool:
+    """Checks if a case is selected by `--cases`, all cases are selected by default."""
+    return not args.cases or any(name in case for name in args.cases)
+
+
+def run_cases(args: argparse.Namespace) -> list[Result]:
+    """Runs selected loading and preprocessing cases on all datasets."""
+    selected = [case for case in CASES if is_selected(case.name, args)]
+    results: list[Result] = []
+    for dataset, raw in datasets(args).items():
+        for case in selected:
+            results.append(measure(case, raw, dataset, args.repeat))
+            print(_format_result(results[-1]))
+    return results
+
+
+def run_scraping(args: argparse.Namespace) -> list[Result]:
+    """Runs scraping benchmark for all dataset sizes and worker counts."""
+    results: list[Result] = []
+    for size in args.sizes:
+        for workers in args.scrape_workers:
+            results.append(measure_scraping(size, workers, args.latency, args.plays, args.error_rate))
+            print(_format_result(results[-1]))
+    return results
+
+
+def run(args: argparse.Namespace) -> list[Result]:
+    """Runs all selected benchmark cases on all datasets."""
+    results = run_cases(args)
+    if is_selected("PbPScraper.scrape", args):
+        results.extend(run_scraping(args))
+    return results
+
+
+def _format_result(result: Result) -> str:
+    return (
+        f"{result.case:<36} {result.dataset:<20} {result.seconds:>9.4f}s "
+        f"{result.items_per_second:>12.0f} items/s {result.peak_mib:>9.1f} MiB"
+    )
+
+
+def git_commit() -> str:
+    """Gets short hash of the current commit, "unknown" outside of a git repository."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def save(results: list[Result], output_dir: str) -> str:
+    """Saves results with environment info as `<output_dir>/<commit>.json`. Returns the file path."""
+    commit = git_commit()
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, f"{commit}.json")
+    report = {
+        "commit": commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "results": [asdict(result) for result in results],
+    }
+    with open(path, "w") as file:
+        json.dump(report, file, indent=2)
+    return path
+
+
+def compare(results: list[Result], baseline_path: str, tolerance: float) -> list[str]:
+    """Compares results with a baseline results file. Returns descriptions of regressions."""
+    with open(baseline_path) as file:
+        baseline = {(r["case"], r["dataset"]): r for r in json.load(file)["results"]}
+    regressions = []
+    for result in results:
+        if (base := baseline.get((result.case, result.dataset))) is None or not base["seconds"]:
+            continue
+        ratio = result.seconds / base["seconds"]
+        print(f"{result.case:<36} {result.dataset:<20} {ratio:>6.2f}x of baseline")
+        if ratio > 1 + tolerance:
+            regressions.append(f"{result.case} on {result.dataset} is {ratio:.2f}x slower")
+    return regressions
+
+
+def main(args: argparse.Namespace) -> None:
+    """Runs benchmark suite, saves results and optionally compares them with a baseline."""
+    results = run(args)
+    print(f"Results saved to {save(results, args.output_dir)}")
+    if args.compare and (regressions := compare(results, args.compare, args.tolerance)):
+        raise SystemExit("Performance regressions:\n" + "\n".join(regressions))
+
+
+if __name__ == "__main__":
+    parser = setup_parser()
+    main(parser.parse_args())
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import argparse
+from time import sleep
+
+from nhl_playground.scrape.fixtures import FixtureStore
+from nhl_playground.scrape.mock import MockNHLServer
+
+
+def setup_parser() -> argparse.ArgumentParser:
+    """Sets up the argument parser for the script."""
+    parser = argparse.ArgumentParser(description="Serves local mock of the NHL API for offline scraping.")
+
+    parser.add_argument("--fixtures", default=None, type=str, help="Directory of recorded responses to replay.")
+    parser.add_argument(
+        "--synthetic",
+        default=True,
+        action=argparse.BooleanOptionalAction,
+        help="Serve synthetic data of requests without a recorded response.",
+    )
+    parser.add_argument("--port", default=8000, type=int, help="Port to listen on.")
+    parser.add_argument("--games", default=1312, type=int, help="Number of synthetic games in a season.")
+    parser.add_argument("--plays", default=300, type=int, help="Number of plays per synthetic game.")
+    parser.add_argument("--latency", default=0.0, type=float, help="Seconds added to every response.")
+    parser.add_argument("--jitter", default=0.0, type=float, help="Maximal random seconds added to latency.")
+    parser.add_argument("--error-rate", default=0.0, type=float, help="Fraction of requests failing with HTTP 503.")
+    parser.add_argument("--rate-limit", default=None, type=float, help="Requests per second above which HTTP 429.")
+    parser.add_argument("--seed", default=None, type=int, help="Seed of random latency and errors.")
+
+    return parser
+
+
+def main(args: argparse.Namespace) -> None:
+    """This script serves recorded or synthetic NHL API responses until interrupted.
+
+    Point scrapers to the server by `NHL_API_URL` and `NHL_STATS_API_URL` environment variables, or by
+    `--base-url` and `--stats-url` arguments of `run_scraping.py`. Served request counters are printed on exit.
+    """
+    server = MockNHLServer(
+        n_games=args.games,
+        n_plays=args.plays,
+        latency=args.latency,
+        port=args.port,
+        fixtures=FixtureStore(args.fixtures) if args.fixtures else None,
+        synthetic=args.synthetic,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        rate_limit=args.rate_limit,
+        seed=args.seed,
+    )
+    with server:
+        print(f"Serving mock NHL API on {server.url}, stop with Ctrl+C")
+        try:
+            while True:
+                sleep(1)
+        except KeyboardInterrupt:
+            pass
+    print(server.stats)
+
+
+if __name__ == "__main__":
+    parser = setup_parser()
+    main(parser.parse_args())
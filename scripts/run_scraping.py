@@ -2,11 +2,24 @@ from __future__ import annotations
 
 import argparse
 import json
+import os
 from csv import DictWriter
 from time import time
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
-from nhl_playground.scrape.scrapers import PbPScraper, TeamStatsScraper
+from nhl_playground.data.parquet import write_partitioned
+from nhl_playground.data.storage import JsonLinesWriter, is_json_lines, merge_json_lines
+from nhl_playground.instrumentation import Instrumentation
+from nhl_playground.scrape.cache import ResponseCache
+from nhl_playground.scrape.checkpoint import Checkpoint
+from nhl_playground.scrape.fixtures import FixtureStore
+from nhl_playground.scrape.http import RequestLayer, RetryPolicy, TokenBucket
+from nhl_playground.scrape.manifest import ScrapeManifest
+from nhl_playground.scrape.mock import MockNHLServer
+from nhl_playground.scrape.scrapers import BaseScraper, PbPScraper, TeamStatsScraper
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
 
 
 def setup_parser() -> argparse.ArgumentParser:
@@ -17,6 +30,48 @@ def setup_parser() -> argparse.ArgumentParser:
     parser.add_argument("--filepath", default="", type=str)
     parser.add_argument("--parsefn", default="team_stats", type=str)
     parser.add_argument("--season", default="20222023", type=str)
+    parser.add_argument(
+        "--format",
+        default="json",
+        choices=["json", "parquet"],
+        help="Output format. Team stats can be saved as Parquet skaters/ and goalies/ tables under --filepath.",
+    )
+    parser.add_argument("--workers", default=1, type=int, help="Number of concurrent requests.")
+    parser.add_argument("--rate-limit", default=20.0, type=float, help="Maximal number of requests per second.")
+    parser.add_argument("--max-retries", default=5, type=int, help="Number of retries of a failed request.")
+    parser.add_argument("--cache-dir", default=None, type=str, help="Directory of persistent response cache.")
+    parser.add_argument("--cache-max-mb", default=2048, type=int, help="Maximal size of response cache in MB.")
+    parser.add_argument(
+        "--incremental",
+        default=False,
+        action=argparse.BooleanOptionalAction,
+        help="Scrape only new or unfinished PbP games and merge them into data stored in --filepath.",
+    )
+    parser.add_argument(
+        "--resume",
+        default=True,
+        action=argparse.BooleanOptionalAction,
+        help="Resume an interrupted run from <filepath>.checkpoint.jsonl instead of starting over.",
+    )
+    parser.add_argument("--report", default=None, type=str, help="Path of JSON report with timings and counters.")
+    parser.add_argument(
+        "--profile",
+        default=False,
+        action=argparse.BooleanOptionalAction,
+        help="Add cProfile top functions to the report.",
+    )
+    parser.add_argument(
+        "--manifest", default=None, type=str, help="Manifest path, defaults to <filepath>.manifest.json."
+    )
+    parser.add_argument("--base-url", default=None, type=str, help="Web API URL, defaults to NHL_API_URL.")
+    parser.add_argument("--stats-url", default=None, type=str, help="Stats API URL, defaults to NHL_STATS_API_URL.")
+    parser.add_argument("--record", default=None, type=str, help="Directory to record scraped responses to.")
+    parser.add_argument(
+        "--replay",
+        default=None,
+        type=str,
+        help="Directory of recorded responses served by a local mock API instead of the network.",
+    )
 
     return parser
 
@@ -36,28 +91,161 @@ def save_json(filename: str, data: dict[str, Any]) -> None:
         json.dump(data, outfile)
 
 
+def load_json(filename: str) -> dict[str, Any]:
+    """Loads json data, returns empty dictionary if the file does not exist."""
+    if not os.path.exists(filename):
+        return {}
+    with open(filename) as infile:
+        return json.load(infile)
+
+
+def scrape_incremental(scraper: PbPScraper, args: argparse.Namespace) -> int:
+    """Scrapes new or unfinished games and merges them into data stored in `args.filepath`.
+
+    Manifest is saved only together with the data, so unsaved games are scraped again next time.
+    Returns number of newly scraped games.
+    """
+    manifest = ScrapeManifest.load(args.manifest or f"{args.filepath}.manifest.json")
+    games = dict(scraper.iter_incremental(season=args.season, manifest=manifest))
+    if args.save:
+        if is_json_lines(args.filepath):
+            merge_json_lines(args.filepath, games)
+        else:
+            save_json(args.filepath, load_json(args.filepath) | games)
+        manifest.save()
+    return len(games)
+
+
+def scrape_stats_tables(scraper: TeamStatsScraper, args: argparse.Namespace) -> int:
+    """Scrapes team stats as flat skaters and goalies tables and saves them as Parquet datasets.
+
+    Returns number of scraped player rows.
+    """
+    tables = scraper.scrape_tables(seasons=[args.season])
+    if args.save:
+        for group, table in tables.items():
+            write_partitioned(table, os.path.join(args.filepath, group))
+    return sum(len(table) for table in tables.values())
+
+
+def iter_scraped(scraper: BaseScraper, season: str) -> Iterator[tuple[str, Any]]:
+    """Yields scraped items, PbP games that failed are retried once more at the end."""
+    yield from scraper.iter_scrape(season=season)
+    if isinstance(scraper, PbPScraper) and scraper.dead_letters:
+        yield from scraper.retry_dead_letters()
+
+
+def report_dead_letters(scraper: BaseScraper, args: argparse.Namespace) -> None:
+    """Prints items that could not be scraped and saves them next to the data."""
+    if not scraper.dead_letters:
+        return
+    print(f"Failed to scrape {len(scraper.dead_letters)} items: {scraper.dead_letters}")
+    if args.save:
+        save_json(f"{args.filepath}.dead_letters.json", {"dead_letters": scraper.dead_letters})
+
+
+def open_checkpoint(args: argparse.Namespace) -> Checkpoint | None:
+    """Opens checkpoint of a full scrape which is saved, so an interrupted run can be resumed."""
+    if not args.save or args.incremental:
+        return None
+    checkpoint = Checkpoint(f"{args.filepath}.checkpoint.jsonl", resume=args.resume)
+    if len(checkpoint):
+        print(f"Resuming from checkpoint with {len(checkpoint)} completed items")
+    return checkpoint
+
+
+def scrape(scraper: BaseScraper, args: argparse.Namespace) -> int:
+    """Runs scraping and saves data if requested. Returns number of scraped items.
+
+    Data for JSON Lines file paths (.jsonl, .jsonl.gz) are streamed to disk item by item as they arrive.
+    """
+    if args.incremental and isinstance(scraper, PbPScraper):
+        return scrape_incremental(scraper, args)
+    if args.format == "parquet" and isinstance(scraper, TeamStatsScraper):
+        return scrape_stats_tables(scraper, args)
+    if args.save and is_json_lines(args.filepath):
+        with JsonLinesWriter(args.filepath) as writer:
+            return writer.write_all(iter_scraped(scraper, args.season))
+
+    stats = dict(iter_scraped(scraper, args.season))
+    if args.save:
+        save_json(args.filepath, stats)
+    return len(stats)
+
+
+def start_replay(args: argparse.Namespace) -> MockNHLServer | None:
+    """Starts local mock API serving recorded responses, requests without a recording get HTTP 404."""
+    if not args.replay:
+        return None
+    server = MockNHLServer(fixtures=FixtureStore(args.replay), synthetic=False).start()
+    print(f"Replaying responses recorded in {args.replay} from {server.url}")
+    return server
+
+
+def api_urls(args: argparse.Namespace, server: MockNHLServer | None) -> dict[str, str | None]:
+    """Gets API URLs of scrapers, replay server overrides URLs given by arguments."""
+    if server:
+        return {"base_url": server.url, "stats_url": server.url}
+    return {"base_url": args.base_url, "stats_url": args.stats_url}
+
+
+def run_scraper(scraper_class: type[BaseScraper], args: argparse.Namespace, **kwargs: Any) -> int:
+    """Creates scraper with arguments of the run and scrapes. Returns number of scraped items."""
+    checkpoint = open_checkpoint(args)
+    server = start_replay(args)
+    scraper = scraper_class(
+        workers=args.workers,
+        checkpoint=checkpoint,
+        recorder=FixtureStore(args.record) if args.record else None,
+        **api_urls(args, server),
+        **kwargs,
+    )
+    completed = False
+    try:
+        scraped = scrape(scraper, args)
+        completed = True
+    finally:
+        if checkpoint:
+            # Checkpoint is kept only when the run was interrupted, otherwise all data are already saved.
+            checkpoint.close(remove=completed)
+        if server:
+            server.stop()
+    report_dead_letters(scraper, args)
+    return scraped
+
+
 def main(args: argparse.Namespace) -> None:
     """This script runs basic data scraping.
 
     Args:
-        args (argparse.Namespace): Commandline arguments for scraping script. Supports PbP data scraping and Team statistics scraping for a given season. Additionally allows saving data as json.
+        args (argparse.Namespace): Commandline arguments for scraping script. Supports PbP data scraping and Team statistics scraping for a given season. Additionally allows saving data as json or as streamed JSON Lines.
     """
     print(f"Starting to parse {args.parsefn}")
     start = time()
+    instrumentation = Instrumentation(enabled=args.report is not None, profile=args.profile)
+    instrumentation.start()
 
+    cache = ResponseCache(args.cache_dir, max_bytes=args.cache_max_mb * 1024**2) if args.cache_dir else None
     scrapers_mapping = {"team_stats": TeamStatsScraper, "pbp": PbPScraper}
-    scraper = scrapers_mapping.get(args.parsefn)
-    if scraper:
-        scraper = scraper()
-        stats = scraper.scrape(season=args.season)
-    else:
-        stats = {}
+    http = RequestLayer(
+        rate_limiter=TokenBucket(rate=args.rate_limit),
+        retry=RetryPolicy(max_retries=args.max_retries),
+        instrumentation=instrumentation,
+    )
+    scraper_class = scrapers_mapping.get(args.parsefn)
+    scraped = 0
+    if scraper_class:
+        scraped = run_scraper(scraper_class, args, cache=cache, http=http, instrumentation=instrumentation)
+    if cache:
+        cache.close()
+        print(f"Response cache: {cache.stats}")
 
     end = time()
-    if args.save:
-        save_json(args.filepath, stats)
-    else:
-        print(len(stats.keys()))
+    instrumentation.stop()
+    if args.report:
+        instrumentation.save(args.report)
+        print(f"Report saved to {args.report}")
+    print(scraped)
     print(f"Scraping successfully finished. Elapsed time {end - start}s.")
 
 
@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+from contextlib import ExitStack
+from datetime import date
+from time import time
+from typing import TYPE_CHECKING, Any
+
+from nhl_playground.data.storage import JsonLinesWriter
+from nhl_playground.instrumentation import Instrumentation
+from nhl_playground.scrape.cache import ResponseCache
+from nhl_playground.scrape.checkpoint import Checkpoint
+from nhl_playground.scrape.http import RequestLayer, RetryPolicy, TokenBucket
+from nhl_playground.scrape.jobs import KINDS, ScrapeJob, WorkUnit, season_range
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+
+def setup_parser() -> argparse.ArgumentParser:
+    """Sets up the argument parser for the script."""
+    parser = argparse.ArgumentParser(description="Scrapes several kinds of data over a range of seasons or dates.")
+
+    parser.add_argument("--kinds", nargs="+", default=["pbp"], choices=KINDS, help="Kinds of data to scrape.")
+    parser.add_argument(
+        "--seasons",
+        nargs=2,
+        default=None,
+        metavar=("FIRST", "LAST"),
+        help="First and last season to scrape, e.g. 20082009 20222023.",
+    )
+    parser.add_argument("--start-date", default=None, type=date.fromisoformat, help="First game date (YYYY-MM-DD).")
+    parser.add_argument("--end-date", default=None, type=date.fromisoformat, help="Last game date (YYYY-MM-DD).")
+    parser.add_argument("--game-types", nargs="+", default=[1, 2, 3], type=int, help="Game types to scrape.")
+    parser.add_argument("--outdir", default="data/job", type=str, help="Output directory, one <kind>.jsonl per kind.")
+    parser.add_argument("--workers", default=16, type=int, help="Number of concurrent requests.")
+    parser.add_argument("--rate-limit", default=20.0, type=float, help="Maximal number of requests per second.")
+    parser.add_argument("--max-retries", default=5, type=int, help="Number of retries of a failed request.")
+    parser.add_argument("--cache-dir", default=None, type=str, help="Directory of persistent response cache.")
+    parser.add_argument("--cache-max-mb", default=2048, type=int, help="Maximal size of response cache in MB.")
+    parser.add_argument("--report", default=None, type=str, help="Path of JSON report with timings and counters.")
+    parser.add_argument(
+        "--profile",
+        default=False,
+        action=argparse.BooleanOptionalAction,
+        help="Add cProfile top functions to the report.",
+    )
+    parser.add_argument(
+        "--resume",
+        default=True,
+        action=argparse.BooleanOptionalAction,
+        help="Resume an interrupted job from <outdir>/checkpoint.jsonl instead of starting over.",
+    )
+
+    return parser
+
+
+def iter_job(job: ScrapeJob, units: list[WorkUnit]) -> Iterator[tuple[WorkUnit, dict[str, Any]]]:
+    """Yields scraped work units, units that failed are retried once more at the end."""
+    yield from job.run(units)
+    if job.dead_letters:
+        yield from job.retry_dead_letters()
+
+
+def drop_partial_line(path: str, chunk_size: int = 1 << 16) -> None:
+    """Drops the last line of a JSON Lines file left incomplete by an interrupted job, so lines can be appended."""
+    if not os.path.exists(path):
+        return
+    with open(path, "rb+") as file:
+        end = file.seek(0, os.SEEK_END)
+        while end > 0:
+            start = max(0, end - chunk_size)
+            file.seek(start)
+            newline = file.read(end - start).rfind(b"\n")
+            if newline >= 0:
+                file.truncate(start + newline + 1)
+                return
+            end = start
+        file.truncate(0)
+
+
+def open_output(path: str, append: bool) -> JsonLinesWriter:
+    """Opens JSON Lines output of a kind, appending to the output of an interrupted job when resuming."""
+    if append:
+        drop_partial_line(path)
+    return JsonLinesWriter(path, append=append)
+
+
+def run_job(job: ScrapeJob, checkpoint: Checkpoint, args: argparse.Namespace) -> int:
+    """Plans and runs the job, streaming data of every kind into its own JSON Lines file.
+
+    The checkpoint keeps only keys of completed work units and their output files, data are stored once in the
+    outputs. Units completed by an interrupted run are skipped and new data are appended to its outputs.
+
+    Returns:
+        int: Number of scraped work units.
+    """
+    if args.start_date:
+        units = job.plan(start=args.start_date, end=args.end_date)
+    else:
+        units = job.plan(season_range(*args.seasons))
+    pending = [unit for unit in units if unit.key not in checkpoint]
+    print(f"Planned {len(units)} work units, {len(units) - len(pending)} completed by a previous run")
+
+    with ExitStack() as stack:
+        writers = {
+            kind: stack.enter_context(open_output(os.path.join(args.outdir, f"{kind}.jsonl"), len(checkpoint) > 0))
+            for kind in job.kinds
+        }
+        for unit, data in iter_job(job, pending):
+            writer = writers[unit.kind]
+            writer.write(unit.item_key, data)
+            # Data are flushed before the unit is recorded, so a recorded unit is always in its output.
+            writer.flush()
+            checkpoint.record(unit.key, {"output": os.path.basename(writer.path)})
+        return sum(writer.written for writer in writers.values())
+
+
+def main(args: argparse.Namespace) -> None:
+    """Runs scraping job over a range of seasons (--seasons) or game dates (--start-date, --end-date)."""
+    if not args.seasons and not args.start_date:
+        raise SystemExit("Either --seasons or --start-date is required.")
+    start = time()
+    os.makedirs(args.outdir, exist_ok=True)
+    instrumentation = Instrumentation(enabled=args.report is not None, profile=args.profile)
+    instrumentation.start()
+
+    cache = ResponseCache(args.cache_dir, max_bytes=args.cache_max_mb * 1024**2) if args.cache_dir else None
+    http = RequestLayer(
+        rate_limiter=TokenBucket(rate=args.rate_limit),
+        retry=RetryPolicy(max_retries=args.max_retries),
+        instrumentation=instrumentation,
+    )
+    checkpoint = Checkpoint(os.path.join(args.outdir, "checkpoint.jsonl"), resume=args.resume)
+    job = ScrapeJob(
+        kinds=args.kinds,
+        game_types=tuple(args.game_types),
+        workers=args.workers,
+        cache=cache,
+        http=http,
+        instrumentation=instrumentation,
+    )
+    completed = False
+    try:
+        scraped = run_job(job, checkpoint, args)
+        completed = True
+    finally:
+        # Checkpoint is kept only when the job was interrupted, otherwise all data are already saved.
+        checkpoint.close(remove=completed)
+
+    if job.dead_letters:
+        failed = [unit.key for unit in job.dead_letters]
+        print(f"Failed to scrape {len(failed)} work units: {failed}")
+        with open(os.path.join(args.outdir, "dead_letters.json"), "w") as file:
+            json.dump({"dead_letters": failed}, file)
+    if cache:
+        cache.close()
+        print(f"Response cache: {cache.stats}")
+    instrumentation.stop()
+    if args.report:
+        instrumentation.save(args.report)
+        print(f"Report saved to {args.report}")
+    print(f"Scraped {scraped} work units in {time() - start}s, HTTP retries: {http.retries}.")
+
+
+if __name__ == "__main__":
+    parser = setup_parser()
+    main(parser.parse_args())
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import argparse
+import os
+from time import time
+
+from nhl_playground.data.aggregates import AGGREGATE_KINDS, XGAggregates
+from nhl_playground.data.storage import read_sog
+from nhl_playground.models.xg_models import XGModel
+
+
+def setup_parser() -> argparse.ArgumentParser:
+    """Sets up the argument parser for the script."""
+    parser = argparse.ArgumentParser(description="Scores shots and adds them to the xG aggregates store.")
+
+    parser.add_argument("-i", "--input", default="data/sog.csv", type=str, help="SOG CSV file or Parquet directory.")
+    parser.add_argument("-m", "--model", default="data/xg_model.joblib", type=str, help="Trained xG model.")
+    parser.add_argument("-o", "--store", default="data/xg_aggregates", type=str, help="Aggregates store directory.")
+    parser.add_argument("--kind", default="team", choices=AGGREGATE_KINDS, help="Totals to print.")
+    parser.add_argument("--seasons", nargs="+", default=None, type=int, help="Seasons of printed totals.")
+    parser.add_argument("--start-date", default=None, type=str, help="First game date of printed totals.")
+    parser.add_argument("--end-date", default=None, type=str, help="Last game date of printed totals.")
+
+    return parser
+
+
+def main(args: argparse.Namespace) -> None:
+    """This script scores shots by a trained xG model and adds their per-game sums to the aggregates store.
+
+    Only seasons of the input are rewritten, games already in the store are replaced, e.g. re-scraped games.
+    Prints team, player or goalie totals of the requested seasons and dates.
+    """
+    start = time()
+    shots = read_sog(args.input)
+    store = XGAggregates.load(args.store) if os.path.isdir(args.store) else XGAggregates()
+    store.add(shots, XGModel.load(args.model).predict_proba(shots))
+    store.save(args.store)
+    print(f"Added {len(shots)} shots to {args.store} in {time() - start:.2f}s")
+    totals = store.totals(args.kind, args.seasons, args.start_date, args.end_date)
+    print(totals.sort_values("xgAgainst" if args.kind == "goalie" else "xgFor", ascending=False))
+
+
+if __name__ == "__main__":
+    parser = setup_parser()
+    main(parser.parse_args())
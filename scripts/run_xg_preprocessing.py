@@ -1,15 +1,21 @@
 from __future__ import annotations
 
 import argparse
-import json
+import os
 from dataclasses import dataclass
 from time import time
+from typing import Any
 
 from numpy import sum as np_sum
 from pandas import DataFrame, isna
 
-from nhl_playground.data.dataloaders import PbPDataLoader
-from nhl_playground.data.preprocessing import XGPreprocessor
+from nhl_playground.data.dataloaders import PbPDataLoader, RawGames
+from nhl_playground.data.decoding import BACKENDS, PBP_PROJECTION, JsonDecoder
+from nhl_playground.data.parquet import write_sog_parquet
+from nhl_playground.data.preprocessing import ColumnarXGPreprocessor, XGPreprocessor
+from nhl_playground.data.shotstore import ShotStore
+from nhl_playground.data.storage import is_json_lines, iter_json_lines, read_json
+from nhl_playground.instrumentation import Instrumentation
 
 
 @dataclass
@@ -20,6 +26,15 @@ class InputVariables:
     outfile: str
     infile: str
     enrichment: list[str]
+    output_format: str = "csv"
+    engine: str = "objects"
+    jobs: int = 1
+    report: str | None = None
+    profile: bool = False
+    trace_memory: bool = False
+    json_backend: str = "auto"
+    project: bool | None = None
+    sequence_features: bool = False
 
 
 def setup_parser() -> argparse.ArgumentParser:
@@ -34,7 +49,54 @@ def setup_parser() -> argparse.ArgumentParser:
         help="Save flag, defaults to false.",
     )
     parser.add_argument("-o", "--output", default="", type=str, help="Output file path.")
+    parser.add_argument(
+        "-f",
+        "--format",
+        default="csv",
+        choices=["csv", "parquet", "store"],
+        help="Output format. Parquet output is a directory partitioned by season, store output appends shots of new "
+        "games to a memory-mapped shot store directory.",
+    )
     parser.add_argument("-i", "--input", default="data/pbp_raw.json", type=str, help="Input file path.")
+    parser.add_argument(
+        "--engine",
+        default="objects",
+        choices=["objects", "columnar"],
+        help="Preprocessing engine. Columnar engine bypasses per-play dataclasses and is several times faster.",
+    )
+    parser.add_argument("-j", "--jobs", default=1, type=int, help="Number of worker processes.")
+    parser.add_argument("--report", default=None, type=str, help="Path of JSON report with per-stage timings.")
+    parser.add_argument(
+        "--profile",
+        default=False,
+        action=argparse.BooleanOptionalAction,
+        help="Add cProfile top functions to the report.",
+    )
+    parser.add_argument(
+        "--trace-memory",
+        default=False,
+        action=argparse.BooleanOptionalAction,
+        help="Add tracemalloc peak memory and top allocation sites to the report.",
+    )
+    parser.add_argument(
+        "--json-backend",
+        default="auto",
+        choices=["auto", *BACKENDS],
+        help="JSON parser, auto picks the fastest installed one (orjson, simdjson, json).",
+    )
+    parser.add_argument(
+        "--project",
+        default=None,
+        action=argparse.BooleanOptionalAction,
+        help="Keep only fields used by preprocessing. Defaults to true for objects engine, columnar engine reads "
+        "only used fields anyway.",
+    )
+    parser.add_argument(
+        "--sequence-features",
+        default=False,
+        action=argparse.BooleanOptionalAction,
+        help="Add context features of preceding plays (rebound, rush, recent attempts) as extra columns.",
+    )
     parser.add_argument(
         "-e",
         "--enrichment",
@@ -46,6 +108,61 @@ def setup_parser() -> argparse.ArgumentParser:
     return parser
 
 
+def read_input(variables: InputVariables, instrumentation: Instrumentation) -> RawGames:
+    """Reads raw games, JSON Lines input is streamed, JSON input is parsed at once."""
+    project = variables.engine == "objects" if variables.project is None else variables.project
+    projection = PBP_PROJECTION if project else None
+    instrumentation.count("input_bytes", os.path.getsize(variables.infile))
+    if is_json_lines(variables.infile):
+        decoder = JsonDecoder(variables.json_backend, projection)
+        return instrumentation.timed("parse_json", iter_json_lines(variables.infile, decoder=decoder))
+    decoder = JsonDecoder(variables.json_backend, projection and {"*": projection})
+    with instrumentation.stage("parse_json"):
+        raw_data: dict[str, Any] = read_json(variables.infile, decoder)
+    return raw_data
+
+
+def save_data(data: DataFrame, variables: InputVariables) -> None:
+    """Saves shots as CSV file, Parquet dataset or appends shots of new games to a shot store."""
+    if variables.output_format == "parquet":
+        write_sog_parquet(data, variables.outfile)
+    elif variables.output_format == "store":
+        print(f"Appended {ShotStore(variables.outfile).append(data)} shots to the shot store")
+    else:
+        data.to_csv(path_or_buf=variables.outfile, sep=";")
+
+
+def setup_preprocessor(variables: InputVariables, instrumentation: Instrumentation) -> XGPreprocessor:
+    """Sets up preprocessor of the selected engine with requested enrichments and sequence features."""
+    preprocessor_class = ColumnarXGPreprocessor if variables.engine == "columnar" else XGPreprocessor
+    preprocessor = preprocessor_class(jobs=variables.jobs, instrumentation=instrumentation)
+    preprocessor.loader = PbPDataLoader(instrumentation=instrumentation)
+
+    for e in variables.enrichment:
+        try:
+            preprocessor.add_enrichment(e)
+        except ValueError as ve:
+            print("Error occurred when adding enrichment: ", ve)
+    if variables.sequence_features:
+        preprocessor.add_sequence_features()
+    return preprocessor
+
+
+def print_summary(data: DataFrame) -> None:
+    """Prints first rows of shots and non-null count, number of unique values and dtype of every column."""
+    print(data.head())
+    output = [
+        [
+            col,
+            len(data) - np_sum(isna(data[col])),
+            data[col].nunique(),
+            str(data[col].dtype),
+        ]
+        for col in data.columns
+    ]
+    print(DataFrame(output, columns=["name", "non-null", "unique", "dtype"]).set_index("name"))
+
+
 def main(variables: InputVariables) -> None:
     """This script runs preprocessing for xG models.
 
@@ -53,42 +170,37 @@ def main(variables: InputVariables) -> None:
     {
         "game_key" : <game_json>
     }
+    or path to JSON Lines data (.jsonl, optionally gzip compressed .jsonl.gz) with one game per line
+    and its key in `key` field. JSON Lines input is streamed, so memory does not grow with number of games.
+    Input is parsed by the fastest installed JSON parser (orjson, simdjson, falls back to json) and by default
+    objects engine keeps only fields used by preprocessing.
 
     Enrichments can be passed as arguments with '-e' switch. For all possible enrichment keyword options check README.
     """
     start = time()
-    # Set up preprocessor
-    preprocessor = XGPreprocessor()
-    preprocessor.loader = PbPDataLoader()
-
-    for e in variables.enrichment:
-        try:
-            preprocessor.add_enrichment(e)
-        except ValueError as ve:
-            print("Error occurred when adding enrichment: ", ve)
+    instrumentation = Instrumentation(
+        enabled=variables.report is not None,
+        profile=variables.profile,
+        trace_memory=variables.trace_memory,
+    )
+    instrumentation.start()
+    preprocessor = setup_preprocessor(variables, instrumentation)
 
     # Load raw data to loader within preprocessor
-    with open(variables.infile) as input_file:
-        raw_data = json.load(input_file)
-    data: DataFrame = preprocessor.format(raw_data)
+    data: DataFrame = preprocessor.format(read_input(variables, instrumentation))
 
     end = time()
     # Save data as csv or prints first 10 rows
     if variables.save:
-        data.to_csv(path_or_buf=variables.outfile, sep=";")
+        with instrumentation.stage("save"):
+            save_data(data, variables)
         print(f"Data saved to {variables.outfile}")
     else:
-        print(data.head())
-        output = [
-            [
-                col,
-                len(data) - np_sum(isna(data[col])),
-                data[col].nunique(),
-                str(data[col].dtype),
-            ]
-            for col in data.columns
-        ]
-        print(DataFrame(output, columns=["name", "non-null", "unique", "dtype"]).set_index("name"))
+        print_summary(data)
+    instrumentation.stop()
+    if variables.report:
+        instrumentation.save(variables.report)
+        print(f"Report saved to {variables.report}")
     print(f"Elapsed time: {end - start}s")
 
 
@@ -100,5 +212,14 @@ if __name__ == "__main__":
         infile=args.input,
         outfile=args.output,
         enrichment=args.enrichment or [],
+        output_format=args.format,
+        engine=args.engine,
+        jobs=args.jobs,
+        report=args.report,
+        profile=args.profile,
+        trace_memory=args.trace_memory,
+        json_backend=args.json_backend,
+        project=args.project,
+        sequence_features=args.sequence_features,
     )
     main(variables)
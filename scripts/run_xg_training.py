@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import argparse
+from time import time
+from typing import TYPE_CHECKING
+
+from sklearn.ensemble import HistGradientBoostingClassifier
+
+from nhl_playground.data.storage import read_sog
+from nhl_playground.models.xg_models import XGModel
+
+if TYPE_CHECKING:
+    from pandas import DataFrame
+
+
+def setup_parser() -> argparse.ArgumentParser:
+    """Sets up the argument parser for the script."""
+    parser = argparse.ArgumentParser(description="Trains xG model on preprocessed shots.")
+
+    parser.add_argument("-i", "--input", default="data/sog.csv", type=str, help="SOG CSV file or Parquet directory.")
+    parser.add_argument("-o", "--output", default="data/xg_model.joblib", type=str, help="Model file path.")
+    parser.add_argument(
+        "--estimator",
+        default="logistic",
+        choices=["logistic", "boosting"],
+        help="Classifier, logistic regression or histogram gradient boosting.",
+    )
+    parser.add_argument(
+        "--test-size",
+        default=0.2,
+        type=float,
+        help="Fraction of the latest games held out for evaluation, 0 trains on all shots.",
+    )
+
+    return parser
+
+
+def split_by_games(data: DataFrame, test_size: float) -> tuple[DataFrame, DataFrame]:
+    """Splits shots into train and test sets, the latest games are held out so that games are not shared."""
+    games = data["gameId"].drop_duplicates().sort_values()
+    test_games = games.iloc[len(games) - int(len(games) * test_size) :]
+    is_test = data["gameId"].isin(test_games)
+    return data[~is_test], data[is_test]
+
+
+def main(args: argparse.Namespace) -> None:
+    """This script trains xG model on shots preprocessed by `run_xg_preprocessing.py`.
+
+    Trained model is saved with joblib, load it with `nhl_playground.models.xg_models.XGModel.load(path)`.
+    """
+    start = time()
+    train, test = split_by_games(read_sog(args.input), args.test_size)
+    model = XGModel(HistGradientBoostingClassifier() if args.estimator == "boosting" else None).fit(train)
+    print(f"Trained on {len(train)} shots in {time() - start:.2f}s")
+    if len(test):
+        print(f"Evaluation on {len(test)} held out shots: {model.evaluate(test)}")
+    model.save(args.output)
+    print(f"Model saved to {args.output}")
+
+
+if __name__ == "__main__":
+    parser = setup_parser()
+    main(parser.parse_args())
@@ -0,0 +1,187 @@
+from collections.abc import Iterable
+from datetime import date
+
+from numpy import ndarray, where
+from pandas import DataFrame, concat, to_numeric
+
+from nhl_playground.data.parquet import read_partitioned, write_partitioned
+from nhl_playground.data.utils import season_from_game_id
+
+AGGREGATE_KINDS: tuple[str, ...] = ("team", "player", "goalie")
+GAME_COLUMNS: tuple[str, ...] = ("gameId", "season", "gameDate")
+KEY_COLUMNS: tuple[str, ...] = (*GAME_COLUMNS, "kind", "id")
+SUM_COLUMNS: tuple[str, ...] = ("shotsFor", "goalsFor", "xgFor", "shotsAgainst", "goalsAgainst", "xgAgainst")
+COUNT_COLUMNS: tuple[str, ...] = ("shotsFor", "goalsFor", "shotsAgainst", "goalsAgainst")
+PARTIAL_COLUMNS: tuple[str, ...] = (*KEY_COLUMNS, *SUM_COLUMNS)
+
+
+def _shot_frame(shots: DataFrame, xg: ndarray) -> DataFrame:
+    """Gets game columns, acting entities and outcome of every shot."""
+    game_id = to_numeric(shots["gameId"]).to_numpy(dtype=int)
+    team = to_numeric(shots["eventOwnerTeamId"]).to_numpy(dtype=int)
+    home = to_numeric(shots["homeTeamId"]).to_numpy(dtype=int)
+    away = to_numeric(shots["awayTeamId"]).to_numpy(dtype=int)
+    dates = shots["gameDate"].astype(object) if "gameDate" in shots else None
+    return DataFrame(
+        {
+            "gameId": game_id,
+            "season": season_from_game_id(game_id),
+            "gameDate": "" if dates is None else dates.where(dates.notna(), "").astype(str).to_numpy(),
+            "team": team,
+            "opponent": where(team == home, away, home),
+            "shooter": to_numeric(shots["shootingPlayerId"]).to_numpy(dtype=float, na_value=-1),
+            "goalie": to_numeric(shots["goalieInNetId"]).to_numpy(dtype=float, na_value=-1),
+            "goal": shots["isGoal"].astype(bool).to_numpy(dtype=int),
+            "xg": xg,
+        },
+    )
+
+
+def _sums(frame: DataFrame, by: str, side: str) -> DataFrame:
+    """Sums shots, goals and xG of every game and entity in `by` column."""
+    grouped = frame.groupby([*GAME_COLUMNS, by], sort=False)
+    sums = {f"shots{side}": grouped.size(), f"goals{side}": grouped["goal"].sum(), f"xg{side}": grouped["xg"].sum()}
+    return DataFrame(sums).rename_axis(index={by: "id"})
+
+
+def game_partials(shots: DataFrame, xg: ndarray) -> DataFrame:
+    """Computes per-game partial sums of scored shots.
+
+    Teams get shots, goals and xG for and against, players (`shootingPlayerId`) get them for and goalies
+    (`goalieInNetId`) against. Partials of a game do not depend on other games, so they can be added one game
+    at a time.
+
+    Args:
+        shots (DataFrame): SOG rows, e.g. output of `XGPreprocessor.format`.
+        xg (ndarray): Goal probabilities of the rows, e.g. from `XGModel.predict_proba`.
+
+    Returns:
+        DataFrame: One row per game and entity with `PARTIAL_COLUMNS`.
+    """
+    frame = _shot_frame(shots, xg)
+    parts = {
+        "team": _sums(frame, "team", "For").join(_sums(frame, "opponent", "Against"), how="outer"),
+        "player": _sums(frame[frame["shooter"] > 0], "shooter", "For"),
+        "goalie": _sums(frame[frame["goalie"] > 0], "goalie", "Against"),
+    }
+    partials = concat(parts, names=["kind"]).reindex(columns=list(SUM_COLUMNS)).fillna(0).reset_index()
+    partials = partials.astype(dict.fromkeys(("id", *COUNT_COLUMNS), int))
+    return partials[list(PARTIAL_COLUMNS)]
+
+
+def _totals(partials: DataFrame) -> DataFrame:
+    """Sums partials by kind and entity ID."""
+    return partials.groupby(["kind", "id"])[list(SUM_COLUMNS)].sum()
+
+
+class XGAggregates:
+    """Store of per-game xG partial sums with team, player and goalie totals.
+
+    Partials are kept per season, sorted by game date, together with cached season totals. Adding games updates
+    only their season: stored partials of re-added games are replaced and season totals are updated by
+    the difference, so history is never rescanned. Queries of whole seasons are served from the cached totals,
+    date ranges are sliced by binary search on game dates.
+    """
+
+    def __init__(self, partials: DataFrame | None = None) -> None:
+        """Store constructor.
+
+        Args:
+            partials (DataFrame | None, optional): Stored partials, e.g. read by `load`. Defaults to None.
+        """
+        self._partials: dict[int, DataFrame] = {}
+        self._totals: dict[int, DataFrame] = {}
+        self._dirty: set[int] = set()
+        if partials is not None:
+            self.add_partials(partials)
+
+    @property
+    def seasons(self) -> list[int]:
+        """Stored seasons."""
+        return sorted(self._partials)
+
+    def add(self, shots: DataFrame, xg: ndarray) -> None:
+        """Adds scored shots of new or re-scraped games, replacing stored partials of the same games."""
+        self.add_partials(game_partials(shots, xg))
+
+    def add_partials(self, partials: DataFrame) -> None:
+        """Adds partials computed by `game_partials`, replacing stored partials of the same games."""
+        for season, rows in partials.groupby("season"):
+            self._update_season(int(season), rows)
+
+    def _update_season(self, season: int, rows: DataFrame) -> None:
+        rows = rows[list(PARTIAL_COLUMNS)]
+        stored = self._partials.get(season)
+        if stored is None:
+            merged, delta = rows, _totals(rows)
+        else:
+            replaced = stored["gameId"].isin(rows["gameId"].unique())
+            merged = concat([stored[~replaced], rows], ignore_index=True)
+            delta = _totals(rows).sub(_totals(stored[replaced]), fill_value=0)
+        self._partials[season] = merged.sort_values(["gameDate", "gameId"], kind="stable", ignore_index=True)
+        totals = self._totals.get(season)
+        totals = delta if totals is None else totals.add(delta, fill_value=0)
+        self._totals[season] = totals.astype(dict.fromkeys(COUNT_COLUMNS, int))
+        self._dirty.add(season)
+
+    def games(
+        self,
+        seasons: Iterable[int] | None = None,
+        start: date | str | None = None,
+        end: date | str | None = None,
+    ) -> DataFrame:
+        """Gets per-game partials of seasons (all by default) played between `start` and `end` (inclusive)."""
+        frames = [self._slice(season, start, end) for season in seasons or self.seasons if season in self._partials]
+        if not frames:
+            return DataFrame(columns=list(PARTIAL_COLUMNS))
+        return concat(frames, ignore_index=True)
+
+    def _slice(self, season: int, start: date | str | None, end: date | str | None) -> DataFrame:
+        """Gets partials of a season between ISO dates, games without a date sort first."""
+        partials = self._partials[season]
+        first = partials["gameDate"].searchsorted(str(start), side="left") if start else 0
+        last = partials["gameDate"].searchsorted(str(end), side="right") if end else len(partials)
+        return partials.iloc[first:last]
+
+    def totals(
+        self,
+        kind: str,
+        seasons: Iterable[int] | None = None,
+        start: date | str | None = None,
+        end: date | str | None = None,
+    ) -> DataFrame:
+        """Gets totals of teams, players or goalies over seasons and an optional date range.
+
+        Args:
+            kind (str): One of `AGGREGATE_KINDS`.
+            seasons (Iterable[int] | None, optional): Seasons, e.g. [20222023, 20232024]. Defaults to all seasons.
+            start (date | str | None, optional): First game date, e.g. "2023-10-10". Defaults to None.
+            end (date | str | None, optional): Last game date (inclusive). Defaults to None.
+
+        Returns:
+            DataFrame: `SUM_COLUMNS` indexed by team, player or goalie ID.
+        """
+        totals = _totals(self.games(seasons, start, end)) if start or end else self._season_totals(seasons)
+        if kind not in totals.index.get_level_values("kind"):
+            return DataFrame(columns=list(SUM_COLUMNS)).rename_axis(index="id")
+        return totals.loc[kind]
+
+    def _season_totals(self, seasons: Iterable[int] | None) -> DataFrame:
+        """Sums cached totals of whole seasons."""
+        selected = [self._totals[season] for season in seasons or self.seasons if season in self._totals]
+        if not selected:
+            return _totals(DataFrame(columns=list(PARTIAL_COLUMNS)))
+        return concat(selected).groupby(level=["kind", "id"]).sum()
+
+    def save(self, root: str) -> None:
+        """Saves seasons changed since the last save or load as Parquet dataset partitioned by season."""
+        if self._dirty:
+            write_partitioned(concat([self._partials[season] for season in sorted(self._dirty)]), root)
+        self._dirty.clear()
+
+    @classmethod
+    def load(cls, root: str, seasons: list[int] | None = None) -> "XGAggregates":
+        """Loads store saved by `save`, only requested seasons (all by default)."""
+        store = cls(read_partitioned(root, seasons))
+        store._dirty.clear()
+        return store
@@ -0,0 +1,132 @@
+from collections.abc import Iterable, Iterator
+from dataclasses import fields
+from itertools import islice
+from typing import Any
+
+from numpy import array, char, isin, ndarray, repeat
+from pandas import DataFrame
+
+from nhl_playground.data.dataclasses import SOG
+
+SHOT_TYPES: tuple[str, ...] = ("shot-on-goal", "goal")
+SOG_COLUMNS: tuple[str, ...] = tuple(field.name for field in fields(SOG))
+
+
+def time2sec_array(times: ndarray) -> ndarray:
+    """Vectorized `time2sec`, converts array of "MM:SS" strings to seconds."""
+    parts = char.partition(times.astype(str), ":")
+    return parts[:, 0].astype(int) * 60 + parts[:, 2].astype(int)
+
+
+def _chunks(items: Iterable[Any], size: int) -> Iterator[list[Any]]:
+    iterator = iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def flatten_games(raw_games: Iterable[tuple[str, dict[str, Any]]]) -> tuple[ndarray, ndarray, dict[str, ndarray]]:
+    """Flattens plays of all games into one array, making a single pass over each game.
+
+    Returns:
+        tuple[ndarray, ndarray, dict[str, ndarray]]: Raw plays, their `typeDescKey` and game level columns
+            (`gameId`, `homeTeamId`, `awayTeamId`, `gameDate`) repeated for every play.
+    """
+    plays: list[dict[str, Any]] = []
+    types: list[str | None] = []
+    game_columns: list[tuple[int, int, int]] = []
+    dates: list[str | None] = []
+    counts: list[int] = []
+    for key, game in raw_games:
+        plays.extend(game["plays"])
+        types.extend([play.get("typeDescKey") for play in game["plays"]])
+        game_columns.append((int(key), game["homeTeam"]["id"], game["awayTeam"]["id"]))
+        dates.append(game.get("gameDate"))
+        counts.append(len(game["plays"]))
+
+    plays_array = array([None] * len(plays), dtype=object)
+    plays_array[:] = plays
+    game_array = array(game_columns, dtype=int).reshape(-1, 3)
+    columns = {name: repeat(game_array[:, i], counts) for i, name in enumerate(("gameId", "homeTeamId", "awayTeamId"))}
+    columns["gameDate"] = repeat(array(dates, dtype=object), counts)
+    return plays_array, array(types, dtype=object), columns
+
+
+def shot_columns(plays: ndarray, types: ndarray, game_columns: dict[str, ndarray]) -> dict[str, list[Any]]:
+    """Filters shots with a vectorized mask and extracts SOG columns from them."""
+    mask = isin(types, SHOT_TYPES)
+    shots = plays[mask]
+    rows = [
+        (
+            play.get("eventId"),
+            play.get("homeTeamDefendingSide"),
+            play["periodDescriptor"]["number"],
+            play["periodDescriptor"]["periodType"],
+            play.get("sortOrder"),
+            play.get("timeInPeriod"),
+            play.get("timeRemaining"),
+            details.get("xCoord"),
+            details.get("yCoord"),
+            details.get("zoneCode"),
+            details.get("shotType"),
+            details.get("shootingPlayerId") or details.get("scoringPlayerId"),
+            details.get("goalieInNetId", -1),
+            details["eventOwnerTeamId"],
+            play["situationCode"],
+            play.get("prevDescKey"),
+            play.get("prevTypeCode"),
+            play.get("timeSinceLastEvent"),
+            play.get("prevXCoord"),
+            play.get("prevYCoord"),
+        )
+        for play in shots
+        for details in (play["details"],)
+    ]
+    names = (
+        "eventId",
+        "homeTeamDefendingSide",
+        "periodNumber",
+        "periodType",
+        "sortOrder",
+        "timeInPeriod",
+        "timeRemaining",
+        "xCoord",
+        "yCoord",
+        "zoneCode",
+        "shotType",
+        "shootingPlayerId",
+        "goalieInNetId",
+        "eventOwnerTeamId",
+        "situationCode",
+        "prevDescKey",
+        "prevTypeCode",
+        "timeSinceLastEvent",
+        "prevXCoord",
+        "prevYCoord",
+    )
+    columns = dict(zip(names, map(list, zip(*rows, strict=True)), strict=True)) if rows else {n: [] for n in names}
+    columns |= {name: values[mask].tolist() for name, values in game_columns.items()}
+    columns["isGoal"] = (types[mask] == "goal").tolist()
+    for name in ("timeInPeriod", "timeRemaining"):
+        columns[name] = time2sec_array(array(columns[name], dtype=object)).tolist() if rows else []
+    return columns
+
+
+def sog_frame(raw_games: Iterable[tuple[str, dict[str, Any]]], chunk_size: int = 256) -> DataFrame:
+    """Builds SOG DataFrame straight from raw games, bypassing `Play` and `SOG` dataclasses.
+
+    Games are flattened in chunks, so only the extracted shot columns are kept in memory.
+
+    Args:
+        raw_games (Iterable[tuple[str, dict[str, Any]]]): (key, raw game) pairs, already enriched.
+        chunk_size (int, optional): Number of games flattened at once. Defaults to 256.
+
+    Returns:
+        DataFrame: Same data as `XGPreprocessor.format` output.
+    """
+    columns: dict[str, list[Any]] = {name: [] for name in SOG_COLUMNS}
+    for chunk in _chunks(raw_games, chunk_size):
+        for name, values in shot_columns(*flatten_games(chunk)).items():
+            columns[name].extend(values)
+    if not columns["eventId"]:
+        return DataFrame()
+    return DataFrame(columns)
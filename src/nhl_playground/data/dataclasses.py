@@ -1,20 +1,26 @@
 from dataclasses import dataclass
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from numpy import ndarray
 
+if TYPE_CHECKING:
+    from nhl_playground.data.timeline import GameTimeline
 
-@dataclass
+
+@dataclass(slots=True)
 class SOG:
     """Shot-on-goal dataclass."""
 
+    gameId: int
+    homeTeamId: int
+    awayTeamId: int
     eventId: int
     homeTeamDefendingSide: str
     periodNumber: int
     periodType: str
     sortOrder: int
     timeInPeriod: int
-    timeRemaining: str
+    timeRemaining: int
     isGoal: bool
     xCoord: int
     yCoord: int
@@ -24,15 +30,19 @@ class SOG:
     goalieInNetId: int | None
     eventOwnerTeamId: int
     situationCode: int
+    gameDate: str | None = None
 
     # Values add by enrichments
     prevDescKey: str | None = None
     prevTypeCode: int | None = None
+    timeSinceLastEvent: int | None = None
+    prevXCoord: int | None = None
+    prevYCoord: int | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class Play:
-    """Play dataclass."""
+    """Play dataclass. Uses slots, string values are interned by `GameLoader` to keep seasons compact."""
 
     eventId: int
     homeTeamDefendingSide: str
@@ -47,9 +57,12 @@ class Play:
     # Values added by enrichments
     prevDescKey: str | None = None
     prevTypeCode: int | None = None
+    timeSinceLastEvent: int | None = None
+    prevXCoord: int | None = None
+    prevYCoord: int | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class Game:
     """Game dataclass. Utilizes Play dataclass."""
 
@@ -57,6 +70,8 @@ class Game:
     homeTeam: dict[str, Any]
     awayTeam: dict[str, Any]
     plays: ndarray[Play]
+    gameDate: str | None = None
+    timeline: "GameTimeline | None" = None
 
     @property
     def homeTeam_id(self) -> int:
@@ -1,11 +1,33 @@
+from collections.abc import Iterable, Iterator, Mapping
+from sys import intern
 from typing import TYPE_CHECKING, Any
 
-from numpy import array, concatenate
+from numpy import array
 
 from nhl_playground.data.dataclasses import Game, Play
+from nhl_playground.data.timeline import GameTimeline
+from nhl_playground.instrumentation import NO_INSTRUMENTATION, Instrumentation
 
 if TYPE_CHECKING:
-    from numpy.typing import ArrayLike
+    from collections.abc import KeysView
+
+
+# Play values repeated across plays, shared between plays instead of keeping a copy per play.
+INTERNED_KEYS: frozenset[str] = frozenset(
+    ("homeTeamDefendingSide", "timeInPeriod", "timeRemaining", "typeDescKey", "prevDescKey", "situationCode")
+)
+_PERIOD_DESCRIPTORS: dict[tuple, dict[str, str | int]] = {}
+
+
+def _intern_value(value: Any) -> Any:
+    return intern(value) if isinstance(value, str) else value
+
+
+def _shared_period_descriptor(descriptor: dict[str, str | int] | None) -> dict[str, str | int] | None:
+    """Gets shared instance of a period descriptor. Descriptors must not be mutated."""
+    if descriptor is None:
+        return None
+    return _PERIOD_DESCRIPTORS.setdefault(tuple(descriptor.items()), descriptor)
 
 
 class GameLoader:
@@ -20,6 +42,7 @@ class GameLoader:
             homeTeam=raw_game["homeTeam"],
             awayTeam=raw_game["awayTeam"],
             plays=plays,
+            gameDate=raw_game.get("gameDate"),
         )
 
     @classmethod
@@ -37,15 +60,86 @@ class GameLoader:
             "typeDescKey",
             "prevDescKey",
             "prevTypeCode",
+            "timeSinceLastEvent",
+            "prevXCoord",
+            "prevYCoord",
         ),
     ) -> Play:
         """Loads play into Play dataclass."""
         other_keys = {k for k in raw_play if k not in mutual_keys}
 
-        mutual_data = {k: raw_play.get(k) for k in mutual_keys}
-        other = {k: raw_play.get(k) for k in other_keys}
+        mutual_data = {k: cls._compact_value(k, raw_play.get(k)) for k in mutual_keys}
+        mutual_data["periodDescriptor"] = _shared_period_descriptor(mutual_data["periodDescriptor"])
+        other = {k: cls._compact_value(k, raw_play.get(k)) for k in other_keys}
+        if details := other.get("details"):
+            other["details"] = {k: _intern_value(v) for k, v in details.items()}
         return Play(other=other, **mutual_data)
 
+    @staticmethod
+    def _compact_value(key: str, value: Any) -> Any:
+        """Interns value if it is repeated across plays."""
+        return _intern_value(value) if key in INTERNED_KEYS else value
+
+
+RawGames = Mapping[str, dict[str, Any]] | Iterable[tuple[str, dict[str, Any]]]
+
+
+def iter_raw_items(raw_games: RawGames) -> Iterator[tuple[str, dict[str, Any]]]:
+    """Iterates over (key, raw game) pairs of a dictionary or of an already streamed iterable."""
+    return iter(raw_games.items()) if isinstance(raw_games, Mapping) else iter(raw_games)
+
+
+class GameStore:
+    """Append-friendly store of games with lookup by game key.
+
+    Games are kept in a list (amortized O(1) appends) together with an index of their positions by `Game.key`.
+    Appending a game with an already stored key replaces the stored game in place, e.g. re-scraped unfinished games.
+    """
+
+    def __init__(self, games: Iterable[Game] = ()) -> None:
+        """Store constructor."""
+        self._games: list[Game] = []
+        self._index: dict[str, int] = {}
+        self.extend(games)
+
+    def append(self, game: Game) -> None:
+        """Appends game or replaces stored game with the same key."""
+        if (position := self._index.get(game.key)) is not None:
+            self._games[position] = game
+            return
+        self._index[game.key] = len(self._games)
+        self._games.append(game)
+
+    def extend(self, games: Iterable[Game]) -> None:
+        """Appends games from an iterable, consuming it lazily."""
+        for game in games:
+            self.append(game)
+
+    def get(self, key: str, default: Game | None = None) -> Game | None:
+        """Gets game by its key."""
+        position = self._index.get(key)
+        return default if position is None else self._games[position]
+
+    def keys(self) -> "KeysView[str]":
+        """Keys of stored games in insertion order."""
+        return self._index.keys()
+
+    def __contains__(self, key: object) -> bool:
+        """Checks if game with a given key is stored."""
+        return key in self._index
+
+    def __getitem__(self, idx: int) -> Game:
+        """Gets game based on index."""
+        return self._games[idx]
+
+    def __iter__(self) -> Iterator[Game]:
+        """Iterates over stored games in insertion order."""
+        return iter(self._games)
+
+    def __len__(self) -> int:
+        """Number of stored games."""
+        return len(self._games)
+
 
 class BaseLoader:
     """Base class for data loaders."""
@@ -54,13 +148,26 @@ class BaseLoader:
         """Abstract method for loaders."""
         raise NotImplementedError
 
+    def iter_load(self, raw_data: RawGames) -> Iterator[Any]:
+        """Abstract method for lazily loading data without storing it in the loader."""
+        raise NotImplementedError
+
 
 class PbPDataLoader(BaseLoader):
     """Play-by-play data loader."""
 
-    def __init__(self):
-        """PbP loader constructor."""
-        self.games: ArrayLike[Game] = array([])
+    def __init__(self, instrumentation: Instrumentation | None = None, timelines: bool = False):
+        """PbP loader constructor.
+
+        Args:
+            instrumentation (Instrumentation | None, optional): Collector of loaded games and plays counts.
+                Defaults to None.
+            timelines (bool, optional): Whether to build `Game.timeline` of loaded games for situational queries,
+                see `nhl_playground.data.timeline.TimelineIndex`. Defaults to False.
+        """
+        self.games = GameStore()
+        self.instrumentation = instrumentation or NO_INSTRUMENTATION
+        self.timelines = timelines
 
     def __getitem__(self, idx: int) -> Game | None:
         """Gets game based on index."""
@@ -72,9 +179,28 @@ class PbPDataLoader(BaseLoader):
         """Length attribute."""
         return len(self.games)
 
-    def load(self, raw_games: dict[str, Any]) -> None:
-        """Loads games from dictionary."""
-        raw_games_list = [game | {"key": key} for key, game in array(list(raw_games.items()))]
-        games = array([GameLoader.load_game(raw_game) for raw_game in raw_games_list])
-
-        self.games = concatenate((self.games, games))
+    def __iter__(self) -> Iterator[Game]:
+        """Iterates over loaded games."""
+        return iter(self.games)
+
+    def get(self, key: str) -> Game | None:
+        """Gets game based on its key."""
+        return self.games.get(key)
+
+    def load(self, raw_games: RawGames) -> None:
+        """Loads games from dictionary or from an iterable of (key, game) pairs.
+
+        Games are appended to already loaded games one by one, so loading in batches does not copy loaded games.
+        Games with already loaded keys replace the loaded ones.
+        """
+        self.games.extend(self.iter_load(raw_games))
+
+    def iter_load(self, raw_games: RawGames) -> Iterator[Game]:
+        """Lazily loads games one by one without storing them in the loader."""
+        for key, game in iter_raw_items(raw_games):
+            self.instrumentation.count("games")
+            self.instrumentation.count("plays", len(game["plays"]))
+            loaded = GameLoader.load_game(game | {"key": key})
+            if self.timelines:
+                loaded.timeline = GameTimeline.from_raw(key, game)
+            yield loaded
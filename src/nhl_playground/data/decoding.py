@@ -0,0 +1,185 @@
+import json
+from collections.abc import Callable
+from dataclasses import fields
+from threading import local
+from typing import Any
+
+from nhl_playground.data.dataclasses import Play
+
+JsonInput = str | bytes | bytearray
+# Nested mapping of kept fields. None keeps the whole value, "*" matches every key. Lists are projected item-wise.
+Projection = dict[str, "Projection | None"]
+
+BACKENDS: tuple[str, ...] = ("orjson", "simdjson", "json")
+PLAY_FIELDS: tuple[str, ...] = (
+    *(field.name for field in fields(Play) if field.name != "other"),
+    "situationCode",
+)
+DETAILS_FIELDS: tuple[str, ...] = (
+    "xCoord",
+    "yCoord",
+    "zoneCode",
+    "shotType",
+    "shootingPlayerId",
+    "scoringPlayerId",
+    "goalieInNetId",
+    "eventOwnerTeamId",
+)
+# Fields of a raw PbP game used by loading, enrichments and preprocessing.
+PBP_PROJECTION: Projection = {
+    "key": None,
+    "homeTeam": None,
+    "awayTeam": None,
+    "gameState": None,
+    "gameDate": None,
+    "plays": {**dict.fromkeys(PLAY_FIELDS), "details": dict.fromkeys(DETAILS_FIELDS)},
+}
+
+
+def _orjson_loads() -> Callable[[JsonInput], Any]:
+    import orjson
+
+    return orjson.loads
+
+
+def _simdjson_loads() -> Callable[[JsonInput], Any]:
+    import simdjson
+
+    # Parser reuses its buffers and invalidates the previous document, so every thread gets its own parser.
+    parsers = local()
+
+    def loads(data: JsonInput) -> Any:
+        if not hasattr(parsers, "parser"):
+            parsers.parser = simdjson.Parser()
+        return parsers.parser.parse(data.encode() if isinstance(data, str) else bytes(data))
+
+    return loads
+
+
+_LOADERS: dict[str, Callable[[], Callable[[JsonInput], Any]]] = {
+    "orjson": _orjson_loads,
+    "simdjson": _simdjson_loads,
+    "json": lambda: json.loads,
+}
+
+
+def available_backends() -> list[str]:
+    """Gets installed JSON backends, the fastest first."""
+    backends = []
+    for backend in BACKENDS:
+        try:
+            _LOADERS[backend]()
+        except ImportError:
+            continue
+        backends.append(backend)
+    return backends
+
+
+def _materialize(value: Any) -> Any:
+    """Converts lazy simdjson values to Python objects, other values are returned as they are."""
+    if hasattr(value, "as_dict"):
+        return value.as_dict()
+    if hasattr(value, "as_list"):
+        return value.as_list()
+    return value
+
+
+def compile_projection(projection: Projection | None, lazy: bool = False) -> Callable[[Any], Any]:
+    """Compiles projection into a function keeping only projected fields of a decoded value.
+
+    Fields kept whole are copied by a single comprehension, so projecting is much cheaper than walking the value.
+
+    Args:
+        projection (Projection | None): Kept fields, None keeps the whole value.
+        lazy (bool, optional): Flag that values are lazy simdjson values, which kept fields are converted from.
+            Defaults to False.
+
+    Returns:
+        Callable[[Any], Any]: Function projecting decoded values (dictionaries or lists of them).
+    """
+    if projection is None:
+        return _materialize if lazy else _identity
+    if "*" in projection:
+        each = compile_projection(projection["*"], lazy)
+        return _listwise(lambda value: {key: each(value[key]) for key in value})
+    leaves = tuple(key for key, sub in projection.items() if sub is None)
+    nested = tuple((key, compile_projection(sub, lazy)) for key, sub in projection.items() if sub is not None)
+    return _listwise(_project_fields(_copy_leaves(leaves, lazy), nested))
+
+
+def _copy_leaves(leaves: tuple[str, ...], lazy: bool) -> Callable[[Any], dict[str, Any]]:
+    """Compiles copying of fields kept whole, lazy simdjson values are converted to Python objects."""
+    if lazy:
+        return lambda value: {key: _materialize(value[key]) for key in leaves if key in value}
+    return lambda value: {key: value[key] for key in leaves if key in value}
+
+
+def _project_fields(
+    copy_leaves: Callable[[Any], dict[str, Any]],
+    nested: tuple[tuple[str, Callable[[Any], Any]], ...],
+) -> Callable[[Any], dict[str, Any]]:
+    """Compiles projection of a dictionary from copied leaves and projected nested fields."""
+
+    def project(value: Any) -> dict[str, Any]:
+        projected = copy_leaves(value)
+        for key, fn in nested:
+            if key in value:
+                projected[key] = fn(value[key])
+        return projected
+
+    return project
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+def _listwise(project: Callable[[Any], Any]) -> Callable[[Any], Any]:
+    """Extends projection of a dictionary to lists of dictionaries, other values (e.g. nulls) are kept."""
+
+    def project_any(value: Any) -> Any:
+        if isinstance(value, dict) or hasattr(value, "as_dict"):
+            return project(value)
+        if isinstance(value, list) or hasattr(value, "as_list"):
+            return [project_any(item) for item in value]
+        return value
+
+    return project_any
+
+
+class JsonDecoder:
+    """Pluggable JSON decoder using the fastest installed backend (orjson, simdjson, stdlib json).
+
+    With a projection only the projected fields are kept. With simdjson the other fields are never converted
+    to Python objects, with other backends they are dropped right after parsing, so they do not occupy memory.
+    """
+
+    def __init__(self, backend: str = "auto", projection: Projection | None = None) -> None:
+        """Decoder constructor.
+
+        Args:
+            backend (str, optional): One of `BACKENDS` or "auto" for the fastest installed one. Defaults to "auto".
+            projection (Projection | None, optional): Kept fields, e.g. `PBP_PROJECTION`. Defaults to None (all).
+
+        Raises:
+            ImportError: When the requested backend is not installed.
+        """
+        self.backend = available_backends()[0] if backend == "auto" else backend
+        self.projection = projection
+        self._loads = _LOADERS[self.backend]()
+        self._project = compile_projection(projection, lazy=self.backend == "simdjson")
+
+    def decode(self, data: JsonInput) -> Any:
+        """Decodes JSON document."""
+        return self._project(self._loads(data))
+
+
+_DEFAULT_DECODER: JsonDecoder | None = None
+
+
+def default_decoder() -> JsonDecoder:
+    """Gets shared decoder with the fastest installed backend and no projection."""
+    global _DEFAULT_DECODER
+    if _DEFAULT_DECODER is None:
+        _DEFAULT_DECODER = JsonDecoder()
+    return _DEFAULT_DECODER
@@ -1,38 +1,124 @@
-from dataclasses import dataclass
+from collections import deque
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass, field
 from typing import Any
 
+from nhl_playground.data.utils import time2sec
+
 
 @dataclass
 class Enrichment:
-    """Base enrichment class."""
+    """Base enrichment class.
+
+    Enrichments write their `outputs` fields into each play in place. `window` declares how many preceding plays
+    of the game the enrichment needs to see.
+    """
 
     name: str = "Enrichment"
+    window: int = 0
+    outputs: tuple[str, ...] = ()
 
-    def __call__(self, raw_data: dict[str, Any]) -> dict[str, Any]:
-        """Abstract method to be implemented by subclasses."""
+    def enrich_play(self, play: dict[str, Any], history: Sequence[dict[str, Any]]) -> None:
+        """Abstract method to be implemented by subclasses.
+
+        Args:
+            play (dict[str, Any]): Raw play to be enriched in place.
+            history (Sequence[dict[str, Any]]): Up to `window` preceding plays, the most recent one last.
+        """
         raise NotImplementedError
 
+    def __call__(self, raw_data: dict[str, Any]) -> dict[str, Any]:
+        """Applies enrichment to a raw game."""
+        return EnrichmentPipeline([self])(raw_data)
+
+
+@dataclass
+class EnrichmentPipeline:
+    """Sequence of enrichments applied in a single pass over plays of a game."""
+
+    enrichments: list[Enrichment] = field(default_factory=list)
+
+    @property
+    def window(self) -> int:
+        """Number of preceding plays needed by the enrichments."""
+        return max((e.window for e in self.enrichments), default=0)
+
+    def add(self, enrichment: Enrichment) -> None:
+        """Appends enrichment to the pipeline."""
+        self.enrichments.append(enrichment)
+
+    def __call__(self, raw_data: dict[str, Any]) -> dict[str, Any]:
+        """Runs all enrichments on every play of a raw game, writing their fields in place."""
+        if not self.enrichments:
+            return raw_data
+        history: deque[dict[str, Any]] = deque(maxlen=self.window)
+        for play in raw_data["plays"]:
+            for enrichment in self.enrichments:
+                enrichment.enrich_play(play, history)
+            history.append(play)
+        return raw_data
+
+    def __iter__(self) -> Iterator[Enrichment]:
+        """Iterates over enrichments."""
+        return iter(self.enrichments)
+
+    def __len__(self) -> int:
+        """Number of enrichments."""
+        return len(self.enrichments)
+
 
 @dataclass
 class AddPrevPlayName(Enrichment):
     """Simple enrichment that adds previous play name and type code to each play."""
 
     name: str = "AddPrevPlayName"
+    window: int = 1
+    outputs: tuple[str, ...] = ("prevDescKey", "prevTypeCode")
 
-    def __call__(self, raw_data: dict[str, Any]) -> dict[str, Any]:
-        """Adds previous play name and type code to each play."""
-        raw_data["plays"] = [
-            play
-            | {
-                "prevDescKey": raw_data["plays"][i - 1].get("typeDescKey"),
-                "prevTypeCode": raw_data["plays"][i - 1].get("typeCode"),
-            }
-            if i > 0
-            else play
-            | {
-                "prevDescKey": None,
-                "prevTypeCode": -1,
-            }
-            for i, play in enumerate(raw_data["plays"])
-        ]
-        return raw_data
+    def enrich_play(self, play: dict[str, Any], history: Sequence[dict[str, Any]]) -> None:
+        """Adds previous play name and type code to the play."""
+        if history:
+            play["prevDescKey"] = history[-1].get("typeDescKey")
+            play["prevTypeCode"] = history[-1].get("typeCode")
+        else:
+            play["prevDescKey"] = None
+            play["prevTypeCode"] = -1
+
+
+@dataclass
+class AddTimeSinceLastEvent(Enrichment):
+    """Adds number of seconds elapsed since the previous play of the same period."""
+
+    name: str = "AddTimeSinceLastEvent"
+    window: int = 1
+    outputs: tuple[str, ...] = ("timeSinceLastEvent",)
+
+    def enrich_play(self, play: dict[str, Any], history: Sequence[dict[str, Any]]) -> None:
+        """Adds time since the previous play, None for the first play of a period."""
+        prev = history[-1] if history else None
+        if prev and prev["periodDescriptor"]["number"] == play["periodDescriptor"]["number"]:
+            play["timeSinceLastEvent"] = time2sec(play["timeInPeriod"]) - time2sec(prev["timeInPeriod"])
+        else:
+            play["timeSinceLastEvent"] = None
+
+
+@dataclass
+class AddPrevPlayCoords(Enrichment):
+    """Adds coordinates of the previous play."""
+
+    name: str = "AddPrevPlayCoords"
+    window: int = 1
+    outputs: tuple[str, ...] = ("prevXCoord", "prevYCoord")
+
+    def enrich_play(self, play: dict[str, Any], history: Sequence[dict[str, Any]]) -> None:
+        """Adds previous play coordinates, None if the previous play has none."""
+        details = history[-1].get("details", {}) if history else {}
+        play["prevXCoord"] = details.get("xCoord")
+        play["prevYCoord"] = details.get("yCoord")
+
+
+ENRICHMENTS: dict[str, type[Enrichment]] = {
+    "add_prev_play_name": AddPrevPlayName,
+    "add_time_since_last_event": AddTimeSinceLastEvent,
+    "add_prev_play_coords": AddPrevPlayCoords,
+}
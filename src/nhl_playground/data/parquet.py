@@ -0,0 +1,159 @@
+from collections.abc import Callable
+from dataclasses import fields
+from types import NoneType
+from typing import TYPE_CHECKING, Any, get_args, get_type_hints
+
+from pandas import DataFrame, Int64Dtype, Series, to_numeric
+
+from nhl_playground.data.dataclasses import SOG
+from nhl_playground.data.utils import season_from_game_id
+
+if TYPE_CHECKING:
+    from types import ModuleType
+
+    import pyarrow
+
+PARTITION_COLUMN = "season"
+
+
+def _import_pyarrow() -> tuple["ModuleType", "ModuleType"]:
+    """Imports optional pyarrow dependency."""
+    try:
+        import pyarrow
+        import pyarrow.dataset
+    except ImportError as e:
+        raise ImportError("Parquet storage requires pyarrow. Install it with `poetry install --extras parquet`.") from e
+    return pyarrow, pyarrow.dataset
+
+
+def _base_type(annotation: Any) -> type:
+    """Gets base type of an annotation, e.g. `int` for `int | None`."""
+    args = [arg for arg in get_args(annotation) if arg is not NoneType]
+    return args[0] if args else annotation
+
+
+def sog_column_types() -> dict[str, type]:
+    """Gets base type of every SOG column."""
+    hints = get_type_hints(SOG)
+    return {field.name: _base_type(hints[field.name]) for field in fields(SOG)}
+
+
+def sog_schema(extra: "list[pyarrow.Field] | None" = None) -> "pyarrow.Schema":
+    """Arrow schema of SOG dataset derived from `SOG` dataclass.
+
+    Integer fields are nullable int64, string fields are dictionary encoded and the dataset is partitioned
+    by `season` column. Extra fields (e.g. sequence features) follow the SOG fields.
+    """
+    pa, _ = _import_pyarrow()
+    arrow_types = {
+        int: pa.int64(),
+        float: pa.float64(),
+        bool: pa.bool_(),
+        str: pa.dictionary(pa.int32(), pa.string()),
+    }
+    columns = [pa.field(name, arrow_types[base]) for name, base in sog_column_types().items()]
+    return pa.schema([*columns, *(extra or []), pa.field(PARTITION_COLUMN, pa.int64())])
+
+
+def _extra_fields(frame: DataFrame) -> "list[pyarrow.Field]":
+    """Gets Arrow fields of frame columns that are not SOG fields, their types are inferred from the data."""
+    pa, _ = _import_pyarrow()
+    extra = [name for name in frame.columns if name not in sog_column_types() and name != PARTITION_COLUMN]
+    return list(pa.Schema.from_pandas(frame[extra], preserve_index=False)) if extra else []
+
+
+_CASTS: dict[type, Callable[[Series], Series]] = {
+    int: lambda values: to_numeric(values).astype("Int64"),
+    bool: lambda values: values.astype(bool),
+    str: lambda values: values.astype("category"),
+}
+
+
+def coerce_sog_frame(data: DataFrame) -> DataFrame:
+    """Casts SOG DataFrame columns to their schema dtypes and adds `season` column.
+
+    Integers become nullable `Int64` (e.g. missing `goalieInNetId` or coordinates), strings become categorical.
+    """
+    frame = data.reset_index(drop=True).copy()
+    for name, base in sog_column_types().items():
+        if name in frame and base in _CASTS:
+            frame[name] = _CASTS[base](frame[name])
+    frame[PARTITION_COLUMN] = frame["gameId"].map(season_from_game_id).astype("Int64")
+    return frame
+
+
+def write_sog_parquet(data: DataFrame, root: str) -> None:
+    """Writes SOG DataFrame as Parquet dataset partitioned by season.
+
+    Seasons present in data replace their already stored partitions, other seasons are kept.
+
+    Args:
+        data (DataFrame): Output of `XGPreprocessor.format`.
+        root (str): Root directory of the dataset.
+    """
+    pa, _ = _import_pyarrow()
+    frame = coerce_sog_frame(data)
+    table = pa.Table.from_pandas(frame, schema=sog_schema(_extra_fields(frame)), preserve_index=False)
+    if dropped := set(frame.columns) - set(table.column_names):
+        raise ValueError(f"Columns missing in the Parquet schema: {sorted(dropped)}")
+    _write_partitioned(table, root)
+
+
+def _write_partitioned(table: "pyarrow.Table", root: str) -> None:
+    """Writes Arrow table as dataset partitioned by season, replacing stored partitions of the same seasons."""
+    pa, ds = _import_pyarrow()
+    ds.write_dataset(
+        table,
+        root,
+        format="parquet",
+        partitioning=ds.partitioning(pa.schema([table.schema.field(PARTITION_COLUMN)]), flavor="hive"),
+        existing_data_behavior="delete_matching",
+        basename_template="part-{i}.parquet",
+    )
+
+
+def read_sog_parquet(
+    root: str,
+    columns: list[str] | None = None,
+    seasons: list[int] | None = None,
+) -> DataFrame:
+    """Reads SOG Parquet dataset, loading only requested columns and seasons.
+
+    Args:
+        root (str): Root directory of the dataset.
+        columns (list[str] | None, optional): Columns to load. Defaults to all columns.
+        seasons (list[int] | None, optional): Seasons to load, e.g. [20222023, 20232024]. Defaults to all seasons.
+
+    Returns:
+        DataFrame: SOG data with nullable integer and categorical dtypes, extra columns (e.g. sequence features)
+            stored in any partition included.
+    """
+    pa, ds = _import_pyarrow()
+    stored = pa.unify_schemas(
+        [fragment.physical_schema for fragment in ds.dataset(root, format="parquet").get_fragments()],
+        promote_options="permissive",
+    )
+    sog_names = set(sog_column_types()) | {PARTITION_COLUMN}
+    extra = [field for field in stored if field.name not in sog_names]
+    dataset = ds.dataset(root, format="parquet", partitioning="hive", schema=sog_schema(extra))
+    row_filter = ds.field(PARTITION_COLUMN).isin(seasons) if seasons else None
+    table = dataset.to_table(columns=columns, filter=row_filter)
+    return table.to_pandas(types_mapper={pa.int64(): Int64Dtype()}.get)
+
+
+def write_partitioned(data: DataFrame, root: str) -> None:
+    """Writes DataFrame with `season` column, e.g. team stats or xG aggregates, as dataset partitioned by season.
+
+    Seasons present in data replace their already stored partitions, other seasons are kept.
+    """
+    pa, _ = _import_pyarrow()
+    _write_partitioned(pa.Table.from_pandas(data, preserve_index=False), root)
+
+
+def read_partitioned(root: str, seasons: list[int] | None = None) -> DataFrame:
+    """Reads Parquet dataset written by `write_partitioned`, loading only requested seasons."""
+    pa, ds = _import_pyarrow()
+    partitioning = ds.partitioning(pa.schema([pa.field(PARTITION_COLUMN, pa.int64())]), flavor="hive")
+    dataset = ds.dataset(root, format="parquet", partitioning=partitioning)
+    row_filter = ds.field(PARTITION_COLUMN).isin(seasons) if seasons else None
+    return dataset.to_table(filter=row_filter).to_pandas()
@@ -1,24 +1,62 @@
 from abc import ABC, abstractclassmethod
+from collections import deque
+from collections.abc import Iterator, Mapping
+from concurrent.futures import Future, ProcessPoolExecutor
+from copy import copy
+from itertools import islice
 from typing import Any, TypeVar
 
-from numpy import append, array, frompyfunc
-from pandas import DataFrame
+from numpy import frompyfunc
+from pandas import DataFrame, concat
 
-from nhl_playground.data.dataclasses import Game, Play
-from nhl_playground.data.dataloaders import BaseLoader
-from nhl_playground.data.enrichment import AddPrevPlayName, Enrichment
+from nhl_playground.data.columnar import sog_frame
+from nhl_playground.data.dataclasses import SOG, Game, Play
+from nhl_playground.data.dataloaders import BaseLoader, PbPDataLoader, RawGames, iter_raw_items
+from nhl_playground.data.enrichment import ENRICHMENTS, Enrichment, EnrichmentPipeline
+from nhl_playground.data.sequence import SequenceFeatures, SequenceRecorder
 from nhl_playground.data.utils import play2sog
+from nhl_playground.instrumentation import NO_INSTRUMENTATION, Instrumentation
 
 T = TypeVar("T")
 
+# Preprocessor used by worker processes, set once per process by `_init_worker`.
+_WORKER_PREPROCESSOR: "BasePreprocessor | None" = None
+
+
+def _init_worker(preprocessor: "BasePreprocessor") -> None:
+    global _WORKER_PREPROCESSOR
+    _WORKER_PREPROCESSOR = preprocessor
+
+
+def _format_shard(shard: list[tuple[str, dict[str, Any]]]) -> DataFrame:
+    return _WORKER_PREPROCESSOR.format(iter(shard))
+
 
 class BasePreprocessor(ABC):
     """Base class for preprocessors."""
 
-    def __init__(self, loader: BaseLoader | None = None) -> None:
-        """Base constructor."""
-        self.enrichments = array([])
+    def __init__(
+        self,
+        loader: BaseLoader | None = None,
+        jobs: int = 1,
+        shard_size: int = 64,
+        instrumentation: Instrumentation | None = None,
+    ) -> None:
+        """Base constructor.
+
+        Args:
+            loader (BaseLoader | None, optional): Loader of raw data. Defaults to None.
+            jobs (int, optional): Number of worker processes, 1 runs everything in the current process. Defaults to 1.
+            shard_size (int, optional): Number of games sent to a worker at once. Defaults to 64.
+            instrumentation (Instrumentation | None, optional): Collector of stage timings and counters.
+                Stages of worker processes are not measured. Defaults to None.
+        """
+        self.enrichments = EnrichmentPipeline()
+        self.sequence_features: SequenceFeatures | None = None
+        self.instrumentation = instrumentation or NO_INSTRUMENTATION
         self._loader = loader
+        self.jobs = jobs
+        self.shard_size = shard_size
 
     @property
     def loader(self) -> BaseLoader | None:
@@ -30,35 +68,125 @@ class BasePreprocessor(ABC):
         """Loader setter."""
         self._loader = loader
 
-    def add_enrichment(self, enrichment: Enrichment | str) -> None:
-        """Appends enrichment to the sequence."""
+    def add_enrichment(self, enrichment: Enrichment | type[Enrichment] | str) -> None:
+        """Appends enrichment to the sequence. Accepts enrichment instance, class or its name from `ENRICHMENTS`."""
         if isinstance(enrichment, str):
-            enrichment_mapping = {"add_prev_play_name": AddPrevPlayName}
-            if e := enrichment_mapping.get(enrichment):
-                self.enrichments = append(self.enrichments, e())
+            if e := ENRICHMENTS.get(enrichment):
+                self.enrichments.add(e())
             else:
                 raise ValueError("Invalid enrichment name.")
+        elif isinstance(enrichment, Enrichment):
+            self.enrichments.add(enrichment)
         else:
-            self.enrichments = append(self.enrichments, enrichment())
+            self.enrichments.add(enrichment())
 
     def apply_enrichments(self, raw_data: dict[str, Any]) -> dict[str, Any]:
-        """Applies a sequence of added enrichments to input data."""
-        res = raw_data
-        for fn in self.enrichments:
-            res = fn(raw_data)
-        return res
+        """Applies all added enrichments to input data in a single pass over its plays."""
+        with self.instrumentation.stage("enrich"):
+            return self.enrichments(raw_data)
+
+    def add_sequence_features(self, features: SequenceFeatures | None = None) -> None:
+        """Enables sequence context features of shots, emitted as extra columns of the output.
+
+        Args:
+            features (SequenceFeatures | None, optional): Feature stage, e.g. with a different window.
+                Defaults to None (`SequenceFeatures()`).
+        """
+        self.sequence_features = features or SequenceFeatures()
+
+    def _sequence_recorder(self) -> SequenceRecorder | None:
+        """Gets recorder of sequence features computed per `shard_size` games, None if they are disabled."""
+        if self.sequence_features is None:
+            return None
+        return SequenceRecorder(self.sequence_features, chunk_size=self.shard_size)
+
+    def _record_plays(self, raw: RawGames, recorder: SequenceRecorder | None) -> RawGames:
+        """Passes plays of raw games to the sequence features recorder while the games are read."""
+        if recorder is None:
+            return raw
+        if isinstance(raw, Mapping):
+            for key, game in raw.items():
+                self._record_game(recorder, key, game)
+            return raw
+        return self._iter_recorded(raw, recorder)
+
+    def _iter_recorded(self, raw: RawGames, recorder: SequenceRecorder) -> Iterator[tuple[str, dict[str, Any]]]:
+        for key, game in raw:
+            self._record_game(recorder, key, game)
+            yield key, game
+
+    def _record_game(self, recorder: SequenceRecorder, key: str, game: dict[str, Any]) -> None:
+        with self.instrumentation.stage("sequence_features"):
+            recorder.add(key, game)
+
+    def _add_sequence_features(self, data: DataFrame, recorder: SequenceRecorder | None) -> DataFrame:
+        """Adds sequence features of shots computed by the recorder."""
+        if recorder is None:
+            return data
+        with self.instrumentation.stage("sequence_features"):
+            return recorder.join(data)
 
     @abstractclassmethod
     def format(self, obj: T) -> DataFrame:
         """Formats input object into pd.DataFrame."""
 
+    def format_parallel(self, raw: RawGames) -> DataFrame:
+        """Formats raw games in a pool of `jobs` worker processes.
+
+        Games are sharded into chunks of `shard_size` games, every shard is enriched, loaded and formatted by a worker
+        and results are concatenated in the order of the input, so the output does not depend on scheduling.
+        At most two shards per worker are in flight, so streamed input is not read into memory at once.
+        Games are not stored in the loader.
+        """
+        with (
+            ProcessPoolExecutor(
+                max_workers=self.jobs,
+                initializer=_init_worker,
+                initargs=(self._worker_copy(),),
+            ) as executor,
+            self.instrumentation.stage("format_parallel"),
+        ):
+            frames = list(self._ordered_results(executor, iter_raw_items(raw)))
+        self.instrumentation.count("shots", sum(len(frame) for frame in frames))
+        if not frames:
+            return DataFrame()
+        return concat(frames, ignore_index=True).infer_objects()
+
+    def _worker_copy(self) -> "BasePreprocessor":
+        """Gets serial copy of the preprocessor with an empty loader, to be sent to worker processes."""
+        worker = copy(self)
+        worker.jobs = 1
+        worker._loader = type(self._loader)() if self._loader is not None else None
+        return worker
+
+    def _ordered_results(self, executor: ProcessPoolExecutor, games: Iterator[tuple[str, Any]]) -> Iterator[DataFrame]:
+        """Submits shards of games to the executor and yields their results in submission order."""
+        pending: deque[Future] = deque()
+        while shard := list(islice(games, self.shard_size)):
+            pending.append(executor.submit(_format_shard, shard))
+            if len(pending) >= 2 * self.jobs:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
 
 class XGPreprocessor(BasePreprocessor):
     """Preprocessor for xG models."""
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        loader: BaseLoader | None = None,
+        jobs: int = 1,
+        shard_size: int = 64,
+        instrumentation: Instrumentation | None = None,
+    ) -> None:
         """XG Preprocessor constructor."""
-        super().__init__(self)
+        super().__init__(
+            loader or PbPDataLoader(instrumentation=instrumentation),
+            jobs=jobs,
+            shard_size=shard_size,
+            instrumentation=instrumentation,
+        )
 
     @staticmethod
     def _is_shot(play: Play) -> bool:
@@ -73,11 +201,56 @@ class XGPreprocessor(BasePreprocessor):
 
         return game
 
-    def format(self, raw: dict[str, Any]) -> DataFrame:
-        """Formats raw data to Pandas DataFrame while applying all enrichments and SOG filtering."""
-        enriched_raw = {key: self.apply_enrichments(game) for key, game in raw.items()}
-        self.loader.load(enriched_raw)
+    def format(self, raw: RawGames) -> DataFrame:
+        """Formats raw data to Pandas DataFrame while applying all enrichments and SOG filtering.
+
+        Dictionary of raw games is loaded into the loader. An iterable of (key, game) pairs, e.g. games streamed
+        from JSON Lines file, is processed game by game without keeping games in memory.
+        With `jobs` > 1 games are processed in parallel, see `format_parallel`.
+        """
+        if self.jobs > 1:
+            return self.format_parallel(raw)
+        enriched_games: list[SOG] = []
+        recorder = self._sequence_recorder()
+        for game in self.instrumentation.timed("load", self._iter_games(self._record_plays(raw, recorder))):
+            with self.instrumentation.stage("filter_shots"):
+                shots = self._filter_shots(game).plays
+            with self.instrumentation.stage("play2sog"):
+                enriched_games.extend(play2sog(play, game) for play in shots)
+        self.instrumentation.count("shots", len(enriched_games))
+
+        with self.instrumentation.stage("dataframe"):
+            data = DataFrame(enriched_games)
+        return self._add_sequence_features(data, recorder)
 
-        enriched_games = [play2sog(play) for game in self.loader for play in self._filter_shots(game).plays]
+    def _iter_games(self, raw: RawGames) -> Iterator[Game]:
+        """Enriches and loads raw games. Dictionary is stored in the loader, other iterables are streamed."""
+        if isinstance(raw, Mapping):
+            self.loader.load({key: self.apply_enrichments(game) for key, game in raw.items()})
+            yield from self.loader
+        else:
+            yield from self.loader.iter_load((key, self.apply_enrichments(game)) for key, game in raw)
+
+
+class ColumnarXGPreprocessor(XGPreprocessor):
+    """Preprocessor for xG models flattening raw plays straight into columns.
+
+    Bypasses `Play` and `SOG` dataclasses and the loader: shots are filtered with a vectorized mask and
+    their times are converted with vectorized `time2sec`. Produces the same output as `XGPreprocessor`.
+    """
+
+    def format(self, raw: RawGames) -> DataFrame:
+        """Formats raw data to Pandas DataFrame while applying all enrichments and SOG filtering."""
+        if self.jobs > 1:
+            return self.format_parallel(raw)
+        recorder = self._sequence_recorder()
+        with self.instrumentation.stage("columnar"):
+            data = sog_frame(self._iter_enriched(self._record_plays(raw, recorder)))
+        self.instrumentation.count("shots", len(data))
+        return self._add_sequence_features(data, recorder)
 
-        return DataFrame(enriched_games)
+    def _iter_enriched(self, raw: RawGames) -> Iterator[tuple[str, dict[str, Any]]]:
+        for key, game in iter_raw_items(raw):
+            self.instrumentation.count("games")
+            self.instrumentation.count("plays", len(game["plays"]))
+            yield key, self.apply_enrichments(game)
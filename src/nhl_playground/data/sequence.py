@@ -0,0 +1,227 @@
+from dataclasses import dataclass, field
+from typing import Any
+
+from numpy import (
+    array,
+    concatenate,
+    float64,
+    hypot,
+    int64,
+    isin,
+    lexsort,
+    nan,
+    ndarray,
+    roll,
+    searchsorted,
+    where,
+)
+from pandas import DataFrame, Series, concat, factorize
+
+from nhl_playground.data.columnar import SHOT_TYPES, time2sec_array
+from nhl_playground.data.utils import numeric_array
+
+ATTEMPT_TYPES: tuple[str, ...] = ("shot-on-goal", "goal", "missed-shot", "blocked-shot")
+PLAY_COLUMNS: tuple[str, ...] = (
+    "gameId",
+    "homeTeamId",
+    "awayTeamId",
+    "eventId",
+    "sortOrder",
+    "periodNumber",
+    "timeInPeriod",
+    "typeDescKey",
+    "eventOwnerTeamId",
+    "xCoord",
+    "yCoord",
+    "zoneCode",
+)
+_DTYPES: dict[str, type] = {
+    **dict.fromkeys(("gameId", "homeTeamId", "awayTeamId", "eventId", "sortOrder", "periodNumber"), int64),
+    **dict.fromkeys(("eventOwnerTeamId", "xCoord", "yCoord"), float64),
+    "timeInPeriod": str,
+}
+
+
+@dataclass
+class PlayColumns:
+    """Accumulator of raw plays of many games as columns, one list per `PLAY_COLUMNS` name.
+
+    Plays are appended game by game in a single pass, so games can be streamed and dropped afterwards.
+    """
+
+    columns: dict[str, list[Any]] = field(default_factory=lambda: {name: [] for name in PLAY_COLUMNS})
+
+    def add(self, key: str | int, raw_game: dict[str, Any]) -> None:
+        """Appends plays of a raw game."""
+        plays = raw_game["plays"]
+        game = (int(key), raw_game["homeTeam"]["id"], raw_game["awayTeam"]["id"])
+        for name, value in zip(("gameId", "homeTeamId", "awayTeamId"), game, strict=True):
+            self.columns[name].extend([value] * len(plays))
+        rows = [
+            (
+                play.get("eventId"),
+                play.get("sortOrder", 0),
+                play["periodDescriptor"]["number"],
+                play.get("timeInPeriod", "00:00"),
+                play.get("typeDescKey"),
+                details.get("eventOwnerTeamId"),
+                details.get("xCoord"),
+                details.get("yCoord"),
+                details.get("zoneCode"),
+            )
+            for play in plays
+            for details in (play.get("details") or {},)
+        ]
+        for name, values in zip(PLAY_COLUMNS[3:], zip(*rows, strict=True), strict=True):
+            self.columns[name].extend(values)
+
+    def __len__(self) -> int:
+        """Number of plays."""
+        return len(self.columns["gameId"])
+
+    def arrays(self) -> dict[str, ndarray]:
+        """Gets plays as arrays sorted by game and `sortOrder`, times converted to seconds, missing values to NaN."""
+        columns = {name: array(values, dtype=_DTYPES.get(name, object)) for name, values in self.columns.items()}
+        columns["timeInPeriod"] = time2sec_array(columns["timeInPeriod"]) if len(self) else array([], dtype=int64)
+        order = lexsort((columns["sortOrder"], columns["gameId"]))
+        return {name: values[order] for name, values in columns.items()}
+
+
+def _shift(values: ndarray, starts: ndarray, fill: Any) -> ndarray:
+    """Shifts values by one play within groups starting at `starts`, the first play of a group gets `fill`."""
+    shifted = roll(values, 1)
+    return where(starts, fill, shifted) if len(values) else values
+
+
+@dataclass
+class SequenceFeatures:
+    """Context features of shots computed from preceding plays of the same game and period.
+
+    Works on columns of many plays at once (see `PlayColumns`): shifts and rolling windows are grouped by game and
+    period with vectorized ops, so a full season is computed in about a second.
+
+    Outputs:
+        secondsSincePrev: Seconds since the previous play, NaN for the first play of a period.
+        distanceFromPrev: Feet from the previous play, NaN if any of the plays has no coordinates.
+        prevSameTeam: Previous play belongs to the same team.
+        isRebound: Previous play is a shot attempt of the same team at most `rebound_seconds` before.
+        isRush: Previous play is in the neutral or defensive zone of the team at most `rush_seconds` before.
+        attemptsFor: Shot attempts of the team in the preceding `window` seconds of the period.
+        attemptsAgainst: Shot attempts of the opponent in the preceding `window` seconds of the period.
+    """
+
+    window: int = 30
+    rebound_seconds: int = 3
+    rush_seconds: int = 4
+    outputs: tuple[str, ...] = (
+        "secondsSincePrev",
+        "distanceFromPrev",
+        "prevSameTeam",
+        "isRebound",
+        "isRush",
+        "attemptsFor",
+        "attemptsAgainst",
+    )
+
+    def compute(self, plays: dict[str, ndarray]) -> DataFrame:
+        """Computes features of every play.
+
+        Args:
+            plays (dict[str, ndarray]): Play columns sorted by game and `sortOrder`, from `PlayColumns.arrays`.
+
+        Returns:
+            DataFrame: `gameId`, `eventId` and `outputs` of every play.
+        """
+        group = plays["gameId"] * 100 + plays["periodNumber"]
+        starts = group != roll(group, 1)
+        starts[:1] = True
+        seconds = plays["timeInPeriod"].astype(float64)
+        team = plays["eventOwnerTeamId"]
+        since = seconds - _shift(seconds, starts, nan)
+        same_team = team == _shift(team, starts, nan)
+        # Zone codes are relative to the owner of the play, offensive zone of the opponent is defensive zone.
+        prev_zone = _shift(plays["zoneCode"], starts, None)
+        outside = where(same_team, isin(prev_zone, ("N", "D")), isin(prev_zone, ("N", "O")))
+        attempts_for, attempts_against = self._attempts(plays, starts)
+        features = {
+            "gameId": plays["gameId"],
+            "eventId": plays["eventId"],
+            "secondsSincePrev": since,
+            "distanceFromPrev": hypot(
+                plays["xCoord"] - _shift(plays["xCoord"], starts, nan),
+                plays["yCoord"] - _shift(plays["yCoord"], starts, nan),
+            ),
+            "prevSameTeam": same_team,
+            "isRebound": same_team
+            & isin(_shift(plays["typeDescKey"], starts, None), ATTEMPT_TYPES)
+            & (since <= self.rebound_seconds),
+            "isRush": outside & (since <= self.rush_seconds),
+            "attemptsFor": attempts_for,
+            "attemptsAgainst": attempts_against,
+        }
+        return DataFrame(features)
+
+    def _attempts(self, plays: dict[str, ndarray], starts: ndarray) -> tuple[ndarray, ndarray]:
+        """Counts attempts of the play's team and of its opponent in the preceding `window` seconds.
+
+        Attempts are keyed by period group, team and second, so a window is a range of sorted keys found by
+        binary search.
+        """
+        team = plays["eventOwnerTeamId"]
+        opponent = where(team == plays["homeTeamId"], plays["awayTeamId"], plays["homeTeamId"])
+        codes, teams = factorize(concatenate([team, opponent]))
+        scale = (len(teams) + 1) * 10**4
+        base = (starts.cumsum() * scale)[:, None] + codes.reshape(2, -1).T * 10**4 + plays["timeInPeriod"][:, None]
+        keys = base[isin(plays["typeDescKey"], ATTEMPT_TYPES), 0]
+        keys.sort()
+        counts = searchsorted(keys, base, side="left") - searchsorted(keys, base - self.window, side="left")
+        return counts[:, 0], counts[:, 1]
+
+    def join(self, shots: DataFrame, features: DataFrame) -> DataFrame:
+        """Adds `outputs` columns of shots (SOG rows) from features computed by `compute`, at least for all shots."""
+        if shots.empty:
+            return shots
+        keys = features["gameId"].to_numpy() * 10**5 + features["eventId"].to_numpy()
+        order = keys.argsort(kind="stable")
+        shot_keys = numeric_array(shots["gameId"], int64) * 10**5 + numeric_array(shots["eventId"], int64)
+        index = order[searchsorted(keys, shot_keys, sorter=order).clip(max=len(keys) - 1)]
+        selected = features.iloc[index][list(self.outputs)].set_index(shots.index)
+        return shots.assign(**selected.where(Series(keys[index] == shot_keys, index=shots.index), axis=0))
+
+
+@dataclass
+class SequenceRecorder:
+    """Computes sequence features of shots chunk by chunk while games are read.
+
+    Plays of at most `chunk_size` games are buffered, features of a full buffer are computed at once and only rows
+    of shots (`SHOT_TYPES`) are kept, so memory grows with the number of shots instead of the number of plays.
+    """
+
+    features: SequenceFeatures = field(default_factory=SequenceFeatures)
+    chunk_size: int = 64
+    plays: PlayColumns = field(default_factory=PlayColumns)
+    shots: list[DataFrame] = field(default_factory=list)
+    games: int = 0
+
+    def add(self, key: str | int, raw_game: dict[str, Any]) -> None:
+        """Buffers plays of a raw game, computing features once `chunk_size` games are buffered."""
+        self.plays.add(key, raw_game)
+        self.games += 1
+        if self.games >= self.chunk_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Computes features of buffered plays, keeps those of shots and clears the buffer."""
+        if len(self.plays):
+            plays = self.plays.arrays()
+            features = self.features.compute(plays)
+            self.shots.append(features[isin(plays["typeDescKey"], SHOT_TYPES)])
+        self.plays = PlayColumns()
+        self.games = 0
+
+    def join(self, shots: DataFrame) -> DataFrame:
+        """Adds `outputs` columns of the feature stage to shots (SOG rows) of the recorded games."""
+        self.flush()
+        if shots.empty:
+            return shots
+        return self.features.join(shots, concat(self.shots, ignore_index=True))
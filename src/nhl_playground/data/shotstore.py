@@ -0,0 +1,187 @@
+import json
+import os
+from collections.abc import Iterable
+from typing import Any
+
+from numpy import array, bool_, dtype, float64, iinfo, int32, int64, isin, memmap, ndarray, zeros
+from pandas import Categorical, DataFrame, Series, factorize, to_numeric
+from pandas.api.types import is_bool_dtype, is_float_dtype, is_integer_dtype
+from pandas.arrays import BooleanArray, FloatingArray, IntegerArray
+
+from nhl_playground.data.parquet import sog_column_types
+from nhl_playground.data.utils import season_from_game_id
+
+SHOT_STORE_META: str = "meta.json"
+# Missing value of integer columns, e.g. shots without coordinates or goalie.
+INT_MISSING: int = iinfo(int64).min
+KIND_DTYPES: dict[str, dtype] = {
+    "int": dtype(int64),
+    "float": dtype(float64),
+    "bool": dtype(bool_),
+    "str": dtype(int32),
+}
+_BASE_KINDS: dict[type, str] = {int: "int", float: "float", bool: "bool", str: "str"}
+# Nullable pandas arrays of masked kinds, built from values and missing mask without copying.
+_MASKED_ARRAYS: dict[str, type] = {"int": IntegerArray, "float": FloatingArray, "bool": BooleanArray}
+
+
+def column_kind(name: str, values: Series) -> str:
+    """Gets storage kind of a column, SOG fields by their annotation, other columns by their dtype."""
+    if base := sog_column_types().get(name):
+        return _BASE_KINDS[base]
+    if is_bool_dtype(values):
+        return "bool"
+    if is_integer_dtype(values):
+        return "int"
+    return "float" if is_float_dtype(values) else "str"
+
+
+class ShotStore:
+    """Persistent binary store of shots opened as memory-mapped numpy arrays.
+
+    Every column is one file of fixed-width values: integers (`INT_MISSING` for missing values), floats, booleans
+    or int32 codes of dictionary-encoded strings (-1 for missing values). Integer, float and boolean columns have
+    a second file with their missing-value mask, so nullable arrays wrap both maps without computing masks.
+    `meta.json` keeps column kinds, string dictionaries and the number of committed rows. Files are mapped
+    read-only, so opening a store takes milliseconds and processes reading the same store share page cache
+    instead of private copies.
+
+    Appends write new rows at the end of the column files and commit them by replacing `meta.json`, so readers
+    never see partially written rows. The store has a single writer.
+    """
+
+    def __init__(self, root: str) -> None:
+        """Opens store in a directory, an empty store is created by the first `append`.
+
+        Args:
+            root (str): Directory of the store.
+        """
+        self.root = root
+        self.rows = 0
+        self.kinds: dict[str, str] = {}
+        self.dictionaries: dict[str, list[str]] = {}
+        self._codes: dict[str, dict[str, int]] = {}
+        self._maps: dict[str, ndarray] = {}
+        meta_path = os.path.join(root, SHOT_STORE_META)
+        if os.path.exists(meta_path):
+            with open(meta_path) as file:
+                self._set_meta(json.load(file))
+
+    def _set_meta(self, meta: dict[str, Any]) -> None:
+        self.rows = meta["rows"]
+        self.kinds = meta["kinds"]
+        self.dictionaries = meta["dictionaries"]
+        self._codes = {name: {value: i for i, value in enumerate(values)} for name, values in self.dictionaries.items()}
+        self._maps = {}
+
+    def __len__(self) -> int:
+        """Number of stored shots."""
+        return self.rows
+
+    @property
+    def columns(self) -> list[str]:
+        """Stored column names."""
+        return list(self.kinds)
+
+    def _path(self, file_name: str) -> str:
+        return os.path.join(self.root, file_name)
+
+    def _map(self, file_name: str, file_dtype: dtype) -> ndarray:
+        """Maps a column file read-only, maps are cached until the next commit."""
+        if file_name not in self._maps:
+            self._maps[file_name] = (
+                memmap(self._path(file_name), dtype=file_dtype, mode="r", shape=(self.rows,))
+                if self.rows
+                else zeros(0, dtype=file_dtype)
+            )
+        return self._maps[file_name]
+
+    def column(self, name: str) -> ndarray:
+        """Gets raw values of a column as a read-only memory map, strings as dictionary codes."""
+        return self._map(f"{name}.bin", KIND_DTYPES[self.kinds[name]])
+
+    def mask(self, name: str) -> ndarray:
+        """Gets missing-value mask of an integer, float or boolean column as a read-only memory map."""
+        return self._map(f"{name}.mask", dtype(bool_))
+
+    def array(self, name: str) -> Any:
+        """Gets column as a pandas array backed by the memory maps of its values and missing mask."""
+        kind = self.kinds[name]
+        if kind == "str":
+            return Categorical.from_codes(self.column(name), self.dictionaries[name], validate=False)
+        return _MASKED_ARRAYS[kind](self.column(name), self.mask(name))
+
+    def to_frame(self, columns: Iterable[str] | None = None, seasons: Iterable[int] | None = None) -> DataFrame:
+        """Gets shots as DataFrame with nullable integer, float and boolean columns and categorical strings.
+
+        Without `seasons` numeric and boolean columns wrap the memory maps of values and masks without copying.
+
+        Args:
+            columns (Iterable[str] | None, optional): Columns to read. Defaults to None (all columns).
+            seasons (Iterable[int] | None, optional): Seasons to read, e.g. [20232024]. Defaults to None (all).
+        """
+        frame = DataFrame({name: self.array(name) for name in columns or self.columns}, copy=False)
+        if seasons is None:
+            return frame
+        game_ids = self.column("gameId")
+        return frame[isin(season_from_game_id(game_ids), list(seasons))].reset_index(drop=True)
+
+    def append(self, shots: DataFrame) -> int:
+        """Appends shots of new games, shots of games already in the store are skipped.
+
+        Returns:
+            int: Number of appended shots.
+
+        Raises:
+            ValueError: When shots have columns not in the store.
+        """
+        if self.rows:
+            shots = shots[~shots["gameId"].isin(self.column("gameId"))]
+        if shots.empty:
+            return 0
+        kinds = self.kinds or {name: column_kind(name, shots[name]) for name in shots.columns}
+        if unknown := set(shots.columns) - set(kinds):
+            raise ValueError(f"Columns not in the shot store: {sorted(unknown)}")
+        os.makedirs(self.root, exist_ok=True)
+        missing = Series(None, index=shots.index, dtype=object)
+        for name, kind in kinds.items():
+            self._append_column(name, kind, shots.get(name, missing))
+        self._commit(self.rows + len(shots), kinds)
+        return len(shots)
+
+    def _append_column(self, name: str, kind: str, values: Series) -> None:
+        """Appends encoded values of a column and, except for strings, its missing-value mask."""
+        self._write(f"{name}.bin", self._encode(name, kind, values))
+        if kind != "str":
+            self._write(f"{name}.mask", values.isna().to_numpy(dtype=bool))
+
+    def _encode(self, name: str, kind: str, values: Series) -> ndarray:
+        """Encodes column values as fixed-width values of its kind."""
+        if kind == "str":
+            positions, uniques = factorize(values.astype(object))
+            codes = self._codes.setdefault(name, {})
+            lookup = [codes.setdefault(str(value), len(codes)) for value in uniques.tolist()]
+            # Missing values have position -1, which picks the appended -1 code.
+            return array([*lookup, -1], dtype=int32)[positions]
+        if kind == "int":
+            return to_numeric(values).astype("Int64").to_numpy(dtype=int64, na_value=INT_MISSING)
+        if kind == "float":
+            return to_numeric(values).to_numpy(dtype=float64, na_value=float("nan"))
+        # Missing booleans are stored as False and marked in the mask file.
+        return values.astype("boolean").to_numpy(dtype=bool, na_value=False)
+
+    def _write(self, file_name: str, values: ndarray) -> None:
+        """Appends values after committed rows, dropping leftovers of an interrupted append."""
+        with open(self._path(file_name), "ab") as file:
+            file.truncate(self.rows * values.itemsize)
+            file.write(values.tobytes())
+
+    def _commit(self, rows: int, kinds: dict[str, str]) -> None:
+        """Replaces meta file, making appended rows visible to readers opening the store."""
+        dictionaries = {name: list(codes) for name, codes in self._codes.items()}
+        meta = {"rows": rows, "kinds": kinds, "dictionaries": dictionaries}
+        tmp_path = os.path.join(self.root, f"{SHOT_STORE_META}.tmp")
+        with open(tmp_path, "w") as file:
+            json.dump(meta, file)
+        os.replace(tmp_path, os.path.join(self.root, SHOT_STORE_META))
+        self._set_meta(meta)
@@ -0,0 +1,269 @@
+import json
+import os
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from math import ceil
+
+from numpy import (
+    arange,
+    argsort,
+    array,
+    bincount,
+    clip,
+    concatenate,
+    errstate,
+    floor,
+    int64,
+    isfinite,
+    isin,
+    nan,
+    ndarray,
+    savez,
+    searchsorted,
+    where,
+    zeros,
+)
+from numpy import load as load_arrays
+from pandas import DataFrame, Series, factorize, to_numeric
+
+from nhl_playground.data.utils import attacking_coords, season_from_game_id
+
+RINK_HALF_LENGTH: float = 100.0
+RINK_HALF_WIDTH: float = 42.5
+POINT_COLUMNS: tuple[str, ...] = ("gameId", "eventId", "x", "y", "team", "shotType", "isGoal")
+
+
+@dataclass
+class SeasonShots:
+    """Normalized shots of one season sorted by grid cell, with cached count grids.
+
+    `offsets[c]:offsets[c + 1]` are positions of shots in cell `c`. Grids are indexed by team code, shot type code
+    and cell, totals by cell.
+    """
+
+    columns: dict[str, ndarray]
+    offsets: ndarray
+    shots: ndarray
+    goals: ndarray
+    total_shots: ndarray = field(init=False)
+    total_goals: ndarray = field(init=False)
+
+    def __post_init__(self) -> None:
+        """Caches rink totals of the grids."""
+        self.total_shots = self.shots.sum(axis=(0, 1))
+        self.total_goals = self.goals.sum(axis=(0, 1))
+
+    def __len__(self) -> int:
+        """Number of shots."""
+        return len(self.columns["gameId"])
+
+
+def _empty_points() -> dict[str, ndarray]:
+    return {name: zeros(0, dtype=float if name in ("x", "y") else int64) for name in POINT_COLUMNS}
+
+
+def _axis_index(codes: dict, value: object, size: int) -> slice | list[int]:
+    """Gets index of a grid axis selecting one coded value, all values for None and nothing for unknown values."""
+    if value is None:
+        return slice(None)
+    code = codes.get(value, size)
+    return [code] if code < size else []
+
+
+class ShotMap:
+    """Spatial index of shots with binned shot density and goal rate grids per season, team and shot type.
+
+    Coordinates are normalized so that the shooting team always attacks the net at positive x (see
+    `attacking_coords`) and binned into square cells of `cell_size` feet. Shots of every season are sorted by cell,
+    so neighborhood queries read only cells around the location, and count grids are cached per season. Adding
+    games rebuilds only their seasons, replacing stored shots of re-added games.
+    """
+
+    def __init__(self, cell_size: float = 2.0) -> None:
+        """Shot map constructor.
+
+        Args:
+            cell_size (float, optional): Side of grid cells in feet. Defaults to 2.
+        """
+        self.cell_size = cell_size
+        self.shape = (ceil(2 * RINK_HALF_LENGTH / cell_size), ceil(2 * RINK_HALF_WIDTH / cell_size))
+        self.teams: dict[int, int] = {}
+        self.shot_types: dict[str, int] = {}
+        self.seasons: dict[int, SeasonShots] = {}
+        self._dirty: set[int] = set()
+
+    @property
+    def n_cells(self) -> int:
+        """Number of grid cells."""
+        return self.shape[0] * self.shape[1]
+
+    def cell_indices(self, x: ndarray, y: ndarray) -> tuple[ndarray, ndarray]:
+        """Gets grid row (along x) and column (along y) of normalized coordinates, outside points are clipped."""
+        ix = clip(floor((x + RINK_HALF_LENGTH) / self.cell_size).astype(int64), 0, self.shape[0] - 1)
+        iy = clip(floor((y + RINK_HALF_WIDTH) / self.cell_size).astype(int64), 0, self.shape[1] - 1)
+        return ix, iy
+
+    def cells(self, x: ndarray, y: ndarray) -> ndarray:
+        """Gets flat cell indices of normalized coordinates."""
+        ix, iy = self.cell_indices(x, y)
+        return ix * self.shape[1] + iy
+
+    @staticmethod
+    def _codes(values: Series, codes: dict) -> ndarray:
+        """Encodes values by a growing dictionary of codes."""
+        positions, uniques = factorize(values)
+        lookup = array([codes.setdefault(value, len(codes)) for value in uniques.tolist()], dtype=int64)
+        return lookup[positions]
+
+    def points(self, shots: DataFrame) -> dict[str, ndarray]:
+        """Gets normalized points of SOG rows, shots without coordinates are skipped."""
+        is_home = to_numeric(shots["eventOwnerTeamId"]).to_numpy() == to_numeric(shots["homeTeamId"]).to_numpy()
+        x, y = attacking_coords(
+            to_numeric(shots["xCoord"]).to_numpy(dtype=float, na_value=nan),
+            to_numeric(shots["yCoord"]).to_numpy(dtype=float, na_value=nan),
+            shots["homeTeamDefendingSide"].to_numpy(dtype=object),
+            is_home,
+        )
+        keep = isfinite(x) & isfinite(y)
+        shots = shots[keep]
+        return {
+            "gameId": to_numeric(shots["gameId"]).to_numpy(dtype=int64),
+            "eventId": to_numeric(shots["eventId"]).to_numpy(dtype=int64),
+            "x": x[keep],
+            "y": y[keep],
+            "team": self._codes(to_numeric(shots["eventOwnerTeamId"]).astype(int), self.teams),
+            "shotType": self._codes(shots["shotType"].astype(object).fillna(""), self.shot_types),
+            "isGoal": shots["isGoal"].astype(bool).to_numpy(dtype=int64),
+        }
+
+    def add(self, shots: DataFrame) -> None:
+        """Adds shots of new or re-scraped games, rebuilding only their seasons."""
+        points = self.points(shots)
+        seasons = season_from_game_id(points["gameId"])
+        for season in set(seasons.tolist()):
+            mask = seasons == season
+            self._update_season(season, {name: values[mask] for name, values in points.items()})
+
+    def _update_season(self, season: int, points: dict[str, ndarray]) -> None:
+        stored = self.seasons[season].columns if season in self.seasons else _empty_points()
+        kept = ~isin(stored["gameId"], points["gameId"])
+        merged = {name: concatenate([stored[name][kept], points[name]]) for name in POINT_COLUMNS}
+        self.seasons[season] = self._index(merged)
+        self._dirty.add(season)
+
+    def _index(self, points: dict[str, ndarray]) -> SeasonShots:
+        """Sorts points by cell and counts shots and goals of every team, shot type and cell."""
+        cells = self.cells(points["x"], points["y"])
+        order = argsort(cells, kind="stable")
+        points = {name: values[order] for name, values in points.items()}
+        cells = cells[order]
+        grid_shape = (len(self.teams), len(self.shot_types), self.n_cells)
+        flat = (points["team"] * grid_shape[1] + points["shotType"]) * self.n_cells + cells
+        size = grid_shape[0] * grid_shape[1] * self.n_cells
+        return SeasonShots(
+            columns=points,
+            offsets=searchsorted(cells, arange(self.n_cells + 1)),
+            shots=bincount(flat, minlength=size).reshape(grid_shape),
+            goals=bincount(flat, weights=points["isGoal"], minlength=size).astype(int64).reshape(grid_shape),
+        )
+
+    def _selected(self, seasons: Iterable[int] | None) -> list[SeasonShots]:
+        return [self.seasons[season] for season in (seasons or self.seasons) if season in self.seasons]
+
+    def density(
+        self,
+        seasons: Iterable[int] | None = None,
+        team: int | None = None,
+        shot_type: str | None = None,
+        goals: bool = False,
+    ) -> ndarray:
+        """Gets grid of shot (or goal) counts of seasons (all by default), optionally of one team and shot type.
+
+        Returns:
+            ndarray: Counts of shape `shape`, x (towards the attacked net) by y.
+        """
+        grid = zeros(self.n_cells, dtype=int64)
+        for season in self._selected(seasons):
+            grid += self._season_counts(season, team, shot_type, goals)
+        return grid.reshape(self.shape)
+
+    def _season_counts(self, season: SeasonShots, team: int | None, shot_type: str | None, goals: bool) -> ndarray:
+        if team is None and shot_type is None:
+            return season.total_goals if goals else season.total_shots
+        counts = season.goals if goals else season.shots
+        team_index = _axis_index(self.teams, team, counts.shape[0])
+        type_index = _axis_index(self.shot_types, shot_type, counts.shape[1])
+        return counts[team_index][:, type_index].sum(axis=(0, 1))
+
+    def goal_rate(
+        self,
+        seasons: Iterable[int] | None = None,
+        team: int | None = None,
+        shot_type: str | None = None,
+    ) -> ndarray:
+        """Gets grid of goals per shot, NaN in cells without shots."""
+        shots = self.density(seasons, team, shot_type)
+        with errstate(invalid="ignore", divide="ignore"):
+            return where(shots > 0, self.density(seasons, team, shot_type, goals=True) / shots, nan)
+
+    def near(
+        self,
+        x: float,
+        y: float,
+        radius: float,
+        seasons: Iterable[int] | None = None,
+    ) -> DataFrame:
+        """Gets shots within `radius` feet of a normalized location, e.g. `near(80, 0, 10)` for the slot.
+
+        Returns:
+            DataFrame: `gameId`, `eventId`, normalized `x` and `y`, `team` ID, `shotType` and `isGoal` of the shots.
+        """
+        frames = [self._near(season, x, y, radius) for season in self._selected(seasons)]
+        points = {name: concatenate([frame[name] for frame in frames]) for name in POINT_COLUMNS} if frames else {}
+        data = DataFrame(points or _empty_points())
+        data["team"] = data["team"].map(dict(zip(self.teams.values(), self.teams, strict=True)))
+        data["shotType"] = data["shotType"].map(dict(zip(self.shot_types.values(), self.shot_types, strict=True)))
+        data["isGoal"] = data["isGoal"].astype(bool)
+        return data
+
+    def _near(self, season: SeasonShots, x: float, y: float, radius: float) -> dict[str, ndarray]:
+        """Reads cells of the bounding box of the circle and keeps shots within the radius."""
+        (first_x, last_x), (first_y, last_y) = self.cell_indices(
+            array([x - radius, x + radius]),
+            array([y - radius, y + radius]),
+        )
+        ny = self.shape[1]
+        index = concatenate(
+            [
+                arange(season.offsets[ix * ny + first_y], season.offsets[ix * ny + last_y + 1])
+                for ix in range(first_x, last_x + 1)
+            ],
+        )
+        columns = {name: values[index] for name, values in season.columns.items()}
+        inside = (columns["x"] - x) ** 2 + (columns["y"] - y) ** 2 <= radius**2
+        return {name: values[inside] for name, values in columns.items()}
+
+    def save(self, root: str) -> None:
+        """Saves shots of seasons changed since the last save or load, one `<season>.npz` file per season."""
+        os.makedirs(root, exist_ok=True)
+        for season in self._dirty:
+            savez(os.path.join(root, f"{season}.npz"), **self.seasons[season].columns)
+        meta = {"cell_size": self.cell_size, "teams": list(self.teams), "shot_types": list(self.shot_types)}
+        with open(os.path.join(root, "meta.json"), "w") as file:
+            json.dump(meta, file)
+        self._dirty.clear()
+
+    @classmethod
+    def load(cls, root: str, seasons: Iterable[int] | None = None) -> "ShotMap":
+        """Loads shot map saved by `save`, only requested seasons (all by default). Grids are rebuilt on load."""
+        with open(os.path.join(root, "meta.json")) as file:
+            meta = json.load(file)
+        shot_map = cls(meta["cell_size"])
+        shot_map.teams = {team: code for code, team in enumerate(meta["teams"])}
+        shot_map.shot_types = {shot_type: code for code, shot_type in enumerate(meta["shot_types"])}
+        stored = sorted(int(name.removesuffix(".npz")) for name in os.listdir(root) if name.endswith(".npz"))
+        selected = stored if seasons is None else sorted(set(stored).intersection(seasons))
+        for season in selected:
+            with load_arrays(os.path.join(root, f"{season}.npz")) as data:
+                shot_map.seasons[season] = shot_map._index({name: data[name] for name in POINT_COLUMNS})
+        return shot_map
@@ -0,0 +1,40 @@
+from collections.abc import Iterable
+from typing import Any
+
+from pandas import DataFrame, json_normalize
+
+STATS_GROUPS: tuple[str, ...] = ("skaters", "goalies")
+NAME_COLUMNS: tuple[str, ...] = ("firstName", "lastName")
+KEY_COLUMNS: tuple[str, ...] = ("team", "season", "gameType")
+
+
+def stats_table(stats: Iterable[tuple[tuple[str, str, int], dict[str, Any]]], group: str) -> DataFrame:
+    """Normalizes players of one stats group of many team stats into a single flat table.
+
+    Nested localized names (`{"default": ..., "cs": ...}`) are flattened by one `json_normalize` call and only
+    their default value is kept, already flattened names are kept as they are.
+
+    Args:
+        stats (Iterable[tuple[tuple[str, str, int], dict[str, Any]]]): ((team, season, game type), team stats) pairs.
+        group (str): Stats group, "skaters" or "goalies".
+
+    Returns:
+        DataFrame: One row per player and (team, season, game type) with nullable typed columns.
+    """
+    players: list[dict[str, Any]] = []
+    keys: list[tuple[str, int, int]] = []
+    for (team, season, game_type), data in stats:
+        players.extend(data[group])
+        keys.extend([(team, int(season), game_type)] * len(data[group]))
+    if not players:
+        return DataFrame(columns=list(KEY_COLUMNS))
+
+    frame = json_normalize(players, max_level=1)
+    for name in NAME_COLUMNS:
+        if f"{name}.default" in frame:
+            default = frame.pop(f"{name}.default")
+            frame[name] = default.fillna(frame[name]) if name in frame else default
+    # Drop non-default localizations of names.
+    frame = frame.drop(columns=[column for column in frame.columns if "." in column])
+    table = DataFrame(keys, columns=list(KEY_COLUMNS)).join(frame)
+    return table.convert_dtypes()
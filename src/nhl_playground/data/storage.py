@@ -0,0 +1,172 @@
+import gzip
+import json
+import os
+from collections.abc import Iterable, Iterator
+from types import TracebackType
+from typing import IO, Any
+
+from pandas import DataFrame, read_csv
+
+from nhl_playground.data.decoding import JsonDecoder, default_decoder
+from nhl_playground.data.parquet import read_sog_parquet
+from nhl_playground.data.shotstore import SHOT_STORE_META, ShotStore
+
+JSON_LINES_SUFFIXES: tuple[str, ...] = (".jsonl", ".jsonl.gz", ".ndjson", ".ndjson.gz")
+
+
+def is_json_lines(path: str) -> bool:
+    """Checks if the path points to JSON Lines file (optionally gzip compressed)."""
+    return path.endswith(JSON_LINES_SUFFIXES)
+
+
+def open_text(path: str, mode: str = "r") -> IO[str]:
+    """Opens text file, transparently (de)compressing files ending with `.gz`."""
+    if path.endswith(".gz"):
+        return gzip.open(path, f"{mode}t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def open_binary(path: str) -> IO[bytes]:
+    """Opens binary file for reading, transparently decompressing files ending with `.gz`."""
+    if path.endswith(".gz"):
+        return gzip.open(path, "rb")
+    return open(path, "rb")
+
+
+class JsonLinesWriter:
+    """Streaming writer of raw games, one game per line.
+
+    Every line is a JSON object of raw game data with additional `key` field holding the game key.
+    Files ending with `.gz` are gzip compressed.
+    """
+
+    def __init__(self, path: str, append: bool = False) -> None:
+        """Opens output file.
+
+        Args:
+            path (str): Output file path.
+            append (bool, optional): Flag to append to an existing file instead of overwriting it. Defaults to False.
+        """
+        self.path = path
+        self._file = open_text(path, "a" if append else "w")
+        self.written = 0
+
+    def write(self, key: str | int, game: dict[str, Any]) -> None:
+        """Writes one game."""
+        self._file.write(json.dumps({"key": str(key)} | game))
+        self._file.write("\n")
+        self.written += 1
+
+    def write_all(self, games: Iterable[tuple[str | int, dict[str, Any]]]) -> int:
+        """Writes all games from an iterable of (key, game) pairs. Returns number of written games."""
+        for key, game in games:
+            self.write(key, game)
+        return self.written
+
+    def flush(self, sync: bool = False) -> None:
+        """Flushes written games to the file.
+
+        Args:
+            sync (bool, optional): Flag to also force the data to disk with fsync. Defaults to False.
+        """
+        self._file.flush()
+        if sync:
+            os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        """Closes output file."""
+        self._file.close()
+
+    def __enter__(self) -> "JsonLinesWriter":
+        """Context manager entry."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Context manager exit, closes the file."""
+        self.close()
+
+
+def iter_json_lines(
+    path: str,
+    tolerant: bool = False,
+    decoder: JsonDecoder | None = None,
+) -> Iterator[tuple[str, dict[str, Any]]]:
+    """Lazily reads raw games stored by `JsonLinesWriter`.
+
+    Args:
+        path (str): Input file path.
+        tolerant (bool, optional): Flag to skip corrupted lines and stop silently at a truncated gzip stream,
+            e.g. of a file whose writer was killed. Defaults to False.
+        decoder (JsonDecoder | None, optional): Decoder of lines, e.g. with a projection. Defaults to the fastest
+            installed backend without projection.
+
+    Yields:
+        tuple[str, dict[str, Any]]: Game key and raw game data.
+    """
+    decoder = decoder or default_decoder()
+    with open_binary(path) as file:
+        try:
+            for line in file:
+                if game := _decode_line(line, tolerant, decoder):
+                    yield str(game.pop("key")), game
+        except EOFError:
+            if not tolerant:
+                raise
+
+
+def _decode_line(line: bytes, tolerant: bool, decoder: JsonDecoder) -> dict[str, Any] | None:
+    """Decodes one JSON line, returns None for empty lines and, when tolerant, for corrupted lines."""
+    if not line.strip():
+        return None
+    try:
+        return decoder.decode(line)
+    except ValueError:
+        if tolerant:
+            return None
+        raise
+
+
+def read_json(path: str, decoder: JsonDecoder | None = None) -> Any:
+    """Reads JSON file (optionally gzip compressed) with a decoder, defaults to the fastest installed backend."""
+    with open_binary(path) as file:
+        return (decoder or default_decoder()).decode(file.read())
+
+
+def iter_raw_games(path: str, decoder: JsonDecoder | None = None) -> Iterator[tuple[str, dict[str, Any]]]:
+    """Iterates over raw games stored either as JSON Lines or as a single JSON object keyed by game key.
+
+    A projection of the decoder applies to single games, e.g. `PBP_PROJECTION`.
+    """
+    if is_json_lines(path):
+        yield from iter_json_lines(path, decoder=decoder)
+        return
+    if decoder is not None and decoder.projection is not None:
+        decoder = JsonDecoder(decoder.backend, {"*": decoder.projection})
+    yield from ((str(key), game) for key, game in read_json(path, decoder).items())
+
+
+def merge_json_lines(path: str, games: dict[str, dict[str, Any]]) -> None:
+    """Merges games into JSON Lines file, replacing stored games with the same key.
+
+    Existing file is streamed into a temporary file, so memory use does not depend on its size.
+    """
+    tmp_path = f"{path}.tmp{'.gz' if path.endswith('.gz') else ''}"
+    with JsonLinesWriter(tmp_path) as writer:
+        if os.path.exists(path):
+            writer.write_all((key, game) for key, game in iter_json_lines(path) if key not in games)
+        writer.write_all(games.items())
+    os.replace(tmp_path, path)
+
+
+def read_sog(path: str) -> DataFrame:
+    """Reads shots saved by `run_xg_preprocessing.py`, as CSV file, shot store or Parquet dataset directory."""
+    if os.path.exists(os.path.join(path, SHOT_STORE_META)):
+        return ShotStore(path).to_frame()
+    if os.path.isdir(path):
+        return read_sog_parquet(path)
+    return read_csv(path, sep=";", index_col=0)
@@ -0,0 +1,97 @@
+from random import Random
+from typing import Any
+
+PLAY_TYPES: dict[str, tuple[int, int]] = {
+    # typeDescKey: (typeCode, relative frequency)
+    "faceoff": (502, 8),
+    "hit": (503, 10),
+    "giveaway": (504, 4),
+    "goal": (505, 1),
+    "shot-on-goal": (506, 12),
+    "missed-shot": (507, 8),
+    "blocked-shot": (508, 6),
+    "penalty": (509, 2),
+    "stoppage": (516, 10),
+    "takeaway": (525, 3),
+}
+SHOT_TYPES: tuple[str, ...] = ("wrist", "snap", "slap", "backhand", "tip-in", "deflected", "wrap-around")
+SITUATION_CODES: tuple[str, ...] = ("1551", "1551", "1551", "1451", "1541", "0651", "1560")
+PERIOD_SECONDS: int = 20 * 60
+
+
+def _mmss(seconds: int) -> str:
+    return f"{seconds // 60:02d}:{seconds % 60:02d}"
+
+
+def synthetic_play(rnd: Random, event_id: int, period: int, second: int, home_id: int, away_id: int) -> dict[str, Any]:
+    """Generates one raw play shaped as a play of the NHL play-by-play API."""
+    type_desc_key = rnd.choices(list(PLAY_TYPES), weights=[weight for _, weight in PLAY_TYPES.values()])[0]
+    details: dict[str, Any] = {"eventOwnerTeamId": rnd.choice((home_id, away_id))}
+    if rnd.random() > 0.02:
+        details |= {"xCoord": rnd.randint(-99, 99), "yCoord": rnd.randint(-42, 42), "zoneCode": rnd.choice("ODN")}
+    if type_desc_key in ("shot-on-goal", "goal"):
+        player_key = "scoringPlayerId" if type_desc_key == "goal" else "shootingPlayerId"
+        details |= {"shotType": rnd.choice(SHOT_TYPES), player_key: rnd.randint(8470000, 8485000)}
+        if rnd.random() > 0.03:
+            details["goalieInNetId"] = rnd.randint(8470000, 8485000)
+    return {
+        "eventId": event_id,
+        "periodDescriptor": {"number": period, "periodType": "REG", "maxRegulationPeriods": 3},
+        "timeInPeriod": _mmss(second),
+        "timeRemaining": _mmss(PERIOD_SECONDS - second),
+        "situationCode": rnd.choice(SITUATION_CODES),
+        "homeTeamDefendingSide": "left" if period % 2 else "right",
+        "typeCode": PLAY_TYPES[type_desc_key][0],
+        "typeDescKey": type_desc_key,
+        "sortOrder": event_id * 5,
+        "details": details,
+    }
+
+
+def synthetic_game_date(game_id: int) -> str:
+    """Gets date of a synthetic game, spread over October to December of the season's first year."""
+    return f"{game_id // 10**6}-{10 + game_id % 3}-{1 + game_id % 28:02d}"
+
+
+def synthetic_game(game_id: int, n_plays: int = 300, seed: int | None = None) -> dict[str, Any]:
+    """Generates raw game shaped as a response of the NHL play-by-play API.
+
+    Args:
+        game_id (int): Game ID, e.g. 2023020001.
+        n_plays (int, optional): Number of plays, spread evenly over three periods. Defaults to 300.
+        seed (int | None, optional): Random seed. Defaults to the game ID, so games are reproducible.
+
+    Returns:
+        dict[str, Any]: Raw game with `plays`, `homeTeam`, `awayTeam`, `gameState` and `gameDate`.
+    """
+    rnd = Random(game_id if seed is None else seed)
+    year = game_id // 10**6
+    home_id, away_id = rnd.sample(range(1, 33), 2)
+    plays_per_period = max(1, n_plays // 3)
+    plays = []
+    for i in range(n_plays):
+        period = min(3, 1 + i // plays_per_period)
+        second = (i % plays_per_period) * PERIOD_SECONDS // plays_per_period + rnd.randrange(4)
+        plays.append(synthetic_play(rnd, i + 1, period, min(second, PERIOD_SECONDS), home_id, away_id))
+    return {
+        "id": game_id,
+        "season": year * 10**4 + year + 1,
+        "gameType": game_id // 10**4 % 100,
+        "gameDate": synthetic_game_date(game_id),
+        "gameState": "OFF",
+        "homeTeam": {"id": home_id, "abbrev": f"T{home_id:02d}"},
+        "awayTeam": {"id": away_id, "abbrev": f"T{away_id:02d}"},
+        "plays": plays,
+    }
+
+
+def synthetic_season(n_games: int = 1312, n_plays: int = 300, season: int = 2023) -> dict[str, dict[str, Any]]:
+    """Generates regular season of raw games keyed by game ID, like data saved by `PbPScraper`.
+
+    Args:
+        n_games (int, optional): Number of games. Defaults to 1312 (full regular season).
+        n_plays (int, optional): Number of plays per game. Defaults to 300.
+        season (int, optional): First year of the season. Defaults to 2023.
+    """
+    first_id = season * 10**6 + 20000
+    return {str(first_id + i): synthetic_game(first_id + i, n_plays) for i in range(1, n_games + 1)}
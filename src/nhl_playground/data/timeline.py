@@ -0,0 +1,264 @@
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+from typing import Any
+
+from numpy import (
+    array,
+    char,
+    concatenate,
+    cumsum,
+    diff,
+    int64,
+    isin,
+    ndarray,
+    repeat,
+    searchsorted,
+    select,
+    where,
+    zeros,
+)
+from pandas import DataFrame, Series
+
+from nhl_playground.data.columnar import time2sec_array
+from nhl_playground.data.utils import numeric_array, season_from_game_id, split_situation_code
+
+PERIOD_SECONDS: dict[str, int] = {"REG": 20 * 60, "OT": 20 * 60, "SO": 0}
+REGULAR_SEASON_OT_SECONDS: int = 5 * 60
+GAME_STATES: tuple[str, ...] = ("EV", "PP", "PK", "EN", "EA")
+GAME_COLUMNS: tuple[str, ...] = ("gameId", "homeTeamId", "awayTeamId")
+EVENT_COLUMNS: tuple[str, ...] = (
+    "eventId",
+    "seconds",
+    "duration",
+    "homeSkaters",
+    "awaySkaters",
+    "homeGoalie",
+    "awayGoalie",
+    "homeScore",
+    "awayScore",
+)
+
+
+def period_starts(periods: Mapping[int, str], game_type: int) -> ndarray:
+    """Gets absolute start second of every period (index 0 is the first period).
+
+    Args:
+        periods (Mapping[int, str]): Period types ("REG", "OT", "SO") by period number, missing periods are
+            regulation periods.
+        game_type (int): Game type, overtime of regular season games (2) lasts 5 minutes.
+    """
+    lengths = [PERIOD_SECONDS.get(periods.get(number, "REG"), 0) for number in range(1, max(periods, default=1) + 1)]
+    if game_type == 2:
+        lengths = [REGULAR_SEASON_OT_SECONDS if periods.get(i + 1) == "OT" else n for i, n in enumerate(lengths)]
+    return cumsum([0, *lengths[:-1]], dtype=int64)
+
+
+def game_states(
+    skaters_for: ndarray,
+    skaters_against: ndarray,
+    goalie_for: ndarray,
+    goalie_against: ndarray,
+) -> ndarray:
+    """Gets state of a team: empty net of the opponent (EN), own extra attacker (EA), PP, PK or even strength (EV)."""
+    return select(
+        [goalie_against == 0, goalie_for == 0, skaters_for > skaters_against, skaters_for < skaters_against],
+        ["EN", "EA", "PP", "PK"],
+        "EV",
+    )
+
+
+def strength_labels(skaters_for: ndarray, skaters_against: ndarray) -> ndarray:
+    """Gets strength labels of a team, e.g. "5v4" on a power play."""
+    return char.add(char.add(skaters_for.astype(str), "v"), skaters_against.astype(str))
+
+
+@dataclass(slots=True)
+class GameTimeline:
+    """Game state after every play of a game, built once from raw plays.
+
+    Arrays are aligned with plays ordered by `sortOrder`. `seconds` are absolute game seconds, `duration` is time
+    since the previous play. State of the interval ending at a play is the state of that play, scores are scores
+    before the play, so a goal is scored in the score state it changes.
+    """
+
+    gameId: int
+    homeTeamId: int
+    awayTeamId: int
+    periodStarts: ndarray
+    events: dict[str, ndarray]
+
+    @classmethod
+    def from_raw(cls, key: str | int, raw_game: dict[str, Any]) -> "GameTimeline":
+        """Builds timeline from raw game of the play-by-play API."""
+        plays = sorted(raw_game["plays"], key=lambda play: play.get("sortOrder", 0))
+        game_id = int(key)
+        home, away = raw_game["homeTeam"]["id"], raw_game["awayTeam"]["id"]
+        numbers = array([play["periodDescriptor"]["number"] for play in plays], dtype=int64)
+        types = [play["periodDescriptor"].get("periodType", "REG") for play in plays]
+        starts = period_starts(dict(zip(numbers.tolist(), types, strict=True)), game_id // 10**4 % 100)
+        seconds = starts[numbers - 1] + time2sec_array(array([play.get("timeInPeriod", "00:00") for play in plays]))
+        away_goalie, away_skaters, home_skaters, home_goalie = split_situation_code(
+            array([play.get("situationCode") for play in plays], dtype=object),
+        )
+        goal_owner = array(
+            [_goal_owner(play, period_type) for play, period_type in zip(plays, types, strict=True)],
+            dtype=int64,
+        )
+        events = {
+            "eventId": array([play.get("eventId", 0) for play in plays], dtype=int64),
+            "seconds": seconds,
+            "duration": diff(seconds, prepend=0).clip(min=0),
+            "homeSkaters": home_skaters,
+            "awaySkaters": away_skaters,
+            "homeGoalie": home_goalie,
+            "awayGoalie": away_goalie,
+            "homeScore": cumsum(goal_owner == home) - (goal_owner == home),
+            "awayScore": cumsum(goal_owner == away) - (goal_owner == away),
+        }
+        return cls(game_id, home, away, starts, events)
+
+    def __len__(self) -> int:
+        """Number of plays."""
+        return len(self.events["seconds"])
+
+    def index_at(self, seconds: float | ndarray) -> int | ndarray:
+        """Gets index of the play ending the interval that contains the given absolute game seconds."""
+        return searchsorted(self.events["seconds"], seconds, side="left").clip(max=len(self) - 1)
+
+    def period_at(self, seconds: float | ndarray) -> int | ndarray:
+        """Gets period number of absolute game seconds."""
+        return searchsorted(self.periodStarts, seconds, side="right")
+
+    def states(self, team_id: int) -> ndarray:
+        """Gets `GAME_STATES` of a team at every play."""
+        return game_states(*self._perspective(team_id))
+
+    def strengths(self, team_id: int) -> ndarray:
+        """Gets strength labels of a team at every play, e.g. "5v4"."""
+        skaters_for, skaters_against, _, _ = self._perspective(team_id)
+        return strength_labels(skaters_for, skaters_against)
+
+    def _perspective(self, team_id: int) -> tuple[ndarray, ndarray, ndarray, ndarray]:
+        """Gets skaters and goalies for and against a team."""
+        home, away = ("home", "away") if team_id == self.homeTeamId else ("away", "home")
+        events = self.events
+        return events[f"{home}Skaters"], events[f"{away}Skaters"], events[f"{home}Goalie"], events[f"{away}Goalie"]
+
+
+def _goal_owner(play: dict[str, Any], period_type: str) -> int:
+    """Gets ID of the team scoring a goal in the play, 0 for other plays and shootout goals."""
+    if play.get("typeDescKey") != "goal" or period_type == "SO":
+        return 0
+    return play.get("details", {}).get("eventOwnerTeamId", 0)
+
+
+class TimelineIndex:
+    """Timelines of many games concatenated into columns for season-wide queries.
+
+    Plays are ordered by game and event ID, so game states of shots are looked up by binary search
+    and time on ice is summed with vectorized operations, without walking plays again.
+    """
+
+    def __init__(self, timelines: Iterable[GameTimeline] = ()) -> None:
+        """Index constructor.
+
+        Args:
+            timelines (Iterable[GameTimeline], optional): Game timelines, e.g. of games loaded by `PbPDataLoader`
+                with `timelines=True`. Defaults to ().
+        """
+        self.timelines: dict[int, GameTimeline] = {}
+        self._columns: dict[str, ndarray] | None = None
+        self.add(timelines)
+
+    @classmethod
+    def from_raw(cls, raw_games: Iterable[tuple[str, dict[str, Any]]]) -> "TimelineIndex":
+        """Builds index from (key, raw game) pairs."""
+        return cls(GameTimeline.from_raw(key, game) for key, game in raw_games)
+
+    def add(self, timelines: Iterable[GameTimeline]) -> None:
+        """Adds timelines of new games, replacing timelines of already indexed games."""
+        for timeline in timelines:
+            self.timelines[timeline.gameId] = timeline
+        self._columns = None
+
+    @property
+    def columns(self) -> dict[str, ndarray]:
+        """Plays of all games sorted by `key` (game ID and event ID), with game columns repeated for every play."""
+        if self._columns is None:
+            self._columns = self._concatenate()
+        return self._columns
+
+    def _concatenate(self) -> dict[str, ndarray]:
+        """Concatenates timelines and sorts plays by key."""
+        timelines = list(self.timelines.values())
+        if not timelines:
+            return {name: zeros(0, dtype=int64) for name in (*GAME_COLUMNS, "key", *EVENT_COLUMNS)}
+        counts = [len(timeline) for timeline in timelines]
+        columns = {name: concatenate([timeline.events[name] for timeline in timelines]) for name in EVENT_COLUMNS}
+        for name in GAME_COLUMNS:
+            columns[name] = repeat(array([getattr(timeline, name) for timeline in timelines], dtype=int64), counts)
+        columns["key"] = columns["gameId"] * 10**5 + columns["eventId"]
+        order = columns["key"].argsort(kind="stable")
+        return {name: values[order] for name, values in columns.items()}
+
+    def states(self, shots: DataFrame) -> DataFrame:
+        """Gets game state of shots (SOG rows) from the perspective of the shooting team.
+
+        Returns:
+            DataFrame: `gameSeconds`, `strength` (e.g. "5v4"), `state` (`GAME_STATES`) and `scoreDiff` (goals of
+                the shooting team minus goals of the opponent before the shot), aligned with rows of `shots`.
+                Shots of games missing in the index get missing values.
+        """
+        columns = self.columns
+        if not len(columns["key"]):
+            return DataFrame(columns=["gameSeconds", "strength", "state", "scoreDiff"], index=shots.index)
+        keys = numeric_array(shots["gameId"], int64) * 10**5 + numeric_array(shots["eventId"], int64)
+        index = searchsorted(columns["key"], keys).clip(max=len(columns["key"]) - 1)
+        found = columns["key"][index] == keys
+        sides = _sides(columns, index, numeric_array(shots["eventOwnerTeamId"], int64) == columns["homeTeamId"][index])
+        states = DataFrame(
+            {
+                "gameSeconds": columns["seconds"][index],
+                "strength": _labels(sides, "strength"),
+                "state": _labels(sides, "state"),
+                "scoreDiff": sides["scoreFor"] - sides["scoreAgainst"],
+            },
+            index=shots.index,
+        )
+        return states.where(Series(found, index=shots.index), axis=0)
+
+    def time_on_ice(self, team_id: int, by: str = "state", seasons: Iterable[int] | None = None) -> Series:
+        """Gets seconds a team played in every game state of given seasons (all by default).
+
+        Args:
+            team_id (int): Team ID.
+            by (str, optional): "state" for `GAME_STATES`, "strength" for labels like "5v4". Defaults to "state".
+            seasons (Iterable[int] | None, optional): Seasons, e.g. [20232024]. Defaults to None (all seasons).
+
+        Returns:
+            Series: Seconds by state.
+        """
+        columns = self.columns
+        mask = (columns["homeTeamId"] == team_id) | (columns["awayTeamId"] == team_id)
+        if seasons is not None:
+            mask &= isin(season_from_game_id(columns["gameId"]), list(seasons))
+        index = mask.nonzero()[0]
+        labels = _labels(_sides(columns, index, columns["homeTeamId"][index] == team_id), by)
+        return Series(columns["duration"][index]).groupby(labels).sum()
+
+
+def _sides(columns: dict[str, ndarray], index: ndarray, is_home: ndarray) -> dict[str, ndarray]:
+    """Gets skaters, goalies and scores of selected plays for and against the team given by `is_home` flags."""
+    sides = {}
+    for name in ("Skaters", "Goalie", "Score"):
+        home, away = columns[f"home{name}"][index], columns[f"away{name}"][index]
+        sides[f"{name.lower()}For"] = where(is_home, home, away)
+        sides[f"{name.lower()}Against"] = where(is_home, away, home)
+    return sides
+
+
+def _labels(sides: dict[str, ndarray], by: str) -> ndarray:
+    """Gets strength labels (by "strength") or game states (by "state") of a team."""
+    if by == "strength":
+        return strength_labels(sides["skatersFor"], sides["skatersAgainst"])
+    return game_states(sides["skatersFor"], sides["skatersAgainst"], sides["goalieFor"], sides["goalieAgainst"])
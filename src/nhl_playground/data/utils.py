@@ -1,4 +1,12 @@
-from nhl_playground.data.dataclasses import Play, SOG
+from numpy import arctan2, asarray, degrees, hypot, nan, ndarray, where
+from pandas import Series, to_numeric
+
+from nhl_playground.data.dataclasses import SOG, Game, Play
+
+# Distance of goal lines from the center of the rink in the API coordinate system (feet).
+NET_X: float = 89.0
+# Even strength with both goalies in net, used for missing situation codes.
+DEFAULT_SITUATION_CODE: int = 1551
 
 
 def time2sec(time_str: str) -> int:
@@ -6,9 +14,26 @@ def time2sec(time_str: str) -> int:
     return 60 * time[0] + time[1]
 
 
-def play2sog(play: Play) -> SOG:
-    """Loads a play to SOG dataclass."""
+def season_from_game_id(game_id: int) -> int:
+    """Gets season (e.g. 20232024) from game ID (e.g. 2023020001)."""
+    start_year = game_id // 1_000_000
+    return start_year * 10_000 + start_year + 1
+
+
+def numeric_array(values: Series, dtype: type = float) -> ndarray:
+    """Converts column (plain, nullable or object) to numpy array, missing values of float arrays become NaN.
+
+    Integer arrays, e.g. of game and event IDs, require columns without missing values.
+    """
+    return to_numeric(values, errors="coerce").to_numpy(dtype=dtype, na_value=nan)
+
+
+def play2sog(play: Play, game: Game) -> SOG:
+    """Loads a play of a given game to SOG dataclass."""
     return SOG(
+        gameId=int(game.key),
+        homeTeamId=game.homeTeam_id,
+        awayTeamId=game.awayTeam_id,
         eventId=play.eventId,
         homeTeamDefendingSide=play.homeTeamDefendingSide,
         periodNumber=play.periodDescriptor["number"],
@@ -18,6 +43,9 @@ def play2sog(play: Play) -> SOG:
         timeRemaining=time2sec(play.timeRemaining),
         prevDescKey=play.prevDescKey,
         prevTypeCode=play.prevTypeCode,
+        timeSinceLastEvent=play.timeSinceLastEvent,
+        prevXCoord=play.prevXCoord,
+        prevYCoord=play.prevYCoord,
         isGoal=play.typeDescKey == "goal",
         xCoord=play.other["details"].get("xCoord"),  # TODO impute missing values
         yCoord=play.other["details"].get("yCoord"),  #
@@ -28,4 +56,44 @@ def play2sog(play: Play) -> SOG:
         goalieInNetId=play.other["details"].get("goalieInNetId", -1),
         eventOwnerTeamId=play.other["details"]["eventOwnerTeamId"],
         situationCode=play.other["situationCode"],
+        gameDate=game.gameDate,
     )
+
+
+def attacking_coords(
+    x: ndarray,
+    y: ndarray,
+    home_defending_side: ndarray,
+    is_home: ndarray,
+) -> tuple[ndarray, ndarray]:
+    """Normalizes coordinates of events, so that the acting team always attacks the net at positive x.
+
+    Args:
+        x (ndarray): `xCoord` values.
+        y (ndarray): `yCoord` values.
+        home_defending_side (ndarray): `homeTeamDefendingSide` values ("left" or "right").
+        is_home (ndarray): Flags that the event is owned by the home team.
+
+    Returns:
+        tuple[ndarray, ndarray]: Normalized x and y coordinates.
+    """
+    attacks_right = (asarray(home_defending_side) == "left") == asarray(is_home, dtype=bool)
+    sign = where(attacks_right, 1.0, -1.0)
+    return asarray(x, dtype=float) * sign, asarray(y, dtype=float) * sign
+
+
+def shot_distance_angle(x: ndarray, y: ndarray) -> tuple[ndarray, ndarray]:
+    """Gets distance (feet) and angle (degrees, 0 is straight on, over 90 behind the net) of normalized shots."""
+    dx = NET_X - asarray(x, dtype=float)
+    y = asarray(y, dtype=float)
+    return hypot(dx, y), degrees(arctan2(abs(y), dx))
+
+
+def split_situation_code(codes: ndarray) -> tuple[ndarray, ndarray, ndarray, ndarray]:
+    """Splits `situationCode` values into away goalie in net, away skaters, home skaters and home goalie in net.
+
+    E.g. "1451" is a home power play and "0651" an empty away net. Works for string codes of the API as well
+    as integer codes of stored datasets ("0651" -> 651), missing codes are taken as `DEFAULT_SITUATION_CODE`.
+    """
+    code = to_numeric(Series(codes), errors="coerce").fillna(DEFAULT_SITUATION_CODE).to_numpy(dtype=int)
+    return code // 1000, code // 100 % 10, code // 10 % 10, code % 10
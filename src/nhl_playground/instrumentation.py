@@ -0,0 +1,174 @@
+import cProfile
+import json
+import pstats
+import tracemalloc
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from threading import Lock, local
+from time import perf_counter
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass
+class StageTimer:
+    """Accumulated time of one pipeline stage.
+
+    `seconds` include time of nested stages, `self_seconds` exclude it, so self times of all stages add up
+    to the instrumented time.
+    """
+
+    calls: int = 0
+    seconds: float = 0.0
+    self_seconds: float = 0.0
+
+
+class Instrumentation:
+    """Per-stage timers, counters and optional cProfile/tracemalloc capture of a pipeline run.
+
+    One instance is shared by all components of a run (scrapers, request layer, loaders, preprocessors), which
+    report their stages and counters into it. Disabled instance makes all calls no-ops.
+    Timers are thread-safe, stages are nested per thread.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        profile: bool = False,
+        trace_memory: bool = False,
+        top: int = 25,
+    ) -> None:
+        """Instrumentation constructor.
+
+        Args:
+            enabled (bool, optional): Flag to collect timers and counters. Defaults to True.
+            profile (bool, optional): Flag to run cProfile between `start` and `stop`. Defaults to False.
+            trace_memory (bool, optional): Flag to trace allocations with tracemalloc between `start` and `stop`.
+                Defaults to False.
+            top (int, optional): Number of functions and allocation sites in the report. Defaults to 25.
+        """
+        self.enabled = enabled
+        self.top = top
+        self.stages: dict[str, StageTimer] = {}
+        self.counters: Counter[str] = Counter()
+        self._profiler = cProfile.Profile() if profile else None
+        self._trace_memory = trace_memory
+        self._memory: dict[str, Any] = {}
+        self._started: float | None = None
+        self._wall_seconds = 0.0
+        self._lock = Lock()
+        self._local = local()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Measures time spent in the block as a stage, e.g. `with instrumentation.stage("load"): ...`."""
+        if not self.enabled:
+            yield
+            return
+        stack: list[float] = self._local.__dict__.setdefault("children", [])
+        stack.append(0.0)
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = perf_counter() - start
+            children = stack.pop()
+            if stack:
+                stack[-1] += elapsed
+            with self._lock:
+                timer = self.stages.setdefault(name, StageTimer())
+                timer.calls += 1
+                timer.seconds += elapsed
+                timer.self_seconds += elapsed - children
+
+    def __reduce__(self) -> tuple[type["Instrumentation"], tuple[bool]]:
+        """Pickles as a disabled instance, measurements made in other processes would not reach this one."""
+        return Instrumentation, (False,)
+
+    def timed(self, name: str, items: Iterable[T]) -> Iterator[T]:
+        """Wraps iterable, measuring time of producing every item as a stage, e.g. lazy parsing of input."""
+        if not self.enabled:
+            yield from items
+            return
+        iterator = iter(items)
+        while True:
+            with self.stage(name):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+
+    def count(self, name: str, n: int = 1) -> None:
+        """Increases counter, e.g. number of processed games or received bytes."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] += n
+
+    def start(self) -> None:
+        """Starts measuring wall time and profiling or memory tracing if enabled."""
+        self._started = perf_counter()
+        if self._trace_memory:
+            tracemalloc.start()
+        if self._profiler:
+            self._profiler.enable()
+
+    def stop(self) -> None:
+        """Stops measuring and collects profiling and memory results."""
+        if self._profiler:
+            self._profiler.disable()
+        if self._trace_memory and tracemalloc.is_tracing():
+            snapshot = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            self._memory = {
+                "peak_mib": peak / 1024**2,
+                "top": [
+                    {"location": str(stat.traceback), "size_mib": stat.size / 1024**2, "count": stat.count}
+                    for stat in snapshot.statistics("lineno")[: self.top]
+                ],
+            }
+        if self._started is not None:
+            self._wall_seconds += perf_counter() - self._started
+            self._started = None
+
+    def report(self) -> dict[str, Any]:
+        """Gets structured report of the run."""
+        with self._lock:
+            report: dict[str, Any] = {
+                "wall_seconds": self._wall_seconds,
+                "stages": {name: vars(timer).copy() for name, timer in self.stages.items()},
+                "counters": dict(self.counters),
+            }
+        if self._memory:
+            report["memory"] = self._memory
+        if self._profiler:
+            report["profile"] = self._profile_report()
+        return report
+
+    def save(self, path: str) -> None:
+        """Saves report as JSON."""
+        with open(path, "w") as file:
+            json.dump(self.report(), file, indent=2)
+
+    def _profile_report(self) -> list[dict[str, Any]]:
+        """Gets functions with the highest cumulative time."""
+        stats = pstats.Stats(self._profiler).stats
+        rows = [
+            {
+                "function": f"{file}:{line}({function})",
+                "calls": calls,
+                "tottime": tottime,
+                "cumtime": cumtime,
+            }
+            for (file, line, function), (_, calls, tottime, cumtime, _) in stats.items()
+        ]
+        return sorted(rows, key=lambda row: row["cumtime"], reverse=True)[: self.top]
+
+
+# Shared disabled instance used by components created without instrumentation.
+NO_INSTRUMENTATION = Instrumentation(enabled=False)
@@ -0,0 +1,165 @@
+from typing import Any
+
+import joblib
+from numpy import arange, column_stack, concatenate, isnan, nan, nanmedian, ndarray, where, zeros
+from pandas import Categorical, DataFrame, Series
+from sklearn.base import BaseEstimator, ClassifierMixin, TransformerMixin
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import brier_score_loss, log_loss, roc_auc_score
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from nhl_playground.data.utils import attacking_coords, numeric_array, shot_distance_angle, split_situation_code
+
+TARGET_COLUMN = "isGoal"
+NUMERIC_FEATURES: tuple[str, ...] = ("distance", "angle", "skatersFor", "skatersAgainst", "emptyNet")
+CATEGORICAL_FEATURES: tuple[str, ...] = ("shotType", "prevDescKey")
+
+
+def decode_situation(codes: Series, is_home: ndarray) -> dict[str, ndarray]:
+    """Decodes `situationCode` relative to the shooting team (see `split_situation_code`).
+
+    Returns:
+        dict[str, ndarray]: `skatersFor`, `skatersAgainst` and `emptyNet` (goalie of the defending team pulled).
+    """
+    away_goalie, away_skaters, home_skaters, home_goalie = split_situation_code(codes.to_numpy(dtype=object))
+    return {
+        "skatersFor": where(is_home, home_skaters, away_skaters).astype(float),
+        "skatersAgainst": where(is_home, away_skaters, home_skaters).astype(float),
+        "emptyNet": (where(is_home, away_goalie, home_goalie) == 0).astype(float),
+    }
+
+
+def shot_features(data: DataFrame) -> dict[str, ndarray]:
+    """Computes numeric features of SOG rows (see `nhl_playground.data.dataclasses.SOG`) with vectorized operations.
+
+    Shot coordinates are normalized by `homeTeamDefendingSide`, so distance and angle are measured to the attacked
+    net. Missing coordinates give NaN distance and angle.
+    """
+    is_home = numeric_array(data["eventOwnerTeamId"]) == numeric_array(data["homeTeamId"])
+    x, y = attacking_coords(
+        numeric_array(data["xCoord"]),
+        numeric_array(data["yCoord"]),
+        data["homeTeamDefendingSide"].to_numpy(dtype=object),
+        is_home,
+    )
+    distance, angle = shot_distance_angle(x, y)
+    return {"distance": distance, "angle": angle, **decode_situation(data["situationCode"], is_home)}
+
+
+def one_hot(values: Series, categories: tuple[str, ...]) -> ndarray:
+    """One-hot encodes column, unknown and missing values are encoded as all zeros."""
+    codes = Categorical(values.astype(object), categories=categories).codes
+    return (codes[:, None] == arange(len(categories))).astype(float)
+
+
+class ShotEncoder(TransformerMixin, BaseEstimator):
+    """Encoder of SOG DataFrame rows into a feature matrix.
+
+    Features are distance and angle of the shot, decoded situation and one-hot `shotType` and `prevDescKey`
+    (categories learned by `fit`, missing when `add_prev_play_name` enrichment was not applied). Missing distances
+    and angles are imputed by medians of the training data.
+    """
+
+    def __init__(self, categorical: tuple[str, ...] = CATEGORICAL_FEATURES) -> None:
+        """Encoder constructor.
+
+        Args:
+            categorical (tuple[str, ...], optional): One-hot encoded columns. Defaults to `CATEGORICAL_FEATURES`.
+        """
+        self.categorical = categorical
+
+    def fit(self, data: DataFrame, y: Any = None) -> "ShotEncoder":  # noqa: ARG002
+        """Learns categories of categorical columns and medians of numeric features."""
+        features = shot_features(data)
+        self.medians_ = {name: float(nanmedian(features[name])) for name in NUMERIC_FEATURES}
+        self.categories_ = {
+            column: tuple(sorted(data[column].dropna().astype(str).unique())) if column in data else ()
+            for column in self.categorical
+        }
+        return self
+
+    def transform(self, data: DataFrame) -> ndarray:
+        """Encodes rows into a float matrix with columns named by `get_feature_names_out`."""
+        features = shot_features(data)
+        numeric = [where(isnan(features[name]), self.medians_[name], features[name]) for name in NUMERIC_FEATURES]
+        one_hots = [
+            one_hot(data[column] if column in data else Series([None] * len(data)), categories)
+            for column, categories in self.categories_.items()
+        ]
+        return concatenate([column_stack(numeric), *one_hots], axis=1)
+
+    def get_feature_names_out(self, input_features: Any = None) -> list[str]:  # noqa: ARG002
+        """Gets names of encoded features."""
+        names = list(NUMERIC_FEATURES)
+        for column, categories in self.categories_.items():
+            names.extend(f"{column}={category}" for category in categories)
+        return names
+
+
+class XGModel:
+    """Expected goals model, probability of a shot on goal being a goal.
+
+    Wraps `ShotEncoder` and a scikit-learn classifier into a pipeline trained and scored directly on the output
+    of `XGPreprocessor.format` or `read_sog_parquet`. Scoring is vectorized, a season of shots is scored in one call.
+    """
+
+    def __init__(self, estimator: ClassifierMixin | None = None, encoder: ShotEncoder | None = None) -> None:
+        """Model constructor.
+
+        Args:
+            estimator (ClassifierMixin | None, optional): Classifier with `predict_proba`. Defaults to logistic
+                regression on standardized features.
+            encoder (ShotEncoder | None, optional): Feature encoder. Defaults to `ShotEncoder()`.
+        """
+        steps: list[tuple[str, Any]] = [("encoder", encoder or ShotEncoder())]
+        if estimator is None:
+            steps.append(("scaler", StandardScaler()))
+            estimator = LogisticRegression(max_iter=1000)
+        self.pipeline = Pipeline([*steps, ("estimator", estimator)])
+
+    def fit(self, data: DataFrame) -> "XGModel":
+        """Trains the model on SOG rows labeled by `isGoal`."""
+        self.pipeline.fit(data, data[TARGET_COLUMN].astype(bool).to_numpy())
+        return self
+
+    def predict_proba(self, data: DataFrame, batch_size: int | None = None) -> ndarray:
+        """Gets goal probability (xG) of every row.
+
+        Args:
+            data (DataFrame): SOG rows.
+            batch_size (int | None, optional): Number of rows encoded at once, bounds memory of encoded features.
+                Defaults to None (all rows at once).
+
+        Returns:
+            ndarray: Goal probabilities in the order of rows.
+        """
+        if not len(data):
+            return zeros(0)
+        size = batch_size or len(data)
+        batches = [self.pipeline.predict_proba(data.iloc[i : i + size])[:, 1] for i in range(0, len(data), size)]
+        return concatenate(batches)
+
+    def evaluate(self, data: DataFrame) -> dict[str, float]:
+        """Gets log loss, Brier score, ROC AUC and total expected vs actual goals on labeled SOG rows."""
+        y = data[TARGET_COLUMN].astype(bool).to_numpy()
+        xg = self.predict_proba(data)
+        return {
+            "log_loss": float(log_loss(y, xg, labels=[False, True])),
+            "brier": float(brier_score_loss(y, xg)),
+            "roc_auc": float(roc_auc_score(y, xg)) if 0 < y.sum() < len(y) else nan,
+            "xg": float(xg.sum()),
+            "goals": float(y.sum()),
+        }
+
+    def save(self, path: str) -> None:
+        """Saves the model with joblib."""
+        joblib.dump(self, path, compress=3)
+
+    @classmethod
+    def load(cls, path: str) -> "XGModel":
+        """Loads model saved by `save`."""
+        model = joblib.load(path)
+        if not isinstance(model, cls):
+            raise TypeError(f"{path} does not contain {cls.__name__}.")
+        return model
@@ -0,0 +1,254 @@
+import os
+import sqlite3
+from contextlib import suppress
+from dataclasses import dataclass, field
+from hashlib import sha256
+from threading import Lock, get_ident
+from time import time
+from typing import Any
+
+# Finished games never change, so their PbP responses never expire.
+FINAL_GAME_STATES: tuple[str, ...] = ("OFF", "FINAL")
+
+DEFAULT_TTLS: dict[str, float | None] = {
+    "TeamInfo": 24 * 3600,
+    "ScheduleTeamSeason": 6 * 3600,
+    "GameList": 15 * 60,
+    "PlayByPlay": 60,
+    "TeamSeasonStats": 6 * 3600,
+    "Team": 6 * 3600,
+}
+
+
+@dataclass
+class CacheStats:
+    """Cache counters. Misses are all requests sent to the API, revalidated are misses answered by 304."""
+
+    hits: int = 0
+    misses: int = 0
+    revalidated: int = 0
+    stores: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Ratio of requests served from cache without contacting the API."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+@dataclass
+class CacheEntry:
+    """Index record of a cached response."""
+
+    url: str
+    endpoint: str
+    digest: str
+    size: int
+    stored_at: float
+    expires_at: float | None
+    etag: str | None = None
+    last_modified: str | None = None
+
+    def is_fresh(self, now: float | None = None) -> bool:
+        """Checks if entry can be served without revalidation."""
+        return self.expires_at is None or (now or time()) < self.expires_at
+
+    def conditional_headers(self) -> dict[str, str]:
+        """Headers for conditional revalidation of a stale entry."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+@dataclass
+class ResponseCache:
+    """Persistent content-addressed cache of raw NHL API responses.
+
+    Response bodies are stored once per content hash under `directory/objects`, a SQLite index maps URLs to
+    bodies together with their expiry and validators. Least recently used entries are evicted when the total
+    size of stored bodies exceeds `max_bytes`. The total size is tracked in memory and access times of hits are
+    buffered until the next eviction or `close`, so hits and stores do not scan or rewrite the index.
+    """
+
+    directory: str
+    ttls: dict[str, float | None] = field(default_factory=lambda: dict(DEFAULT_TTLS))
+    default_ttl: float | None = 3600
+    max_bytes: int = 2 * 1024**3
+    stats: CacheStats = field(default_factory=CacheStats)
+
+    def __post_init__(self) -> None:
+        """Opens (or creates) cache index."""
+        os.makedirs(os.path.join(self.directory, "objects"), exist_ok=True)
+        self._lock = Lock()
+        self._db = sqlite3.connect(os.path.join(self.directory, "index.sqlite"), check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entries (url TEXT PRIMARY KEY, endpoint TEXT, digest TEXT, size INTEGER, "
+            "stored_at REAL, expires_at REAL, etag TEXT, last_modified TEXT, last_access REAL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_digest ON entries (digest)")
+        self._db.commit()
+        (self._bytes,) = self._db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM (SELECT DISTINCT digest, size FROM entries)"
+        ).fetchone()
+        self._accessed: dict[str, float] = {}
+
+    def get(self, url: str) -> tuple[CacheEntry | None, bytes | None]:
+        """Gets cache entry and its body for a given URL.
+
+        Body is returned only for fresh entries (a hit). Stale entries are returned without body so their
+        validators can be used for a conditional request (a miss).
+        """
+        entry = self.lookup(url)
+        body = self.read(entry) if entry and entry.is_fresh() else None
+        with self._lock:
+            if body is None:
+                self.stats.misses += 1
+            else:
+                self.stats.hits += 1
+        return entry, body
+
+    def lookup(self, url: str) -> CacheEntry | None:
+        """Gets cache entry for a given URL, fresh or stale. Returns None if URL is not cached."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT url, endpoint, digest, size, stored_at, expires_at, etag, last_modified FROM entries "
+                "WHERE url = ?",
+                (url,),
+            ).fetchone()
+            if row is None:
+                return None
+            self._accessed[url] = time()
+        return CacheEntry(*row)
+
+    def read(self, entry: CacheEntry) -> bytes | None:
+        """Reads cached response body. Returns None if the body is missing on disk."""
+        try:
+            with open(self._object_path(entry.digest), "rb") as file:
+                return file.read()
+        except FileNotFoundError:
+            return None
+
+    def store(
+        self,
+        endpoint: str,
+        url: str,
+        body: bytes,
+        headers: dict[str, str] | None = None,
+        data: dict[str, Any] | None = None,
+    ) -> None:
+        """Stores response body together with its validators and evicts old entries if needed.
+
+        Args:
+            endpoint (str): Endpoint name, used to pick TTL.
+            url (str): Requested URL.
+            body (bytes): Raw response body.
+            headers (dict[str, str] | None, optional): Response headers with ETag/Last-Modified validators.
+            data (dict[str, Any] | None, optional): Decoded body, used to detect finished games.
+        """
+        headers = headers or {}
+        digest = sha256(body).hexdigest()
+        path = self._object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{get_ident()}.tmp"
+            with open(tmp_path, "wb") as file:
+                file.write(body)
+            os.replace(tmp_path, path)
+
+        now = time()
+        ttl = self._ttl(endpoint, data)
+        with self._lock:
+            replaced = self._db.execute("SELECT digest, size FROM entries WHERE url = ?", (url,)).fetchone()
+            if not self._is_referenced(digest):
+                self._bytes += len(body)
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    url,
+                    endpoint,
+                    digest,
+                    len(body),
+                    now,
+                    None if ttl is None else now + ttl,
+                    headers.get("ETag"),
+                    headers.get("Last-Modified"),
+                    now,
+                ),
+            )
+            if replaced and not self._is_referenced(replaced[0]):
+                self._bytes -= replaced[1]
+            self._db.commit()
+            self._accessed.pop(url, None)
+            self.stats.stores += 1
+        self._evict()
+
+    def revalidate(self, entry: CacheEntry, headers: dict[str, str] | None = None) -> None:
+        """Marks stale entry as fresh again after `304 Not Modified` response."""
+        headers = headers or {}
+        now = time()
+        ttl = self.ttls.get(entry.endpoint, self.default_ttl)
+        with self._lock:
+            self._db.execute(
+                "UPDATE entries SET stored_at = ?, expires_at = ?, etag = COALESCE(?, etag), "
+                "last_modified = COALESCE(?, last_modified) WHERE url = ?",
+                (now, None if ttl is None else now + ttl, headers.get("ETag"), headers.get("Last-Modified"), entry.url),
+            )
+            self._db.commit()
+            self.stats.revalidated += 1
+
+    def size(self) -> int:
+        """Total size of stored response bodies in bytes."""
+        with self._lock:
+            return self._bytes
+
+    def close(self) -> None:
+        """Writes buffered access times and closes cache index."""
+        with self._lock:
+            self._flush_accesses()
+            self._db.close()
+
+    def _ttl(self, endpoint: str, data: dict[str, Any] | None) -> float | None:
+        """Gets TTL of a response, finished games never expire."""
+        if endpoint == "PlayByPlay" and data and data.get("gameState") in FINAL_GAME_STATES:
+            return None
+        return self.ttls.get(endpoint, self.default_ttl)
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.directory, "objects", digest[:2], digest)
+
+    def _is_referenced(self, digest: str) -> bool:
+        return self._db.execute("SELECT 1 FROM entries WHERE digest = ?", (digest,)).fetchone() is not None
+
+    def _flush_accesses(self) -> None:
+        """Writes access times buffered by `lookup` to the index."""
+        if self._accessed:
+            self._db.executemany(
+                "UPDATE entries SET last_access = ? WHERE url = ?", [(at, url) for url, at in self._accessed.items()]
+            )
+            self._db.commit()
+            self._accessed.clear()
+
+    def _evict(self) -> None:
+        """Evicts least recently used entries until cache fits into `max_bytes`."""
+        with self._lock:
+            if self._bytes <= self.max_bytes:
+                return
+            self._flush_accesses()
+            rows = self._db.execute("SELECT url, digest, size FROM entries ORDER BY last_access").fetchall()
+            for url, digest, size in rows:
+                if self._bytes <= self.max_bytes:
+                    break
+                self._db.execute("DELETE FROM entries WHERE url = ?", (url,))
+                if not self._is_referenced(digest):
+                    self._bytes -= size
+                    self._remove_object(digest)
+                self.stats.evictions += 1
+            self._db.commit()
+
+    def _remove_object(self, digest: str) -> None:
+        with suppress(FileNotFoundError):
+            os.remove(self._object_path(digest))
@@ -0,0 +1,81 @@
+import os
+from collections.abc import Iterator
+from threading import Lock
+from time import monotonic
+from typing import Any
+
+from nhl_playground.data.storage import JsonLinesWriter, iter_json_lines
+
+
+class Checkpoint:
+    """Durable progress of a scrape, one completed work unit (e.g. game or team) per JSON line.
+
+    Every recorded unit is flushed to the file immediately and the file is synced to disk at least every
+    `sync_interval` seconds, so a crash loses at most the last few seconds of work. Units can be recorded
+    concurrently by scraper worker threads.
+    """
+
+    def __init__(self, path: str, resume: bool = True, sync_interval: float = 1.0) -> None:
+        """Opens checkpoint file.
+
+        Args:
+            path (str): Checkpoint file path.
+            resume (bool, optional): Flag to keep units completed by a previous run. Defaults to True.
+            sync_interval (float, optional): Maximal number of seconds between syncs to disk. Defaults to 1.
+        """
+        self.path = path
+        self.sync_interval = sync_interval
+        self.done: set[str] = set()
+        if resume and os.path.exists(path):
+            self._repair()
+        self._writer = JsonLinesWriter(path, append=resume)
+        self._synced = monotonic()
+        self._lock = Lock()
+
+    def __contains__(self, key: object) -> bool:
+        """Checks if unit was already completed."""
+        return key in self.done
+
+    def __len__(self) -> int:
+        """Number of completed units."""
+        return len(self.done)
+
+    def record(self, key: str, item: dict[str, Any]) -> None:
+        """Records completed unit and its scraped data."""
+        with self._lock:
+            self._writer.write(key, item)
+            sync = monotonic() - self._synced >= self.sync_interval
+            self._writer.flush(sync=sync)
+            if sync:
+                self._synced = monotonic()
+            self.done.add(key)
+
+    def items(self) -> Iterator[tuple[str, dict[str, Any]]]:
+        """Lazily reads completed units and their data."""
+        with self._lock:
+            self._writer.flush()
+        seen: set[str] = set()
+        for key, item in iter_json_lines(self.path, tolerant=True):
+            if key in self.done and key not in seen:
+                seen.add(key)
+                yield key, item
+
+    def _repair(self) -> None:
+        """Rewrites checkpoint file without a record truncated by a crash, so new records can be appended."""
+        tmp_path = f"{self.path}.tmp{'.gz' if self.path.endswith('.gz') else ''}"
+        with JsonLinesWriter(tmp_path) as writer:
+            for key, item in iter_json_lines(self.path, tolerant=True):
+                writer.write(key, item)
+                self.done.add(key)
+        os.replace(tmp_path, self.path)
+
+    def close(self, remove: bool = False) -> None:
+        """Closes checkpoint file.
+
+        Args:
+            remove (bool, optional): Flag to delete the file, e.g. once the complete data were saved.
+                Defaults to False.
+        """
+        self._writer.close()
+        if remove:
+            os.remove(self.path)
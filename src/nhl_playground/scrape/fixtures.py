@@ -0,0 +1,81 @@
+import json
+import os
+from collections.abc import Iterator
+from threading import Lock, get_ident
+from typing import Any
+from urllib.parse import quote, unquote
+
+
+class FixtureStore:
+    """Recorded API responses keyed by endpoint and arguments, one JSON file per response.
+
+    Responses are stored as `<root>/<endpoint>/<arguments>.json`, e.g. `PlayByPlay/game-id=2023020001.json`,
+    so fixtures can be inspected, edited or removed by hand. Files are written atomically, recording from
+    concurrent scraper workers is safe.
+    """
+
+    def __init__(self, root: str) -> None:
+        """Store constructor, creates the root directory.
+
+        Args:
+            root (str): Directory of fixtures.
+        """
+        self.root = root
+        self.recorded = 0
+        self._lock = Lock()
+        os.makedirs(root, exist_ok=True)
+
+    @staticmethod
+    def key(endpoint: str, args: dict[str, Any]) -> str:
+        """Gets relative path of a fixture, arguments are sorted by name and URL quoted."""
+        name = "&".join(f"{quote(str(k), safe='-_')}={quote(str(v), safe='-_')}" for k, v in sorted(args.items()))
+        return os.path.join(endpoint, f"{name or '_'}.json")
+
+    def path(self, endpoint: str, args: dict[str, Any]) -> str:
+        """Gets absolute path of a fixture."""
+        return os.path.join(self.root, self.key(endpoint, args))
+
+    def record(self, endpoint: str, args: dict[str, Any], data: dict[str, Any] | bytes) -> None:
+        """Stores response body (or decoded data) of an endpoint, replacing a fixture recorded before."""
+        body = data if isinstance(data, bytes) else json.dumps(data).encode()
+        path = self.path(endpoint, args)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{get_ident()}.tmp"
+        with open(tmp_path, "wb") as file:
+            file.write(body)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self.recorded += 1
+
+    def get(self, endpoint: str, args: dict[str, Any]) -> bytes | None:
+        """Gets recorded response body, None if the response was not recorded."""
+        try:
+            with open(self.path(endpoint, args), "rb") as file:
+                return file.read()
+        except FileNotFoundError:
+            return None
+
+    def __contains__(self, item: object) -> bool:
+        """Checks if (endpoint, args) pair is recorded."""
+        endpoint, args = item
+        return os.path.exists(self.path(endpoint, args))
+
+    def __iter__(self) -> Iterator[tuple[str, dict[str, str]]]:
+        """Iterates over recorded (endpoint, args) pairs."""
+        for endpoint in sorted(os.listdir(self.root)):
+            directory = os.path.join(self.root, endpoint)
+            if not os.path.isdir(directory):
+                continue
+            for name in sorted(os.listdir(directory)):
+                if name.endswith(".json"):
+                    yield endpoint, _parse_args(name.removesuffix(".json"))
+
+    def __len__(self) -> int:
+        """Number of recorded responses."""
+        return sum(1 for _ in self)
+
+
+def _parse_args(name: str) -> dict[str, str]:
+    if name == "_":
+        return {}
+    return dict(tuple(unquote(part) for part in pair.split("=", 1)) for pair in name.split("&"))
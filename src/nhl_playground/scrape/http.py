@@ -0,0 +1,341 @@
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from random import uniform
+from threading import Condition, Lock
+from time import monotonic, sleep
+
+from requests import RequestException, Response, Session
+from requests.adapters import HTTPAdapter
+
+from nhl_playground.instrumentation import NO_INSTRUMENTATION, Instrumentation
+
+_SESSION: Session | None = None
+_POOL_SIZE: int = 0
+_LOCK = Lock()
+
+
+def get_session(pool_size: int = 10) -> Session:
+    """Returns process-wide keep-alive session shared by all scrapers.
+
+    The connection pool is grown when a scraper asks for more connections than currently available,
+    the session itself is never replaced so all scrapers keep reusing the same connections.
+
+    Args:
+        pool_size (int, optional): Minimal number of pooled connections per host. Defaults to 10.
+
+    Returns:
+        Session: Shared requests session.
+    """
+    global _SESSION, _POOL_SIZE
+    with _LOCK:
+        if _SESSION is None:
+            _SESSION = Session()
+        if pool_size > _POOL_SIZE:
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            _SESSION.mount("http://", adapter)
+            _SESSION.mount("https://", adapter)
+            _POOL_SIZE = pool_size
+        return _SESSION
+
+
+class ScrapeError(Exception):
+    """Raised when data cannot be scraped from the API."""
+
+
+class CircuitOpenError(ScrapeError):
+    """Raised when requests to an endpoint are suspended by its circuit breaker."""
+
+
+class TokenBucket:
+    """Thread-safe token bucket rate limiter.
+
+    The rate is adaptive: it is halved whenever the API throttles us (AIMD) and grows back by `step`
+    after every successful request, up to `max_rate`.
+    """
+
+    def __init__(self, rate: float = 20.0, min_rate: float = 0.5, step: float = 0.1) -> None:
+        """Rate limiter constructor.
+
+        Args:
+            rate (float, optional): Maximal number of requests per second. Defaults to 20.
+            min_rate (float, optional): Lower bound of the adaptive rate. Defaults to 0.5.
+            step (float, optional): Rate increase after a successful request. Defaults to 0.1.
+        """
+        self.rate = rate
+        self.max_rate = rate
+        self.min_rate = min_rate
+        self.step = step
+        self.capacity = max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = monotonic()
+        self._lock = Lock()
+
+    def acquire(self) -> None:
+        """Blocks until a request can be sent."""
+        while True:
+            with self._lock:
+                now = monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            sleep(wait)
+
+    def decrease(self) -> None:
+        """Halves the rate after the API throttled a request."""
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+            self._tokens = min(self._tokens, 0.0)
+
+    def increase(self) -> None:
+        """Increases the rate after a successful request."""
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.step)
+
+
+@dataclass
+class RetryPolicy:
+    """Retry policy with exponential backoff, full jitter and Retry-After handling."""
+
+    max_retries: int = 5
+    backoff_base: float = 0.5
+    backoff_max: float = 60.0
+    statuses: tuple[int, ...] = (429, 500, 502, 503, 504)
+
+    def delay(self, attempt: int, retry_after: str | None = None) -> float:
+        """Gets number of seconds to wait before the next attempt (counted from 0)."""
+        backoff = uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+        return max(backoff, self.parse_retry_after(retry_after))
+
+    @staticmethod
+    def parse_retry_after(retry_after: str | None) -> float:
+        """Parses Retry-After header given either in seconds or as HTTP date."""
+        if not retry_after:
+            return 0.0
+        if retry_after.strip().isdigit():
+            return float(retry_after)
+        try:
+            return max(0.0, (parsedate_to_datetime(retry_after) - datetime.now(timezone.utc)).total_seconds())
+        except (TypeError, ValueError):
+            return 0.0
+
+
+# States of a circuit breaker.
+CLOSED: str = "closed"
+OPEN: str = "open"
+HALF_OPEN: str = "half-open"
+
+
+@dataclass
+class CircuitBreaker:
+    """Circuit breaker of one endpoint.
+
+    The circuit opens after `failure_threshold` consecutive failed requests and rejects requests for
+    `reset_timeout` seconds, then a single trial request is let through (half-open state). Other requests are
+    rejected until the trial resolves: its success closes the circuit, its failure opens it again.
+    """
+
+    failure_threshold: int = 5
+    reset_timeout: float = 30.0
+    failures: int = 0
+    state: str = CLOSED
+    opened_at: float | None = None
+    _condition: Condition = field(default_factory=Condition, repr=False)
+
+    def allow(self) -> bool:
+        """Checks if a request can be sent, the first check after `reset_timeout` admits the trial request."""
+        with self._condition:
+            return self._allow()
+
+    def _allow(self) -> bool:
+        if self.state == OPEN and self.retry_in() == 0:
+            self.state = HALF_OPEN
+            return True
+        return self.state == CLOSED
+
+    def retry_in(self) -> float:
+        """Gets seconds until an open circuit admits the trial request, 0 if the circuit is not open."""
+        if self.state != OPEN:
+            return 0.0
+        return max(0.0, self.opened_at + self.reset_timeout - monotonic())
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Blocks until a request can be sent, waiting for the reset timeout and the trial request to resolve.
+
+        Args:
+            timeout (float | None, optional): Maximal seconds to wait, None waits without limit. Defaults to None.
+
+        Returns:
+            bool: True if a request can be sent, False if the circuit is still open after `timeout`.
+        """
+        deadline = None if timeout is None else monotonic() + timeout
+        with self._condition:
+            while not self._allow():
+                # Open circuit wakes up at its reset time, half-open one when the trial resolves.
+                wait = self.retry_in() or None
+                if deadline is not None:
+                    wait = min(wait or timeout, deadline - monotonic())
+                    if wait <= 0:
+                        return False
+                self._condition.wait(wait)
+            return True
+
+    def record_success(self) -> None:
+        """Closes the circuit."""
+        with self._condition:
+            self.failures = 0
+            self.state = CLOSED
+            self.opened_at = None
+            self._condition.notify_all()
+
+    def record_failure(self) -> None:
+        """Counts failed request, opens the circuit when the threshold is reached or the trial request failed."""
+        with self._condition:
+            self.failures += 1
+            if self.failures >= self.failure_threshold or self.state == HALF_OPEN:
+                self.state = OPEN
+                self.opened_at = monotonic()
+            self._condition.notify_all()
+
+
+class RequestLayer:
+    """HTTP request layer with rate limiting, retries with backoff and per endpoint circuit breakers."""
+
+    def __init__(
+        self,
+        session: Session | None = None,
+        rate_limiter: TokenBucket | None = None,
+        retry: RetryPolicy | None = None,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        circuit_wait: float | None = 600.0,
+        timeout: float = 30.0,
+        instrumentation: Instrumentation | None = None,
+    ) -> None:
+        """Request layer constructor.
+
+        Args:
+            session (Session | None, optional): HTTP session. Defaults to the shared keep-alive session.
+            rate_limiter (TokenBucket | None, optional): Rate limiter. Defaults to None (no rate limiting).
+            retry (RetryPolicy | None, optional): Retry policy. Defaults to `RetryPolicy()`.
+            failure_threshold (int, optional): Consecutive failures opening a circuit. Defaults to 5.
+            reset_timeout (float, optional): Seconds before an open circuit lets a trial request through.
+                Defaults to 30.
+            circuit_wait (float | None, optional): Maximal seconds a request waits for an open circuit of its
+                endpoint, so scraping rides out an outage instead of failing. None waits without limit.
+                Defaults to 600.
+            timeout (float, optional): Timeout of a single request in seconds. Defaults to 30.
+            instrumentation (Instrumentation | None, optional): Collector of request timings and counters
+                (requests, retries, errors, received bytes). Defaults to None.
+        """
+        self.session = session or get_session()
+        self.rate_limiter = rate_limiter
+        self.retry = retry or RetryPolicy()
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.circuit_wait = circuit_wait
+        self.timeout = timeout
+        self.retries = 0
+        self.instrumentation = instrumentation or NO_INSTRUMENTATION
+        self._breakers: dict[str, CircuitBreaker] = {}
+        self._lock = Lock()
+
+    def breaker(self, endpoint: str) -> CircuitBreaker:
+        """Gets circuit breaker of an endpoint."""
+        with self._lock:
+            return self._breakers.setdefault(endpoint, CircuitBreaker(self.failure_threshold, self.reset_timeout))
+
+    def wait_for_circuits(self) -> None:
+        """Blocks until all open circuits reach their reset timeout, e.g. before retrying failed requests."""
+        with self._lock:
+            breakers = list(self._breakers.values())
+        sleep(max((breaker.retry_in() for breaker in breakers), default=0.0))
+
+    def get(self, url: str, endpoint: str = "", headers: dict[str, str] | None = None) -> Response:
+        """Sends GET request, retrying throttled requests, server errors and connection errors.
+
+        While the endpoint circuit is open, the request waits (at most `circuit_wait` seconds) until the circuit
+        lets it through.
+
+        Raises:
+            CircuitOpenError: When the endpoint circuit stays open for `circuit_wait` seconds.
+            ScrapeError: When all attempts fail or the API responds with a client error.
+        """
+        breaker = self.breaker(endpoint)
+        if not breaker.wait(self.circuit_wait):
+            raise CircuitOpenError(f"Requests to {endpoint} are suspended after repeated failures")
+        try:
+            response, error = self._retrying(url, headers)
+        except ScrapeError:
+            # The API responded with a client error, so the endpoint itself is up.
+            breaker.record_success()
+            raise
+        except BaseException:
+            # E.g. an interrupt or an unexpected error, a half-open circuit must not wait for its trial forever.
+            breaker.record_failure()
+            raise
+        if response is None:
+            breaker.record_failure()
+            raise ScrapeError(
+                f"Request to {url} failed after {self.retry.max_retries + 1} attempts: {error}"
+            ) from error
+        breaker.record_success()
+        return response
+
+    def _retrying(self, url: str, headers: dict[str, str] | None) -> tuple[Response | None, Exception | None]:
+        """Sends request with retries. Returns response, or error of the last attempt when all attempts fail."""
+        error: Exception | None = None
+        retry_after: str | None = None
+        for attempt in range(self.retry.max_retries + 1):
+            if attempt:
+                self._count_retry()
+                sleep(self.retry.delay(attempt - 1, retry_after))
+            response, error, retry_after = self._attempt(url, headers)
+            if response is not None:
+                return response, None
+        return None, error
+
+    def _attempt(
+        self,
+        url: str,
+        headers: dict[str, str] | None,
+    ) -> tuple[Response | None, Exception | None, str | None]:
+        """Sends one request. Returns response, or error with Retry-After header when the request can be retried."""
+        try:
+            response = self._send(url, headers)
+        except RequestException as e:
+            self.instrumentation.count("http_errors")
+            return None, e, None
+        if response.status_code in self.retry.statuses:
+            return None, self._retryable_error(response), response.headers.get("Retry-After")
+        if response.status_code >= 400:
+            raise ScrapeError(f"Request to {url} failed with HTTP {response.status_code}")
+        if self.rate_limiter:
+            self.rate_limiter.increase()
+        return response, None, None
+
+    def _send(self, url: str, headers: dict[str, str] | None) -> Response:
+        """Sends request once the rate limiter allows it."""
+        if self.rate_limiter:
+            with self.instrumentation.stage("rate_limit_wait"):
+                self.rate_limiter.acquire()
+        self.instrumentation.count("http_requests")
+        with self.instrumentation.stage("http"):
+            response = self.session.get(url, headers=headers, timeout=self.timeout)
+        self.instrumentation.count("http_bytes", len(response.content))
+        return response
+
+    def _retryable_error(self, response: Response) -> ScrapeError:
+        """Counts response with a retryable status, throttled requests slow the rate limiter down."""
+        self.instrumentation.count("http_errors")
+        if response.status_code == 429 and self.rate_limiter:
+            self.rate_limiter.decrease()
+        return ScrapeError(f"HTTP {response.status_code}")
+
+    def _count_retry(self) -> None:
+        with self._lock:
+            self.retries += 1
+        self.instrumentation.count("http_retries")
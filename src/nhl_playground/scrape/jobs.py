@@ -0,0 +1,155 @@
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from datetime import date
+from operator import attrgetter
+from typing import Any
+
+from nhl_playground.scrape.manifest import UNSTARTED_STATES
+from nhl_playground.scrape.scrapers import PbPScraper, PlayerScraper, TeamStatsScraper
+
+KINDS: tuple[str, ...] = ("team_stats", "players", "pbp")
+
+
+@dataclass(frozen=True)
+class WorkUnit:
+    """Single request-sized piece of a scraping job, e.g. one game or one team in a season and game type."""
+
+    kind: str
+    season: str
+    team: str = ""
+    game_type: int = 2
+    game_id: int = 0
+
+    @property
+    def item_key(self) -> str:
+        """Key of the scraped item in its output, game ID for PbP and "<season>/<team>/<game type>" otherwise."""
+        if self.kind == "pbp":
+            return str(self.game_id)
+        return f"{self.season}/{self.team}/{self.game_type}"
+
+    @property
+    def key(self) -> str:
+        """Unique key of the unit across all kinds."""
+        return f"{self.kind}/{self.item_key}"
+
+
+def season_range(first: str, last: str) -> list[str]:
+    """Gets all seasons between two seasons (inclusive), e.g. ["20212022", "20222023"] for 20212022 and 20222023."""
+    return [f"{year}{year + 1}" for year in range(int(first[:4]), int(last[:4]) + 1)]
+
+
+def season_of_date(day: date) -> str:
+    """Gets season a date belongs to, seasons are assumed to start in July."""
+    year = day.year if day.month >= 7 else day.year - 1
+    return f"{year}{year + 1}"
+
+
+def _is_played(game: dict[str, Any], start: date | None, end: date | None) -> bool:
+    """Checks if a scheduled game has started and, when a date range is given, was played within it."""
+    if game["gameState"] in UNSTARTED_STATES:
+        return False
+    return not (start and end) or start.isoformat() <= (game["gameDate"] or "")[:10] <= end.isoformat()
+
+
+class ScrapeJob:
+    """Scraping job over several scraper kinds and a range of seasons or dates.
+
+    The job holds one scraper per kind, all sharing one session, request layer and cache. Work units of all
+    kinds and seasons are put into a single queue processed by one pool of `workers` threads of the PbP scraper,
+    which also keeps the checkpoint and dead letters of the job. Teams and season schedules are looked up once
+    and shared by all kinds.
+    """
+
+    def __init__(
+        self,
+        kinds: Iterable[str] = ("pbp",),
+        game_types: tuple[int, ...] = (1, 2, 3),
+        **kwargs: Any,
+    ) -> None:
+        """Initialize job.
+
+        Args:
+            kinds (Iterable[str], optional): Kinds of data to scrape, any of `KINDS`. Defaults to ("pbp",).
+            game_types (tuple[int, ...], optional): Game types to scrape. Defaults to (1, 2, 3).
+            **kwargs: Arguments of `BaseScraper`, shared by scrapers of all kinds.
+        """
+        self.kinds = tuple(kinds)
+        self.game_types = game_types
+        self.pbp_scraper = PbPScraper(**kwargs)
+        shared: dict[str, Any] = kwargs | {
+            "erase": False,
+            "session": self.pbp_scraper.session,
+            "http": self.pbp_scraper.http,
+            "checkpoint": None,
+            "instrumentation": self.pbp_scraper.instrumentation,
+            "decoder": self.pbp_scraper.decoder,
+        }
+        self.team_stats_scraper = TeamStatsScraper(**shared)
+        self.player_scraper = PlayerScraper(**shared)
+        self._schedules: dict[str, list[dict[str, Any]]] = {}
+
+    @property
+    def dead_letters(self) -> list[WorkUnit]:
+        """Work units that failed to scrape."""
+        return self.pbp_scraper.dead_letters
+
+    def schedule(self, season: str) -> list[dict[str, Any]]:
+        """Gets schedule of a season, scraped only once per job."""
+        if season not in self._schedules:
+            self._schedules[season] = self.pbp_scraper.scrape_schedule_for_season(season=season, gts=self.game_types)
+        return self._schedules[season]
+
+    def plan(
+        self,
+        seasons: Iterable[str] = (),
+        start: date | None = None,
+        end: date | None = None,
+    ) -> list[WorkUnit]:
+        """Plans work units of all kinds for given seasons or for games played in a date range.
+
+        Args:
+            seasons (Iterable[str], optional): Seasons to scrape, e.g. `season_range("20082009", "20222023")`.
+            start (date | None, optional): First game date, seasons are then derived from the date range.
+            end (date | None, optional): Last game date. Defaults to `start`.
+
+        Returns:
+            list[WorkUnit]: Work units ordered by season and kind.
+        """
+        if start:
+            end = end or start
+            seasons = season_range(season_of_date(start), season_of_date(end))
+        seasons = list(seasons)
+        # Schedules of all seasons are independent lookups, fetch them concurrently.
+        list(self.pbp_scraper._map(self.schedule, seasons if "pbp" in self.kinds else []))
+
+        return [unit for season in seasons for kind in self.kinds for unit in self._plan_kind(kind, season, start, end)]
+
+    def _plan_kind(self, kind: str, season: str, start: date | None, end: date | None) -> list[WorkUnit]:
+        if kind != "pbp":
+            teams = self.pbp_scraper.teams_abbrev
+            return [WorkUnit(kind, season, team=team, game_type=gt) for gt in self.game_types for team in teams]
+        return [
+            WorkUnit("pbp", season, game_type=game["gameType"], game_id=game["id"])
+            for game in self.schedule(season)
+            if _is_played(game, start, end)
+        ]
+
+    def execute(self, unit: WorkUnit) -> dict[str, Any]:
+        """Scrapes a single work unit."""
+        if unit.kind == "pbp":
+            return self.pbp_scraper.scrape_pbp_by_game_id(str(unit.game_id))
+        if unit.kind == "team_stats":
+            return self.team_stats_scraper.scrape_team_stats(unit.team, unit.season, unit.game_type)
+        if unit.kind == "players":
+            return self.player_scraper.scrape_players_per_team(unit.team, unit.season, gts=(unit.game_type,))
+        raise ValueError(f"Unknown kind of work unit: {unit.kind}")
+
+    def run(self, units: Iterable[WorkUnit]) -> Iterator[tuple[WorkUnit, dict[str, Any]]]:
+        """Scrapes work units concurrently, yielding (unit, data) pairs. Failed units are added to dead letters."""
+        yield from self.pbp_scraper._collect(self.execute, units, key=attrgetter("key"))
+
+    def retry_dead_letters(self) -> Iterator[tuple[WorkUnit, dict[str, Any]]]:
+        """Retries work units in dead letters once open circuits reset. Units failing again are put back."""
+        self.pbp_scraper.http.wait_for_circuits()
+        units, self.pbp_scraper.dead_letters = self.pbp_scraper.dead_letters, []
+        yield from self.run(units)
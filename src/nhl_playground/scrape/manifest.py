@@ -0,0 +1,49 @@
+import json
+import os
+from dataclasses import dataclass, field
+from time import time
+from typing import Any
+
+from nhl_playground.scrape.cache import FINAL_GAME_STATES
+
+# Game states of the web API. Stats API reports the same states as `gameStateId` 1-7.
+GAME_STATES: tuple[str, ...] = ("FUT", "PRE", "LIVE", "CRIT", "OVER", "FINAL", "OFF")
+UNSTARTED_STATES: tuple[str, ...] = ("FUT", "PRE")
+
+
+def game_state_from_id(state_id: int | None) -> str | None:
+    """Converts stats API `gameStateId` to web API game state."""
+    if state_id is None or not 1 <= state_id <= len(GAME_STATES):
+        return None
+    return GAME_STATES[state_id - 1]
+
+
+@dataclass
+class ScrapeManifest:
+    """Manifest of already stored games and their state at the time of scraping."""
+
+    path: str
+    games: dict[str, dict[str, Any]] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: str) -> "ScrapeManifest":
+        """Loads manifest from a JSON file. Returns empty manifest if the file does not exist."""
+        if not os.path.exists(path):
+            return cls(path=path)
+        with open(path) as file:
+            return cls(path=path, games=json.load(file).get("games", {}))
+
+    def save(self) -> None:
+        """Atomically saves manifest to its JSON file."""
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as file:
+            json.dump({"games": self.games}, file)
+        os.replace(tmp_path, self.path)
+
+    def is_final(self, game_id: str | int) -> bool:
+        """Checks if game was stored in its final state."""
+        return self.games.get(str(game_id), {}).get("gameState") in FINAL_GAME_STATES
+
+    def update(self, game_id: str | int, game_state: str | None) -> None:
+        """Records that game was stored in a given state."""
+        self.games[str(game_id)] = {"gameState": game_state, "scrapedAt": time()}
@@ -0,0 +1,307 @@
+import json
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from math import ceil
+from random import Random
+from threading import Lock, Thread
+from time import monotonic, sleep
+from types import TracebackType
+from typing import Any
+
+from nhl_playground.data.synthetic import synthetic_game, synthetic_game_date
+from nhl_playground.scrape.fixtures import FixtureStore
+from nhl_playground.scrape.utils import load_endpoints
+
+Route = tuple[re.Pattern[str], tuple[str, ...]]
+# Endpoints with synthetic responses, other endpoints are served only from fixtures.
+SYNTHETIC_ENDPOINTS: tuple[str, ...] = (
+    "TeamInfo",
+    "GameList",
+    "ScheduleTeamSeason",
+    "PlayByPlay",
+    "TeamSeasonStats",
+    "Team",
+)
+
+
+def compile_routes(endpoints: dict[str, str]) -> dict[str, Route]:
+    """Compiles endpoint URL templates, e.g. `/v1/gamecenter/{game-id}/play-by-play`, into path patterns.
+
+    Returns:
+        dict[str, Route]: Pattern and names of template arguments by endpoint, groups are named `a0`, `a1`, ...
+    """
+    routes = {}
+    for endpoint, template in endpoints.items():
+        parts = re.split(r"\{([^}]+)\}", template)
+        names = tuple(parts[1::2])
+        pattern = "".join(re.escape(part) if i % 2 == 0 else f"(?P<a{i // 2}>[^/?&]+)" for i, part in enumerate(parts))
+        routes[endpoint] = (re.compile(f"^{pattern}$"), names)
+    return routes
+
+
+ROUTES: dict[str, Route] = compile_routes(load_endpoints())
+
+
+def match_routes(path: str, routes: dict[str, Route] = ROUTES) -> list[tuple[str, dict[str, str]]]:
+    """Gets (endpoint, args) pairs of all endpoints matching a request path, args are named as in templates."""
+    matches = []
+    for endpoint, (pattern, names) in routes.items():
+        if match := pattern.match(path):
+            matches.append((endpoint, {name: match[f"a{i}"] for i, name in enumerate(names)}))
+    return matches
+
+
+@dataclass
+class MockStats:
+    """Counters of served requests."""
+
+    requests: int = 0
+    fixtures: int = 0
+    synthetic: int = 0
+    throttled: int = 0
+    errors: int = 0
+    not_found: int = 0
+
+
+class Throttle:
+    """Server side token bucket, requests above `rate` per second (with bursts of `burst`) are refused."""
+
+    def __init__(self, rate: float, burst: float | None = None) -> None:
+        """Throttle constructor."""
+        self.rate = rate
+        self.burst = burst or max(1.0, rate)
+        self._tokens = self.burst
+        self._updated = monotonic()
+
+    def wait(self) -> float:
+        """Takes a token, returns 0, or seconds until the next token when the bucket is empty. Not thread safe."""
+        now = monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "_Server"
+
+    def do_GET(self) -> None:
+        """Serves GET request by the mock API."""
+        status, body, headers = self.server.mock.handle(self.path)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args: Any) -> None:
+        """Silences request logging."""
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    mock: "MockNHLServer"
+
+
+class MockNHLServer:
+    """Local stand-in of the NHL API serving recorded fixtures or synthetic data.
+
+    Used for offline scraping and load tests of scrapers. Routes are compiled from endpoint templates used by
+    scrapers. Responses recorded in a `FixtureStore` are served first, team list, season game list, team
+    schedules, play-by-play and team stats endpoints fall back to synthetic data. Latency, error rate and
+    throttling (HTTP 429 with Retry-After) are configurable to measure concurrency, retries and caching. Point
+    scrapers to it with `base_url=server.url, stats_url=server.url` or with `NHL_API_URL` and
+    `NHL_STATS_API_URL` environment variables.
+    """
+
+    def __init__(
+        self,
+        n_games: int = 82,
+        n_plays: int = 300,
+        n_teams: int = 32,
+        latency: float = 0.0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        fixtures: FixtureStore | None = None,
+        synthetic: bool = True,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        rate_limit: float | None = None,
+        seed: int | None = None,
+    ) -> None:
+        """Mock server constructor, the server is started by `start` or by entering the context.
+
+        Args:
+            n_games (int, optional): Number of games in every season. Defaults to 82.
+            n_plays (int, optional): Number of plays per game. Defaults to 300.
+            n_teams (int, optional): Number of teams. Defaults to 32.
+            latency (float, optional): Seconds added to every response. Defaults to 0.
+            host (str, optional): Host to listen on. Defaults to "127.0.0.1".
+            port (int, optional): Port to listen on, 0 picks a free port. Defaults to 0.
+            fixtures (FixtureStore | None, optional): Recorded responses to replay. Defaults to None.
+            synthetic (bool, optional): Serve synthetic data of requests without a fixture, otherwise they get
+                HTTP 404. Defaults to True.
+            jitter (float, optional): Maximal random seconds added to `latency`. Defaults to 0.
+            error_rate (float, optional): Fraction of requests failing with `error_status`. Defaults to 0.
+            error_status (int, optional): Status code of failed requests. Defaults to 503.
+            rate_limit (float | None, optional): Requests per second above which requests get HTTP 429 with
+                Retry-After header. Defaults to None (no throttling).
+            seed (int | None, optional): Seed of random latency and errors. Defaults to None.
+        """
+        self.n_games = n_games
+        self.n_plays = n_plays
+        self.teams = [f"T{team:02d}" for team in range(1, n_teams + 1)]
+        self.latency = latency
+        self.jitter = jitter
+        self.fixtures = fixtures
+        self.synthetic = synthetic
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.throttle = Throttle(rate_limit) if rate_limit else None
+        self.stats = MockStats()
+        self._random = Random(seed)
+        self._lock = Lock()
+        self._server = _Server((host, port), _Handler)
+        self._server.mock = self
+        self._thread: Thread | None = None
+        self._game = lru_cache(maxsize=4096)(self._encode_game)
+
+    @property
+    def url(self) -> str:
+        """Base URL of the server."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def requests(self) -> int:
+        """Number of received requests."""
+        return self.stats.requests
+
+    def start(self) -> "MockNHLServer":
+        """Starts serving requests in a background thread."""
+        self._thread = Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stops the server."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "MockNHLServer":
+        """Starts the server."""
+        return self.start()
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Stops the server."""
+        self.stop()
+
+    def handle(self, path: str) -> tuple[int, bytes, dict[str, str]]:
+        """Gets status code, body and extra headers of response to a request path."""
+        wait, failed = self._admit()
+        if wait:
+            return 429, b"{}", {"Retry-After": str(ceil(wait))}
+        if failed:
+            return self.error_status, b"{}", {}
+        matches = match_routes(path)
+        body = self._fixture(matches)
+        if body is None:
+            body = self._synthetic(matches)
+        return (404, b"{}", {}) if body is None else (200, body, {})
+
+    def _admit(self) -> tuple[float, bool]:
+        """Counts request and waits for its latency. Returns throttling wait and whether the request fails."""
+        with self._lock:
+            self.stats.requests += 1
+            wait = self.throttle.wait() if self.throttle else 0.0
+            failed = not wait and self._random.random() < self.error_rate
+            delay = self.latency + self._random.uniform(0, self.jitter)
+            self.stats.throttled += wait > 0
+            self.stats.errors += failed
+        if delay:
+            sleep(delay)
+        return wait, failed
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            setattr(self.stats, name, getattr(self.stats, name) + 1)
+
+    def _fixture(self, matches: list[tuple[str, dict[str, str]]]) -> bytes | None:
+        """Gets recorded body of the first matching endpoint with a fixture."""
+        for endpoint, args in matches if self.fixtures is not None else ():
+            if (body := self.fixtures.get(endpoint, args)) is not None:
+                self._count("fixtures")
+                return body
+        return None
+
+    def _synthetic(self, matches: list[tuple[str, dict[str, str]]]) -> bytes | None:
+        """Gets synthetic body of the first matching endpoint with synthetic data."""
+        for endpoint, args in matches if self.synthetic else ():
+            if endpoint in SYNTHETIC_ENDPOINTS:
+                self._count("synthetic")
+                if endpoint == "PlayByPlay":
+                    return self._game(int(args["game-id"]))
+                return json.dumps(self.respond(endpoint, args)).encode()
+        self._count("not_found")
+        return None
+
+    def respond(self, endpoint: str, args: dict[str, str]) -> dict[str, Any]:
+        """Gets synthetic response data of an endpoint."""
+        if endpoint == "TeamInfo":
+            return {"data": [{"id": i, "rawTricode": team} for i, team in enumerate(self.teams, start=1)]}
+        if endpoint == "GameList":
+            return {"data": [self._schedule_entry(game_id) for game_id in self.game_ids(args["season"])]}
+        if endpoint == "ScheduleTeamSeason":
+            return {"games": [self._schedule_entry(game_id) for game_id in self.game_ids(args["season"])]}
+        game_type = args.get("game-type") or args["game_type"]
+        return self._team_stats(args["team"], args["season"], int(game_type))
+
+    def game_ids(self, season: str) -> list[int]:
+        """Gets IDs of regular season games of a season."""
+        first_id = int(season[:4]) * 10**6 + 20000
+        return list(range(first_id + 1, first_id + self.n_games + 1))
+
+    @staticmethod
+    def _schedule_entry(game_id: int) -> dict[str, Any]:
+        year = game_id // 10**6
+        return {
+            "id": game_id,
+            "gameType": 2,
+            "gameDate": synthetic_game_date(game_id),
+            "gameStateId": 7,
+            "season": year * 10**4 + year + 1,
+        }
+
+    def _encode_game(self, game_id: int) -> bytes:
+        return json.dumps(synthetic_game(game_id, self.n_plays)).encode()
+
+    @staticmethod
+    def _team_stats(team: str, season: str, game_type: int) -> dict[str, Any]:
+        team_offset = sum(map(ord, team)) * 100
+
+        def player(player_id: int) -> dict[str, Any]:
+            return {
+                "playerId": player_id,
+                "firstName": {"default": f"First{player_id}"},
+                "lastName": {"default": f"Last{player_id}"},
+                "gamesPlayed": 82,
+            }
+
+        return {
+            "season": int(season),
+            "gameType": game_type,
+            "skaters": [player(8400000 + team_offset + i) | {"goals": i, "assists": 2 * i} for i in range(20)],
+            "goalies": [player(8400000 + team_offset + 50 + i) | {"wins": 10 * i} for i in range(1, 3)],
+        }
@@ -1,31 +1,133 @@
 import logging
+import os
 from abc import ABC, abstractclassmethod
-from typing import Any
+from collections.abc import Callable, Generator, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
+from threading import Lock
+from typing import Any, TypeVar
 
-import requests
-import yaml
-from requests import Response
+from pandas import DataFrame
+from requests import Response, Session
 
-from nhl_playground.scrape.utils import remove_defaults, setup_logger
+from nhl_playground.data.decoding import JsonDecoder, default_decoder
+from nhl_playground.data.stats import STATS_GROUPS, stats_table
+from nhl_playground.instrumentation import NO_INSTRUMENTATION, Instrumentation
+from nhl_playground.scrape.cache import ResponseCache
+from nhl_playground.scrape.checkpoint import Checkpoint
+from nhl_playground.scrape.fixtures import FixtureStore
+from nhl_playground.scrape.http import RequestLayer, ScrapeError, TokenBucket, get_session
+from nhl_playground.scrape.manifest import UNSTARTED_STATES, ScrapeManifest, game_state_from_id
+from nhl_playground.scrape.utils import (
+    load_endpoints,
+    read_teams_cache,
+    remove_defaults,
+    setup_logger,
+    write_teams_cache,
+)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+TEAMS_CACHE_PATH: str = os.path.join(os.path.expanduser("~"), ".cache", "nhl_playground", "teams.json")
+TEAMS_CACHE_TTL: float = 24 * 3600.0
+# Environment variables overriding API URLs, e.g. to point scrapers to a local `MockNHLServer`.
+BASE_URL_VARIABLE: str = "NHL_API_URL"
+STATS_URL_VARIABLE: str = "NHL_STATS_API_URL"
+# Team abbreviations resolved in this process, keyed by stats API URL.
+_TEAMS: dict[str, list[str]] = {}
+_TEAMS_LOCK = Lock()
 
 
 class BaseScraper(ABC):
     """NHL scraper class using free api. Provides method for raw data scraping."""
 
     BASE_API_URL: str = "https://api-web.nhle.com"
+    STATS_API_URL: str = "https://api.nhle.com"
     logger: logging.Logger
     ENDPOINTS: dict[str, str]
 
-    def __init__(self, erase: bool = True) -> None:
-        """Initialize scraper."""
-        self._load_endpoints(path="src/nhl_playground/scrape/endpoints.yaml")
+    def __init__(
+        self,
+        erase: bool = True,
+        workers: int = 1,
+        session: Session | None = None,
+        base_url: str | None = None,
+        stats_url: str | None = None,
+        cache: ResponseCache | None = None,
+        http: RequestLayer | None = None,
+        checkpoint: Checkpoint | None = None,
+        teams_abbrev: list[str] | None = None,
+        teams_cache_path: str | None = TEAMS_CACHE_PATH,
+        instrumentation: Instrumentation | None = None,
+        decoder: JsonDecoder | None = None,
+        recorder: FixtureStore | None = None,
+    ) -> None:
+        """Initialize scraper. Makes no network requests, team abbreviations are resolved on first use.
+
+        Args:
+            erase (bool, optional): Flag to erase past logging file. Defaults to True.
+            workers (int, optional): Maximal number of concurrent requests. Defaults to 1.
+            session (Session | None, optional): HTTP session to use. Defaults to the shared keep-alive session.
+            base_url (str | None, optional): URL overwriting `BASE_API_URL`, e.g. local stand-in server.
+                Defaults to `NHL_API_URL` environment variable when set.
+            stats_url (str | None, optional): URL overwriting `STATS_API_URL`, e.g. local stand-in server.
+                Defaults to `NHL_STATS_API_URL` environment variable when set.
+            cache (ResponseCache | None, optional): Persistent response cache. Defaults to None (no caching).
+            http (RequestLayer | None, optional): Request layer with rate limiting, retries and circuit breakers.
+                Defaults to a layer limited to 20 requests per second using `session`.
+            checkpoint (Checkpoint | None, optional): Checkpoint of completed work units. Units completed by
+                a previous run are replayed from it instead of being scraped again. Defaults to None.
+            teams_abbrev (list[str] | None, optional): Team abbreviations, e.g. shared by a scraping job.
+                Defaults to None (scraped from the API once per process and cached on disk for a day).
+            teams_cache_path (str | None, optional): File caching team abbreviations across runs, None disables it.
+                Defaults to `TEAMS_CACHE_PATH`.
+            instrumentation (Instrumentation | None, optional): Collector of stage timings and counters.
+                Defaults to None.
+            decoder (JsonDecoder | None, optional): Decoder of response bodies. Defaults to the fastest installed
+                JSON parser without projection, as scraped data is saved unchanged.
+            recorder (FixtureStore | None, optional): Store recording every scraped response by endpoint and
+                arguments, to be replayed by `MockNHLServer`. Defaults to None.
+        """
+        self.ENDPOINTS = load_endpoints()
         self.logger = setup_logger("scraperLogger", "scraper.log", erase=erase)
+        self.workers = max(1, workers)
+        self.session = session or get_session(pool_size=self.workers)
+        self.cache = cache
+        self.instrumentation = instrumentation or NO_INSTRUMENTATION
+        self.decoder = decoder or default_decoder()
+        self.http = http or RequestLayer(
+            session=self.session,
+            rate_limiter=TokenBucket(rate=20.0),
+            instrumentation=self.instrumentation,
+        )
+        self.dead_letters: list[Any] = []
+        self.checkpoint = checkpoint
+        self.recorder = recorder
+        self.BASE_API_URL = base_url or os.environ.get(BASE_URL_VARIABLE) or self.BASE_API_URL
+        self.STATS_API_URL = stats_url or os.environ.get(STATS_URL_VARIABLE) or self.STATS_API_URL
+        self.teams_cache_path = teams_cache_path
+        self._teams_abbrev = teams_abbrev
 
-        self.teams_abbrev = self._scrape_teams_abbrev()
+    @property
+    def teams_abbrev(self) -> list[str]:
+        """Team abbreviations, resolved lazily from the in-process cache, the on-disk cache or the API."""
+        if self._teams_abbrev is None:
+            self._teams_abbrev = self._resolve_teams_abbrev()
+        return self._teams_abbrev
 
-    def _load_endpoints(self, path: str) -> None:
-        with open(path) as file:
-            self.ENDPOINTS = yaml.safe_load(file)
+    def _resolve_teams_abbrev(self) -> list[str]:
+        # The lock makes concurrent scrapers wait for a single request instead of sending their own.
+        with _TEAMS_LOCK:
+            teams = _TEAMS.get(self.STATS_API_URL)
+            if teams is None and self.teams_cache_path:
+                teams = read_teams_cache(self.teams_cache_path, self.STATS_API_URL, TEAMS_CACHE_TTL)
+            if teams is None:
+                teams = self._scrape_teams_abbrev()
+                if self.teams_cache_path:
+                    write_teams_cache(self.teams_cache_path, self.STATS_API_URL, teams)
+            _TEAMS[self.STATS_API_URL] = teams
+            return teams
 
     def _scrape_raw(
         self,
@@ -41,23 +143,120 @@ class BaseScraper(ABC):
             overwrite_base (None | str): URL to overwrite base URL. Default None.
 
         Returns:
-            dict: Dictionary containing the raw data. Is empty when an error occurs.
+            dict: Dictionary containing the raw data.
+
+        Raises:
+            ScrapeError: When the data cannot be scraped, even after retries.
         """
         self.logger.info(f"Scraping of {endpoint} data started")
         base_api_url = overwrite_base if overwrite_base else self.BASE_API_URL
+        url = f"{base_api_url}{self.ENDPOINTS[endpoint].format(**scrape_args)}"
         try:
-            response: Response = requests.get(f"{base_api_url}{self.ENDPOINTS[endpoint].format(**scrape_args)}")
-            data: dict[str, Any] = response.json()
-            self.logger.info("Scraping finished successfully")
-        except Exception:
-            self.logger.warning("Error occurred during scraping: {e}")
-            data = {}
+            data: dict[str, Any] = self._get(endpoint, url)
+        except ScrapeError as e:
+            self.logger.warning(f"Error occurred during scraping: {e}")
+            raise
+        if self.recorder is not None:
+            self.recorder.record(endpoint, scrape_args, data)
+        self.logger.info("Scraping finished successfully")
+        return data
+
+    def _get(self, endpoint: str, url: str) -> dict[str, Any]:
+        """Gets decoded response for a given URL, served from cache when possible."""
+        if self.cache is None:
+            return self._decode(self.http.get(url, endpoint))
+
+        entry, body = self.cache.get(url)
+        if body is not None:
+            self.instrumentation.count("cache_hits")
+            with self.instrumentation.stage("decode_json"):
+                return self.decoder.decode(body)
+        response: Response = self.http.get(url, endpoint, headers=entry.conditional_headers() if entry else None)
+        if entry and response.status_code == 304 and (body := self.cache.read(entry)) is not None:
+            self.cache.revalidate(entry, response.headers)
+            with self.instrumentation.stage("decode_json"):
+                return self.decoder.decode(body)
+        if response.status_code == 304:
+            response = self.http.get(url, endpoint)
+
+        data = self._decode(response)
+        self.cache.store(endpoint, url, response.content, response.headers, data)
         return data
 
+    def _decode(self, response: Response) -> dict[str, Any]:
+        """Decodes JSON response."""
+        try:
+            with self.instrumentation.stage("decode_json"):
+                return self.decoder.decode(response.content)
+        except ValueError as e:
+            raise ScrapeError(f"Invalid JSON response from {response.url}") from e
+
+    def _collect(
+        self,
+        fn: Callable[[T], R],
+        items: Iterable[T],
+        key: Callable[[T], str] = str,
+    ) -> Iterator[tuple[T, R]]:
+        """Maps function over items concurrently, yielding (item, result) pairs of successfully scraped items.
+
+        Items that fail with `ScrapeError` or with malformed response (`KeyError`) are added to `dead_letters`
+        and skipped, so a single failure does not stop a long scrape. With a checkpoint, items completed by
+        a previous run (identified by `key`) are replayed first and every new result is recorded as soon as
+        its item completes. Results are yielded in order of completion.
+        """
+        pending = list(items)
+        if self.checkpoint is not None:
+            pending = yield from self._replay_checkpoint(pending, key)
+        for item, result, ok in self._map_completed(partial(self._attempt_item, fn, key), pending):
+            if ok:
+                yield item, result
+
+    def _replay_checkpoint(self, items: list[T], key: Callable[[T], str]) -> Generator[tuple[T, R], None, list[T]]:
+        """Yields items completed by a previous run with their recorded results. Returns items left to scrape."""
+        by_key = {key(item): item for item in items}
+        for done_key, result in self.checkpoint.items():
+            if done_key in by_key:
+                yield by_key.pop(done_key), result
+        self.logger.info(f"Resuming from checkpoint, {len(by_key)} items left to scrape")
+        return list(by_key.values())
+
+    def _attempt_item(self, fn: Callable[[T], R], key: Callable[[T], str], item: T) -> tuple[T, R | None, bool]:
+        """Scrapes one item and records it in the checkpoint, failed items are added to dead letters."""
+        try:
+            result = fn(item)
+        except (ScrapeError, KeyError) as e:
+            self.logger.warning(f"Scraping of {item} failed, added to dead letters: {e!r}")
+            self.dead_letters.append(item)
+            return item, None, False
+        self.instrumentation.count("scraped_items")
+        if self.checkpoint is not None:
+            self.checkpoint.record(key(item), result)
+        return item, result, True
+
+    def _map(self, fn: Callable[[T], R], items: Iterable[T]) -> Iterator[R]:
+        """Maps function over items using at most `workers` concurrent threads. Keeps order of items."""
+        if self.workers == 1:
+            yield from map(fn, items)
+            return
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            yield from executor.map(fn, items)
+
+    def _map_completed(self, fn: Callable[[T], R], items: Iterable[T]) -> Iterator[R]:
+        """Maps function over items using at most `workers` concurrent threads, yielding results as they complete.
+
+        A slow item (e.g. retried with backoff) does not hold back results of items completed after it.
+        """
+        if self.workers == 1:
+            yield from map(fn, items)
+            return
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for future in as_completed([executor.submit(fn, item) for item in items]):
+                yield future.result()
+
     def _scrape_teams_abbrev(self) -> list[str]:
         """Scrapes team abbreviations."""
         raw_teams: list[dict] = self._scrape_raw(
-            endpoint="TeamInfo", scrape_args={}, overwrite_base="https://api.nhle.com"
+            endpoint="TeamInfo", scrape_args={}, overwrite_base=self.STATS_API_URL
         )["data"]
 
         return [rt["rawTricode"] for rt in raw_teams]
@@ -66,30 +265,67 @@ class BaseScraper(ABC):
     def scrape(self, season: str) -> dict[str, Any]:
         """Base method for scraping. All scrapers must implement this method."""
 
+    def iter_scrape(self, season: str) -> Iterator[tuple[str, Any]]:
+        """Lazily scrapes data, yielding (key, item) pairs. Scrapers able to stream results override this method."""
+        yield from self.scrape(season=season).items()
+
 
 class TeamStatsScraper(BaseScraper):
     """Simple scraper for obtaining team statistics."""
 
-    def scrape(self, season: str) -> dict[str, Any]:
-        """Scrapers team stats as a raw data. Returns dictionary with season, gameType, skaters and goalies data."""
-        stats_raw = {
-            team: self._scrape_raw(
-                endpoint="TeamSeasonStats",
-                scrape_args={"team": team, "season": season, "game-type": str(gt)},
-            )
-            for gt in [1, 2, 3]
-            for team in self.teams_abbrev
+    def scrape_team_stats_raw(self, team: str, season: str, game_type: int) -> dict[str, Any]:
+        """Scrapes stats of one team in a season for a given game type, keeping localized player names."""
+        raw = self._scrape_raw(
+            endpoint="TeamSeasonStats",
+            scrape_args={"team": team, "season": season, "game-type": str(game_type)},
+        )
+        return {
+            "season": raw.get("season"),
+            "gameType": raw.get("gameType"),
+            "skaters": raw.get("skaters", []),
+            "goalies": raw.get("goalies", []),
         }
-        stats: dict[str, Any] = {
-            k: {
-                "season": v.get("season"),
-                "gameType": v.get("gameType"),
-                "skaters": [remove_defaults(player) for player in v.get("skaters", [])],
-                "goalies": [remove_defaults(player) for player in v.get("goalies", [])],
-            }
-            for k, v in stats_raw.items()
+
+    def scrape_team_stats(self, team: str, season: str, game_type: int) -> dict[str, Any]:
+        """Scrapes stats of one team in a season for a given game type."""
+        return self._extract_names(self.scrape_team_stats_raw(team, season, game_type))
+
+    def iter_team_stats(
+        self,
+        seasons: Iterable[str],
+        gts: tuple[int, ...] = (1, 2, 3),
+    ) -> Iterator[tuple[tuple[str, str, int], dict[str, Any]]]:
+        """Concurrently scrapes raw stats of all teams, yielding ((team, season, game type), stats) pairs."""
+        units = [(team, season, gt) for season in seasons for gt in gts for team in self.teams_abbrev]
+        yield from self._collect(
+            lambda unit: self.scrape_team_stats_raw(*unit),
+            units,
+            key=lambda unit: f"{unit[1]}/{unit[0]}/{unit[2]}",
+        )
+
+    def scrape(self, season: str) -> dict[str, Any]:
+        """Scrapers team stats as a raw data.
+
+        Returns:
+            dict[str, Any]: Season, gameType, skaters and goalies data keyed by "<season>/<team>/<game type>".
+        """
+        return {
+            f"{unit_season}/{team}/{gt}": self._extract_names(stats)
+            for (team, unit_season, gt), stats in self.iter_team_stats([season])
         }
-        return stats
+
+    def scrape_tables(self, seasons: Iterable[str], gts: tuple[int, ...] = (1, 2, 3)) -> dict[str, DataFrame]:
+        """Scrapes stats of all teams in given seasons as flat typed tables.
+
+        Returns:
+            dict[str, DataFrame]: "skaters" and "goalies" tables, one row per player, team, season and game type.
+        """
+        stats = list(self.iter_team_stats(seasons, gts))
+        return {group: stats_table(stats, group) for group in STATS_GROUPS}
+
+    @staticmethod
+    def _extract_names(stats: dict[str, Any]) -> dict[str, Any]:
+        return stats | {group: [remove_defaults(player) for player in stats[group]] for group in STATS_GROUPS}
 
 
 class PlayerScraper(BaseScraper):
@@ -113,7 +349,12 @@ class PlayerScraper(BaseScraper):
 
     def scrape(self, season: str) -> dict[str, Any]:
         """Scrapes all player data from set season. Returns dictionary containing skaters and goalies data."""
-        players: list[dict[str, Any]] = [self.scrape_players_per_team(team, season) for team in self.teams_abbrev]
+        scraped = self._collect(
+            lambda team: self.scrape_players_per_team(team, season),
+            self.teams_abbrev,
+            key=lambda team: f"{season}/{team}",
+        )
+        players: list[dict[str, Any]] = [team_players for _, team_players in scraped]
         skaters = [player for team_players in players for player in team_players["skaters"]]
         goalies = [player for team_players in players for player in team_players["goalies"]]
 
@@ -130,8 +371,30 @@ class PbPScraper(BaseScraper):
             "plays": raw_pbp["plays"],
             "homeTeam": raw_pbp["homeTeam"],
             "awayTeam": raw_pbp["awayTeam"],
+            "gameState": raw_pbp.get("gameState"),
+            "gameDate": raw_pbp.get("gameDate"),
         }
 
+    def scrape_schedule_for_season(self, season: str, gts: tuple[int] = (1, 2, 3)) -> list[dict[str, Any]]:
+        """Scrapes league-wide schedule of a season with a single request.
+
+        Returns:
+            list[dict[str, Any]]: Games with their `id`, `gameType`, `gameDate` and `gameState`.
+        """
+        games: list = self._scrape_raw(
+            endpoint="GameList", scrape_args={"season": season}, overwrite_base=self.STATS_API_URL
+        )["data"]
+        return [
+            {
+                "id": game["id"],
+                "gameType": game["gameType"],
+                "gameDate": game.get("gameDate"),
+                "gameState": game_state_from_id(game.get("gameStateId")),
+            }
+            for game in games
+            if game["gameType"] in gts
+        ]
+
     def scrape_ids_team_season(self, team: str, season: str, gts: tuple[int] = (1, 2, 3)) -> list[str]:
         """Scrapes IDs of all games in a season of given team."""
         games: list = self._scrape_raw(endpoint="ScheduleTeamSeason", scrape_args={"team": team, "season": season})[
@@ -144,13 +407,54 @@ class PbPScraper(BaseScraper):
 
     def scrape_ids_for_season(self, season: str, gts: tuple[int] = (1, 2, 3)) -> list[str]:
         """Scrapes IDs of all games in a season."""
-        ids: list[str] = [
-            id_ for team in self.teams_abbrev for id_ in self.scrape_ids_team_season(team=team, season=season, gts=gts)
-        ]
-
-        return list(set(ids))
+        return [game["id"] for game in self.scrape_schedule_for_season(season=season, gts=gts)]
 
     def scrape(self, season: str) -> dict[str, Any]:
         """Scrapes PbP all data."""
+        return dict(self.iter_scrape(season=season))
+
+    def iter_scrape(self, season: str) -> Iterator[tuple[str, dict[str, Any]]]:
+        """Lazily scrapes PbP data of a season, yielding (game ID, game) pairs as games arrive."""
         season_ids = self.scrape_ids_for_season(season=season)
-        return {game_id: self.scrape_pbp_by_game_id(game_id) for game_id in season_ids}
+        yield from self._collect(self.scrape_pbp_by_game_id, season_ids)
+
+    def retry_dead_letters(self) -> Iterator[tuple[str, dict[str, Any]]]:
+        """Retries scraping of games in dead letters once open circuits reset. Failing games are put back."""
+        self.http.wait_for_circuits()
+        game_ids, self.dead_letters = self.dead_letters, []
+        yield from self._collect(self.scrape_pbp_by_game_id, game_ids)
+
+    def scrape_incremental(
+        self,
+        season: str,
+        manifest: ScrapeManifest,
+        existing: dict[str, Any] | None = None,
+    ) -> dict[str, Any]:
+        """Scrapes only games that are new or were not final during the last run and merges them into existing data.
+
+        Args:
+            season (str): Season to scrape.
+            manifest (ScrapeManifest): Manifest of already stored games, updated in place.
+                Save it only once the returned data is stored.
+            existing (dict[str, Any] | None, optional): Previously stored PbP data keyed by game ID.
+
+        Returns:
+            dict[str, Any]: Existing data updated with newly scraped games, keyed by game ID as string.
+        """
+        merged = {str(key): game for key, game in (existing or {}).items()}
+        merged.update(self.iter_incremental(season=season, manifest=manifest))
+        return merged
+
+    def iter_incremental(self, season: str, manifest: ScrapeManifest) -> Iterator[tuple[str, dict[str, Any]]]:
+        """Lazily scrapes games that are new or were not final during the last run, updating the manifest."""
+        schedule = self.scrape_schedule_for_season(season=season)
+        pending = [
+            str(game["id"])
+            for game in schedule
+            if game["gameState"] not in UNSTARTED_STATES and not manifest.is_final(game["id"])
+        ]
+        self.logger.info(f"Incremental scraping of {len(pending)} out of {len(schedule)} games")
+
+        for game_id, game in self._collect(self.scrape_pbp_by_game_id, pending):
+            manifest.update(game_id, game["gameState"])
+            yield game_id, game
@@ -1,8 +1,21 @@
+import json
 import logging
-from os import remove
-from os.path import exists
+import os
+from functools import cache
+from importlib.resources import files
+from time import time
 from typing import Any
 
+import yaml
+
+_CONFIGURED_LOGGERS: set[str] = set()
+
+
+@cache
+def load_endpoints() -> dict[str, str]:
+    """Loads endpoint URL templates shipped with the package. The file is read only once per process."""
+    return yaml.safe_load(files("nhl_playground.scrape").joinpath("endpoints.yaml").read_text())
+
 
 def setup_logger(
     name: str,
@@ -13,6 +26,9 @@ def setup_logger(
 ) -> logging.Logger:
     """Function for setting up logger.
 
+    The logger is configured only once per process, repeated calls return it without adding handlers
+    or erasing the logging file again. The file is created lazily with the first message.
+
     Args:
         name (str): logger name
         filename (str): output file name
@@ -23,25 +39,54 @@ def setup_logger(
     Returns:
         logging.Logger: Logger instance.
     """
-    # Erase logging file if it exists
-    if erase and exists(filename):
-        remove(filename)
-    # Configure logfile
     logger = logging.getLogger(name)
+    if name in _CONFIGURED_LOGGERS:
+        return logger
+    _CONFIGURED_LOGGERS.add(name)
+    # Configure logfile, erasing the past one if requested
     formatter = logging.Formatter("%(message)s")
-    fileHandler = logging.FileHandler(filename, mode="w")
+    fileHandler = logging.FileHandler(filename, mode="w" if erase else "a", delay=True)
     fileHandler.setFormatter(formatter)
-    streamHandler = logging.StreamHandler()
     logger.setLevel(level)
     logger.addHandler(fileHandler)
     if verbose:
         # CMD line prints
+        streamHandler = logging.StreamHandler()
         streamHandler.setFormatter(formatter)
         logger.addHandler(streamHandler)
 
     return logger
 
 
+def read_teams_cache(path: str, url: str, ttl: float) -> list[str] | None:
+    """Reads team abbreviations cached on disk for an API URL, returns None if missing or older than `ttl` seconds."""
+    try:
+        with open(path) as file:
+            entry = json.load(file).get(url)
+    except (OSError, ValueError):
+        return None
+    if not entry or time() - entry["fetched_at"] > ttl:
+        return None
+    return entry["teams"]
+
+
+def write_teams_cache(path: str, url: str, teams: list[str]) -> None:
+    """Caches team abbreviations of an API URL on disk. Failures are ignored, the cache is only an optimization."""
+    try:
+        with open(path) as file:
+            cached = json.load(file)
+    except (OSError, ValueError):
+        cached = {}
+    cached[url] = {"teams": teams, "fetched_at": time()}
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(f"{path}.tmp", "w") as file:
+            json.dump(cached, file)
+        os.replace(f"{path}.tmp", path)
+    except OSError:
+        pass
+
+
 def remove_defaults(data: dict[str, Any], cols: tuple[str] = ("firstName", "lastName")) -> dict:
     """Preprocessing function to extract names from raw data.
 